@@ -0,0 +1,9 @@
+"""Offline benchmarks for the dashboard's warehouse, formatting and media paths."""
+
+import sys
+from pathlib import Path
+
+# Ensure parent directory is in path
+_parent = Path(__file__).resolve().parent.parent
+if str(_parent) not in sys.path:
+    sys.path.insert(0, str(_parent))
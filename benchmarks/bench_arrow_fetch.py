@@ -0,0 +1,110 @@
+"""
+Benchmark: Arrow-native vs row-based result fetching in query_stage1_stage2_linked.
+
+Times services.databricks_query_service.fetch_dataframe() against a fake
+cursor holding a synthetic linked-results table, once with Arrow fetching
+(fetchall_arrow + Arrow-backed dtypes) and once with the fetchall() +
+pd.DataFrame(rows) fallback, and reports wall time and peak memory.
+
+Usage:
+    python -m benchmarks.bench_arrow_fetch [--rows 10000 100000 1000000]
+"""
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import pyarrow as pa
+
+# Ensure parent directory is in path
+_parent = Path(__file__).resolve().parent.parent
+if str(_parent) not in sys.path:
+    sys.path.insert(0, str(_parent))
+
+from benchmarks.fakes import FakeArrowCursor
+from benchmarks.synthetic import make_linked_results_table
+from config.settings import settings
+from services.databricks_query_service import fetch_dataframe
+
+# Larger tables repeat a generated block; content variety doesn't matter for fetch cost
+_BLOCK_ROWS = 50_000
+
+
+def _table(n_rows: int) -> pa.Table:
+    if n_rows <= _BLOCK_ROWS:
+        return make_linked_results_table(n_rows)
+    block = make_linked_results_table(_BLOCK_ROWS)
+    repeats = -(-n_rows // _BLOCK_ROWS)
+    return pa.concat_tables([block] * repeats).slice(0, n_rows)
+
+
+def _measure(table: pa.Table, use_arrow: bool) -> dict:
+    original = settings.arrow_fetch_enabled
+    settings.arrow_fetch_enabled = use_arrow
+    try:
+        # Timing pass (tracemalloc off: it slows allocation-heavy code)
+        gc.collect()
+        start = time.perf_counter()
+        df = fetch_dataframe(FakeArrowCursor(table))
+        wall = time.perf_counter() - start
+        result_bytes = int(df.memory_usage(deep=True).sum())
+        del df
+        
+        # Memory pass: Python/NumPy peak via tracemalloc, Arrow buffers via its allocator
+        gc.collect()
+        arrow_before = pa.total_allocated_bytes()
+        tracemalloc.start()
+        df = fetch_dataframe(FakeArrowCursor(table))
+        _, python_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        arrow_delta = pa.total_allocated_bytes() - arrow_before
+        del df
+    finally:
+        settings.arrow_fetch_enabled = original
+    
+    return {
+        'wall_s': wall,
+        'python_peak_mb': python_peak / 1e6,
+        'arrow_alloc_mb': max(arrow_delta, 0) / 1e6,
+        'result_mb': result_bytes / 1e6,
+    }
+
+
+def run(row_counts=(10_000, 100_000)) -> list:
+    """
+    Compare both fetch paths for each table size.
+    
+    Args:
+        row_counts: Table sizes to test.
+    """
+    results = []
+    for n_rows in row_counts:
+        table = _table(n_rows)
+        results.append({
+            'rows': n_rows,
+            'rows_path': _measure(table, use_arrow=False),
+            'arrow_path': _measure(table, use_arrow=True),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+    
+    print(f"  {'rows':>9}  {'path':>6}  {'wall s':>8}  {'py peak MB':>10}  {'arrow MB':>9}  {'df MB':>8}")
+    for result in run(args.rows):
+        for label, key in (("rows", "rows_path"), ("arrow", "arrow_path")):
+            m = result[key]
+            print(f"  {result['rows']:>9}  {label:>6}  {m['wall_s']:>8.3f}  {m['python_peak_mb']:>10.1f}  "
+                  f"{m['arrow_alloc_mb']:>9.1f}  {m['result_mb']:>8.1f}")
+        speedup = result['rows_path']['wall_s'] / result['arrow_path']['wall_s']
+        print(f"  {'':>9}  {'':>6}  speedup {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Load test: async query throughput as concurrency rises.
+
+Runs AsyncDatabricksQueryService.query_stage1_stage2_linked against a fake
+pool whose cursors sleep for a simulated warehouse latency, at increasing
+numbers of concurrent callers, and reports queries per second and latency.
+
+Usage:
+    python -m benchmarks.bench_async_load [--latency-ms 200] [--requests 64]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Ensure parent directory is in path
+_parent = Path(__file__).resolve().parent.parent
+if str(_parent) not in sys.path:
+    sys.path.insert(0, str(_parent))
+
+from benchmarks.fakes import FakeConnection, FakeCursor
+from infrastructure.databricks_client import DatabricksConnectionPool
+from services.async_query_service import AsyncDatabricksQueryService
+from services.databricks_query_service import DatabricksQueryService
+
+COLUMNS = ["session_id", "farm_id", "camera_id", "stage1_timestamp"]
+ROWS = [(f"session-{i}", "farm-1", "camera-1", None) for i in range(100)]
+
+
+async def _run_level(service: AsyncDatabricksQueryService, concurrency: int, requests: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    
+    async def one_request():
+        async with semaphore:
+            start = time.perf_counter()
+            await service.query_stage1_stage2_linked("2026-01-14", farm_id="farm-1", limit=100)
+            latencies.append((time.perf_counter() - start) * 1000)
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    return {
+        'concurrency': concurrency,
+        'qps': requests / elapsed,
+        'p50_ms': statistics.median(latencies),
+        'p95_ms': statistics.quantiles(latencies, n=20)[18] if len(latencies) > 1 else latencies[0],
+    }
+
+
+def run(latency_ms: float = 200.0, requests: int = 64, levels=(1, 2, 4, 8, 16, 32), pool_size: int = 32) -> list:
+    """
+    Measure throughput at each concurrency level.
+    
+    Args:
+        latency_ms: Simulated warehouse time per statement.
+        requests: Queries issued per level.
+        levels: Concurrency levels to test.
+        pool_size: Connection pool size (and executor width).
+    """
+    latency = latency_ms / 1000
+    pool = DatabricksConnectionPool(
+        connection_factory=lambda: FakeConnection(
+            cursor_factory=lambda: FakeCursor(COLUMNS, ROWS, query_latency=latency)
+        ),
+        max_size=pool_size,
+    )
+    service = AsyncDatabricksQueryService(DatabricksQueryService(pool=pool), max_workers=pool_size)
+    
+    results = []
+    try:
+        for level in levels:
+            with contextlib.redirect_stdout(io.StringIO()):
+                results.append(asyncio.run(_run_level(service, level, requests)))
+    finally:
+        service.shutdown()
+        pool.close_all()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--pool-size", type=int, default=32)
+    args = parser.parse_args()
+    
+    print(f"Async query throughput ({args.latency_ms:.0f} ms simulated warehouse latency):")
+    print(f"  {'concurrency':>11}  {'qps':>8}  {'p50 ms':>8}  {'p95 ms':>8}")
+    for row in run(args.latency_ms, args.requests, pool_size=args.pool_size):
+        print(f"  {row['concurrency']:>11}  {row['qps']:>8.1f}  {row['p50_ms']:>8.1f}  {row['p95_ms']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+Benchmark: client-side hash-join linkage vs the warehouse SQL join.
+
+Runs the same workload of linked queries (different cameras, farms and
+time windows over a few days) through DatabricksQueryService in both
+linkage modes, against a simulated warehouse. Each statement costs a fixed
+overhead plus a per-row scan cost: the SQL join scans the day's Stage 1
+rows and three days of Stage 2 on every request, while client mode scans
+each day slice once and joins in memory (measured, not simulated).
+
+The simulated warehouse evaluates the SQL join with row-wise regexes and a
+dict lookup, independently of services.client_linkage, and both modes'
+results are checked to be identical.
+
+Usage:
+    python -m benchmarks.bench_client_linkage [--rows-per-day 20000] [--queries 30]
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+# Ensure parent directory is in path
+_parent = Path(__file__).resolve().parent.parent
+if str(_parent) not in sys.path:
+    sys.path.insert(0, str(_parent))
+
+from benchmarks.fakes import FakeArrowCursor, FakeConnection
+from benchmarks.synthetic import make_stage_tables
+from config.settings import settings
+from infrastructure.databricks_client import DatabricksConnectionPool
+from infrastructure.single_flight import SingleFlight
+from services.client_linkage import LINKED_COLUMNS
+from services.databricks_query_service import DatabricksQueryService
+from services.parquet_result_cache import ParquetResultCache
+from services.query_result_cache import QueryResultCache
+
+QUERY_DAYS = ["2026-01-13", "2026-01-14", "2026-01-15"]
+# Stage 2 windows reach a day either side
+TABLE_DAYS = ["2026-01-12", *QUERY_DAYS, "2026-01-16"]
+
+_STAGE1_BLK = re.compile(r'/(\d{3}_\d{7})_')
+_STAGE2_BLK = re.compile(r'^(\d{3}_\d{7})_')
+_TIMESTAMP_KEY = re.compile(r'_(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})')
+
+
+def _regexp_extract(pattern: re.Pattern, value) -> str:
+    match = pattern.search(value)
+    return match.group(1) if match else ""
+
+
+class SimulatedWarehouse:
+    """
+    Answers the linked query and the day-slice queries from in-memory tables.
+    
+    Args:
+        stage1: Raw Stage 1 table.
+        stage2: Raw Stage 2 table.
+        statement_ms: Fixed cost per statement.
+        scan_us_per_row: Cost per row scanned.
+    """
+    
+    def __init__(self, stage1, stage2, statement_ms: float, scan_us_per_row: float):
+        self.stage1 = stage1.to_pandas()
+        self.stage2 = stage2.to_pandas()
+        self.statement_s = statement_ms / 1000
+        self.row_s = scan_us_per_row / 1e6
+        self.statements = 0
+        self.rows_scanned = 0
+        self.simulated_s = 0.0
+        self.real_s = 0.0  # Time spent simulating, excluded from the client-side measurement
+    
+    def _scan(self, df: pd.DataFrame, column: str, start, end) -> pd.DataFrame:
+        rows = df[(df[column] >= start) & (df[column] < end)]
+        self.rows_scanned += len(rows)
+        self.simulated_s += len(rows) * self.row_s
+        return rows
+    
+    def _linked(self, sql: str, params: dict) -> pd.DataFrame:
+        s1 = self._scan(self.stage1, "processing_timestamp", params["range_start"], params["range_end"])
+        s2 = self._scan(self.stage2, "inference_timestamp", params["stage2_start"], params["stage2_end"])
+        if "farm_id" in params:
+            s1 = s1[s1["farm_id"] == params["farm_id"]]
+        if "camera_id" in params:
+            s1 = s1[s1["camera_id"] == params["camera_id"]]
+            s2 = s2[s2["camera_id"] == params["camera_id"]]
+        if "should_forward = true" in sql:
+            s1 = s1[s1["should_forward"]]
+        if "cursor_timestamp" in params:
+            ts, cursor = s1["processing_timestamp"], params["cursor_timestamp"]
+            s1 = s1[(ts < cursor) | ((ts == cursor) & (s1["session_id"] < params["cursor_session_id"]))]
+        
+        matches = {}
+        for row in s2.itertuples():
+            key = (row.camera_id, _regexp_extract(_STAGE2_BLK, row.file_name),
+                   _regexp_extract(_TIMESTAMP_KEY, row.file_name))
+            matches.setdefault(key, []).append(row)
+        
+        rows = []
+        for row in s1.sort_values(["processing_timestamp", "session_id"], ascending=False).itertuples():
+            uri = row.frame_uris[0]
+            blk_file, ts_key = _regexp_extract(_STAGE1_BLK, uri), _regexp_extract(_TIMESTAMP_KEY, uri)
+            for match in matches.get((row.camera_id, blk_file, ts_key), [None]):
+                rows.append((
+                    row.session_id, row.farm_id, row.camera_id, row.processing_timestamp,
+                    row.highest_probability_category, row.highest_probability_value, row.should_forward,
+                    len(row.frame_uris),
+                    *((match.inference_id, match.inference_timestamp, match.classification,
+                       match.max_probability_score, match.should_forward, match.video_gcs_path)
+                      if match is not None else (None,) * 6),
+                    blk_file, ts_key,
+                ))
+        limit = int(re.search(r"LIMIT (\d+)", sql).group(1))
+        return pd.DataFrame(rows[:limit], columns=LINKED_COLUMNS)
+    
+    def execute(self, sql: str, params: dict) -> pd.DataFrame:
+        start = time.perf_counter()
+        try:
+            return self._execute(sql, params)
+        finally:
+            self.real_s += time.perf_counter() - start
+    
+    def _execute(self, sql: str, params: dict) -> pd.DataFrame:
+        self.statements += 1
+        self.simulated_s += self.statement_s
+        if "stage1_data" in sql:
+            return self._linked(sql, params)
+        if "first_frame_uri" in sql:
+            s1 = self._scan(self.stage1, "processing_timestamp", params["range_start"], params["range_end"])
+            return pd.DataFrame({
+                "session_id": s1["session_id"],
+                "farm_id": s1["farm_id"],
+                "camera_id": s1["camera_id"],
+                "stage1_timestamp": s1["processing_timestamp"],
+                "stage1_category": s1["highest_probability_category"],
+                "stage1_confidence": s1["highest_probability_value"],
+                "stage1_should_forward": s1["should_forward"],
+                "frame_count": s1["frame_uris"].map(len),
+                "first_frame_uri": s1["frame_uris"].map(lambda uris: uris[0]),
+            })
+        s2 = self._scan(self.stage2, "inference_timestamp", params["range_start"], params["range_end"])
+        return s2.rename(columns={
+            "inference_id": "stage2_inference_id",
+            "inference_timestamp": "stage2_timestamp",
+            "classification": "stage2_classification",
+            "max_probability_score": "stage2_confidence",
+            "should_forward": "stage2_should_forward",
+        })
+    
+    def cursor(self) -> "SimulatedCursor":
+        return SimulatedCursor(self)
+
+
+class SimulatedCursor(FakeArrowCursor):
+    """Arrow cursor whose results come from a SimulatedWarehouse."""
+    
+    def __init__(self, warehouse: SimulatedWarehouse):
+        super().__init__(pa.table({}))
+        self._warehouse = warehouse
+    
+    def execute(self, operation: str, parameters=None):
+        self._table = pa.Table.from_pandas(self._warehouse.execute(operation, parameters), preserve_index=False)
+        self._pos = 0
+        return self
+
+
+def make_workload(n_queries: int, seed: int = 7) -> list:
+    """Linked queries with varied filters, spread over QUERY_DAYS."""
+    rng = random.Random(seed)
+    workload = []
+    for i in range(n_queries):
+        filters = {"date_str": QUERY_DAYS[i % len(QUERY_DAYS)], "limit": 200}
+        kind = rng.choice(["camera", "farm", "window", "forwarded"])
+        if kind == "camera":
+            filters["camera_id"] = f"camera-{rng.randrange(400):04d}"
+        elif kind == "farm":
+            filters["farm_id"] = f"farm-{rng.randrange(20):03d}"
+        elif kind == "window":
+            hour = rng.randrange(23)
+            filters["start_time"], filters["end_time"] = f"{hour:02d}:00", f"{hour + 1:02d}:00"
+        else:
+            filters["farm_id"] = f"farm-{rng.randrange(20):03d}"
+            filters["should_forward_only"] = True
+        workload.append(filters)
+    return workload
+
+
+def run_mode(mode: str, stage1, stage2, workload: list, statement_ms: float, scan_us_per_row: float) -> dict:
+    """Run the workload in one linkage mode with empty caches."""
+    warehouse = SimulatedWarehouse(stage1, stage2, statement_ms, scan_us_per_row)
+    pool = DatabricksConnectionPool(connection_factory=lambda: FakeConnection(cursor_factory=warehouse.cursor))
+    service = DatabricksQueryService(
+        pool=pool,
+        result_cache=QueryResultCache(),
+        disk_cache=ParquetResultCache(cache_dir=Path(tempfile.mkdtemp())),
+        flights=SingleFlight(),
+    )
+    
+    original_mode, original_table = settings.linkage_mode, settings.linkage_table_enabled
+    # Compare the two joins; the simulator has no materialized linkage table
+    settings.linkage_mode, settings.linkage_table_enabled = mode, False
+    results = []
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for filters in workload:
+                results.append(service.query_stage1_stage2_linked(**filters))
+    finally:
+        settings.linkage_mode, settings.linkage_table_enabled = original_mode, original_table
+    # The simulator's own work stands in for the warehouse, whose modeled cost is counted instead
+    local_s = time.perf_counter() - start - warehouse.real_s
+    return {
+        'mode': mode,
+        'statements': warehouse.statements,
+        'rows_scanned': warehouse.rows_scanned,
+        'warehouse_s': warehouse.simulated_s,
+        'local_s': local_s,
+        'total_s': warehouse.simulated_s + local_s,
+        'results': results,
+    }
+
+
+def run(rows_per_day: int = 20000, queries: int = 30, statement_ms: float = 300.0, scan_us_per_row: float = 1.0) -> dict:
+    """
+    Run the workload in both modes and check the results agree.
+    
+    Args:
+        rows_per_day: Stage 1 rows per day.
+        queries: Linked queries in the workload.
+        statement_ms: Simulated fixed cost per statement.
+        scan_us_per_row: Simulated cost per row scanned.
+    """
+    stage1, stage2 = make_stage_tables(rows_per_day, TABLE_DAYS)
+    workload = make_workload(queries)
+    sql = run_mode("sql", stage1, stage2, workload, statement_ms, scan_us_per_row)
+    client = run_mode("client", stage1, stage2, workload, statement_ms, scan_us_per_row)
+    
+    def comparable(df: pd.DataFrame) -> list:
+        keys = df[["session_id", "stage2_inference_id"]].astype(object)
+        return list(keys.where(keys.notna(), None).itertuples(index=False, name=None))
+    
+    mismatches = sum(comparable(a) != comparable(b) for a, b in zip(sql.pop('results'), client.pop('results')))
+    return {'rows_per_day': rows_per_day, 'queries': queries, 'sql': sql, 'client': client, 'mismatches': mismatches}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows-per-day", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=30)
+    parser.add_argument("--statement-ms", type=float, default=300.0)
+    parser.add_argument("--scan-us-per-row", type=float, default=1.0)
+    args = parser.parse_args()
+    
+    result = run(args.rows_per_day, args.queries, args.statement_ms, args.scan_us_per_row)
+    print(f"{result['queries']} linked queries over {len(QUERY_DAYS)} days, {result['rows_per_day']} Stage 1 rows/day:")
+    print(f"  {'mode':>6}  {'statements':>10}  {'rows scanned':>12}  {'warehouse s':>11}  {'local s':>7}  {'total s':>7}")
+    for mode in ("sql", "client"):
+        m = result[mode]
+        print(f"  {mode:>6}  {m['statements']:>10}  {m['rows_scanned']:>12}  {m['warehouse_s']:>11.2f}  "
+              f"{m['local_s']:>7.2f}  {m['total_s']:>7.2f}")
+    print(f"  client mode scans {result['sql']['rows_scanned'] / max(result['client']['rows_scanned'], 1):.1f}x fewer rows")
+    print(f"  results identical: {result['mismatches'] == 0} ({result['mismatches']} mismatching queries)")
+
+
+if __name__ == "__main__":
+    main()
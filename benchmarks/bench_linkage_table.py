@@ -0,0 +1,204 @@
+"""
+Benchmark: incremental MERGE into the linkage table, and reads from it vs the live join.
+
+Runs the real statements (DatabricksQueryBuilder in its DuckDB dialect)
+and LinkageTableService on the local platform's embedded engine, standing
+in for the warehouse, with synthetic Stage 1 and Stage 2 tables:
+
+1. An initial merge backfills all days but the last.
+2. The last day "arrives" and an incremental merge picks it up.
+3. A workload of linked queries over the covered days runs both as the
+   live join and from the table; the results are checked to be identical.
+   
+Requires the duckdb package.
+
+Usage:
+    python -m benchmarks.bench_linkage_table [--rows-per-day 20000] [--days 5] [--queries 30]
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Ensure parent directory is in path
+_parent = Path(__file__).resolve().parent.parent
+if str(_parent) not in sys.path:
+    sys.path.insert(0, str(_parent))
+
+from benchmarks.synthetic import make_stage_tables
+from config.settings import settings
+from infrastructure.databricks_client import DatabricksConnectionPool
+from infrastructure.warehouse_retry import WarehouseRetrier
+from services.databricks_query_builder import DUCKDB_DIALECT, DatabricksQueryBuilder
+from services.linkage_table_service import LinkageTableService
+
+try:
+    import duckdb
+    from infrastructure.local_sql_client import LocalSqlConnection
+except ImportError:  # pragma: no cover - optional benchmark dependency
+    duckdb = None
+
+
+def create_warehouse(stage1, stage2):
+    """An in-memory DuckDB database with the Stage 1 and Stage 2 tables under the configured names."""
+    database = duckdb.connect()
+    database.execute(f"ATTACH ':memory:' AS {settings.catalog_name}")
+    database.execute(f"CREATE SCHEMA {settings.catalog_name}.{settings.schema_name}")
+    database.register("stage1_arrivals", stage1)
+    database.register("stage2_arrivals", stage2)
+    database.execute(f"CREATE TABLE {settings.full_stage1_table} AS SELECT * FROM stage1_arrivals")
+    database.execute(f"CREATE TABLE {settings.full_stage2_table} AS SELECT * FROM stage2_arrivals")
+    database.unregister("stage1_arrivals")
+    database.unregister("stage2_arrivals")
+    return database
+
+
+def append_rows(database, stage1, stage2) -> None:
+    """Insert newly arrived Stage 1 and Stage 2 rows."""
+    database.register("stage1_arrivals", stage1)
+    database.register("stage2_arrivals", stage2)
+    database.execute(f"INSERT INTO {settings.full_stage1_table} SELECT * FROM stage1_arrivals")
+    database.execute(f"INSERT INTO {settings.full_stage2_table} SELECT * FROM stage2_arrivals")
+    database.unregister("stage1_arrivals")
+    database.unregister("stage2_arrivals")
+
+
+def make_workload(days: list, n_queries: int, seed: int = 7) -> list:
+    """Linked queries with varied filters, spread over the given days."""
+    rng = random.Random(seed)
+    workload = []
+    for i in range(n_queries):
+        filters = {"date_str": days[i % len(days)], "limit": 200}
+        kind = rng.choice(["camera", "farm", "window", "forwarded"])
+        if kind == "camera":
+            filters["camera_id"] = f"camera-{rng.randrange(400):04d}"
+        elif kind == "farm":
+            filters["farm_id"] = f"farm-{rng.randrange(20):03d}"
+        elif kind == "window":
+            hour = rng.randrange(23)
+            filters["start_time"], filters["end_time"] = f"{hour:02d}:00", f"{hour + 1:02d}:00"
+        else:
+            filters["farm_id"] = f"farm-{rng.randrange(20):03d}"
+            filters["should_forward_only"] = True
+        workload.append(filters)
+    return workload
+
+
+def _split_day(table, column: str, day: str):
+    """Rows of a table before and from the start of a day."""
+    values = table.column(column).to_pylist()
+    cutoff = datetime.fromisoformat(day)
+    before = [i for i, value in enumerate(values) if value < cutoff]
+    after = [i for i, value in enumerate(values) if value >= cutoff]
+    return table.take(before), table.take(after)
+
+
+def _timed_rows(connection: LocalSqlConnection, query):
+    start = time.perf_counter()
+    with connection.cursor() as cursor:
+        rows = cursor.execute(query.sql, query.parameters).fetchall()
+    return time.perf_counter() - start, rows
+
+
+def run(rows_per_day: int = 20000, n_days: int = 5, queries: int = 30) -> dict:
+    """
+    Backfill, merge a newly arrived day, and compare reads of the covered days.
+    
+    Args:
+        rows_per_day: Stage 1 rows per day.
+        n_days: Days of data; the last one arrives after the initial merge.
+        queries: Linked queries in the read workload.
+    """
+    first_day = date(2026, 1, 10)
+    days = [(first_day + timedelta(days=i)).isoformat() for i in range(n_days)]
+    stage1, stage2 = make_stage_tables(rows_per_day, days)
+    initial1, arrived1 = _split_day(stage1, "processing_timestamp", days[-1])
+    initial2, arrived2 = _split_day(stage2, "inference_timestamp", days[-1])
+    
+    database = create_warehouse(initial1, initial2)
+    connection = LocalSqlConnection(database)
+    builder = DatabricksQueryBuilder(dialect=DUCKDB_DIALECT)
+    tables = LinkageTableService(
+        pool=DatabricksConnectionPool(connection_factory=lambda: LocalSqlConnection(database)),
+        retrier=WarehouseRetrier(),
+        builder=builder,
+    )
+    
+    original = settings.linkage_backfill_days, settings.linkage_coverage_ttl
+    settings.linkage_backfill_days, settings.linkage_coverage_ttl = n_days, 0.0
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            initial = tables.merge(now=datetime.fromisoformat(days[-1]))
+            append_rows(database, arrived1, arrived2)
+            incremental = tables.merge(now=datetime.fromisoformat(days[-1]) + timedelta(days=1))
+        
+        # Days older than the merge lookback are served from the table
+        covered_days = []
+        for day in days:
+            range_start, range_end, _, _ = builder.linked_time_ranges(day)
+            if tables.covers(range_start, range_end):
+                covered_days.append(day)
+        
+        # With too few days none is older than the lookback, and there is nothing to compare
+        live_s, table_s, mismatches = [], [], 0
+        for filters in make_workload(covered_days, queries) if covered_days else []:
+            live_time, live_rows = _timed_rows(connection, builder.linked_results(**filters))
+            table_time, table_rows = _timed_rows(connection, builder.linked_results_from_table(**filters))
+            live_s.append(live_time)
+            table_s.append(table_time)
+            # Same rows in the same order (keys are enough: all other columns follow from them)
+            mismatches += [row[:1] + row[8:9] for row in live_rows] != [row[:1] + row[8:9] for row in table_rows]
+    finally:
+        settings.linkage_backfill_days, settings.linkage_coverage_ttl = original
+    
+    table_rows = database.execute(f"SELECT COUNT(*) FROM {settings.full_linkage_table}").fetchone()[0]
+    return {
+        'rows_per_day': rows_per_day,
+        'days': n_days,
+        'queries': queries,
+        'initial_merge': initial,
+        'incremental_merge': incremental,
+        'table_rows': table_rows,
+        'covered_days': covered_days,
+        'live_ms': statistics.median(live_s) * 1000 if live_s else 0.0,
+        'table_ms': statistics.median(table_s) * 1000 if table_s else 0.0,
+        'mismatches': mismatches,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows-per-day", type=int, default=20000)
+    parser.add_argument("--days", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=30)
+    args = parser.parse_args()
+    
+    if duckdb is None:
+        print("This benchmark needs the duckdb package: pip install duckdb")
+        sys.exit(1)
+    
+    result = run(args.rows_per_day, args.days, args.queries)
+    initial, incremental = result['initial_merge'], result['incremental_merge']
+    print(f"Linkage table over {result['days']} days, {result['rows_per_day']} Stage 1 rows/day (DuckDB stand-in):")
+    print(f"  initial merge:      {initial['duration_s']:>6.2f}s  since {initial['window_start']}  "
+          f"counts {initial['merge_counts']}")
+    print(f"  incremental merge:  {incremental['duration_s']:>6.2f}s  since {incremental['window_start']}  "
+          f"counts {incremental['merge_counts']}")
+    print(f"  table rows: {result['table_rows']}, covered days: {', '.join(result['covered_days']) or 'none'}")
+    if not result['covered_days']:
+        print(f"  no day is older than the {settings.linkage_merge_lookback_hours:g}h merge lookback, "
+              f"so no reads are served from the table; use more --days")
+        return
+    print(f"  {result['queries']} linked queries, median latency: live join {result['live_ms']:.1f} ms, "
+          f"table {result['table_ms']:.1f} ms ({result['live_ms'] / max(result['table_ms'], 1e-9):.1f}x)")
+    print(f"  results identical: {result['mismatches'] == 0} ({result['mismatches']} mismatching queries)")
+
+
+if __name__ == "__main__":
+    main()
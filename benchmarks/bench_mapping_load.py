@@ -0,0 +1,214 @@
+"""
+Benchmark: mapping load as one combined statement vs three statements.
+
+Loads the tenant_map, farm_map and farm_camera_map tables from the local
+platform's embedded DuckDB engine, standing in for the warehouse, with a
+simulated round trip added to every statement:
+
+- sequential: the previous load, three statements one after another on a
+  pooled connection (three round trips).
+- concurrent: the three statements issued at once on three pooled connections.
+- combined: DatabricksMappingService.reload(), one UNION ALL statement.
+
+All variants are checked to produce identical mappings.
+
+Requires the duckdb package.
+
+Usage:
+    python -m benchmarks.bench_mapping_load [--rtt-ms 50] [--cameras 20000] [--iterations 10]
+"""
+
+import argparse
+import contextlib
+import io
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Ensure parent directory is in path
+_parent = Path(__file__).resolve().parent.parent
+if str(_parent) not in sys.path:
+    sys.path.insert(0, str(_parent))
+
+from benchmarks.synthetic import make_mapping_tables
+from config.settings import settings
+from infrastructure.databricks_client import DatabricksConnectionPool
+from services.databricks_mapping_service import DatabricksMappingService, MappingSnapshot
+from services.databricks_query_builder import DUCKDB_DIALECT, DatabricksQueryBuilder
+
+try:
+    import duckdb
+    from infrastructure.local_sql_client import LocalSqlConnection, LocalSqlCursor
+except ImportError:  # pragma: no cover - optional benchmark dependency
+    duckdb = None
+
+# The statements the mapping service ran before they were combined (with the camera's farm_id added)
+_LEGACY_STATEMENTS = {
+    'tenant': "SELECT tenant_id, tenant_name, tenant_ui_url, tenant_slug FROM {prefix}.tenant_map "
+              "WHERE tenant_id IS NOT NULL AND tenant_id != 'tenant_id'",
+    'farm': "SELECT farm_id, farm_name, tenant_id FROM {prefix}.farm_map "
+            "WHERE farm_id IS NOT NULL AND farm_id != 'farm_id'",
+    'camera': "SELECT camera_id, camera_name, farm_id FROM {prefix}.farm_camera_map "
+              "WHERE camera_id IS NOT NULL AND camera_id != 'camera_id'",
+}
+
+
+class _RemoteCursor(LocalSqlCursor if duckdb else object):
+    """Local cursor that pays a simulated warehouse round trip per statement."""
+    
+    def __init__(self, database, rtt: float):
+        super().__init__(database)
+        self._rtt = rtt
+    
+    def execute(self, operation, parameters=None):
+        time.sleep(self._rtt)
+        return super().execute(operation, parameters)
+
+
+class _RemoteConnection(LocalSqlConnection if duckdb else object):
+    def __init__(self, database, rtt: float):
+        super().__init__(database)
+        self._rtt = rtt
+    
+    def cursor(self):
+        return _RemoteCursor(self._database, self._rtt)
+
+
+def create_warehouse(n_tenants: int, n_farms: int, n_cameras: int):
+    """An in-memory DuckDB database with the mapping tables under the configured names."""
+    database = duckdb.connect()
+    database.execute(f"ATTACH ':memory:' AS {settings.catalog_name}")
+    database.execute(f"CREATE SCHEMA {settings.catalog_name}.{settings.schema_name}")
+    for name, table in make_mapping_tables(n_tenants, n_farms, n_cameras).items():
+        database.register("mapping_rows", table)
+        database.execute(f"CREATE TABLE {settings.catalog_name}.{settings.schema_name}.{name} AS SELECT * FROM mapping_rows")
+        database.unregister("mapping_rows")
+    return database
+
+
+def _rows(pool: DatabricksConnectionPool, kind: str) -> list:
+    prefix = f"{settings.catalog_name}.{settings.schema_name}"
+    with pool.connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(_LEGACY_STATEMENTS[kind].format(prefix=prefix))
+            return cursor.fetchall()
+
+
+def _decode(tenant_rows: list, farm_rows: list, camera_rows: list) -> tuple:
+    """Mappings from the three legacy result sets, as the mapping service builds them."""
+    tenant_mapping = {
+        tenant_id: {'name': name or 'Unknown Tenant', 'ui_url': ui_url or '', 'slug': slug or ''}
+        for tenant_id, name, ui_url, slug in tenant_rows
+    }
+    farm_mapping = {
+        farm_id: {
+            'name': name or 'Unknown Farm',
+            'tenant_id': tenant_id or '',
+            'tenant_name': tenant_mapping.get(tenant_id, {}).get('name', 'Unknown Tenant') if tenant_id else 'Unknown Tenant',
+        }
+        for farm_id, name, tenant_id in farm_rows
+    }
+    camera_mapping = {
+        camera_id: {
+            'name': name or 'Unknown Camera',
+            'farm_id': farm_id or '',
+            'tenant_id': farm_mapping[farm_id]['tenant_id'] if farm_id in farm_mapping else '',
+        }
+        for camera_id, name, farm_id in camera_rows
+    }
+    # The service indexes every load; do the same so the variants compare like for like
+    MappingSnapshot(camera_mapping, farm_mapping, tenant_mapping)
+    return camera_mapping, farm_mapping, tenant_mapping
+
+
+def load_sequential(pool: DatabricksConnectionPool) -> tuple:
+    return _decode(_rows(pool, 'tenant'), _rows(pool, 'farm'), _rows(pool, 'camera'))
+
+
+def load_concurrent(pool: DatabricksConnectionPool, executor: ThreadPoolExecutor) -> tuple:
+    futures = [executor.submit(_rows, pool, kind) for kind in ('tenant', 'farm', 'camera')]
+    return _decode(*(future.result() for future in futures))
+
+
+def _timed(func, iterations: int) -> tuple:
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+def run(rtt_ms: float = 50.0, n_tenants: int = 20, n_farms: int = 1000, n_cameras: int = 20000,
+        iterations: int = 10) -> dict:
+    """
+    Time the three load variants and check they agree.
+    
+    Args:
+        rtt_ms: Simulated warehouse round trip per statement.
+        n_tenants: Rows in tenant_map.
+        n_farms: Rows in farm_map.
+        n_cameras: Rows in farm_camera_map.
+        iterations: Loads per variant; the median is reported.
+    """
+    database = create_warehouse(n_tenants, n_farms, n_cameras)
+    rtt = rtt_ms / 1000
+    pool = DatabricksConnectionPool(connection_factory=lambda: _RemoteConnection(database, rtt), max_size=3)
+    # Open the connections up front; connect cost is the same for every variant
+    pool.warm(3)
+    
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        service = DatabricksMappingService(
+            snapshot_path=Path(snapshot_dir) / "mappings.json",
+            pool=pool,
+            builder=DatabricksQueryBuilder(dialect=DUCKDB_DIALECT),
+        )
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            sequential_ms, sequential = _timed(lambda: load_sequential(pool), iterations)
+            concurrent_ms, concurrent = _timed(lambda: load_concurrent(pool, executor), iterations)
+            combined_ms, combined = _timed(lambda: service.reload(), iterations)
+        # Let the background snapshot writes finish before the directory goes away
+        for thread in threading.enumerate():
+            if thread.name == "mapping-snapshot":
+                thread.join()
+    
+    return {
+        'rtt_ms': rtt_ms,
+        'rows': n_tenants + n_farms + n_cameras,
+        'sequential_ms': sequential_ms,
+        'concurrent_ms': concurrent_ms,
+        'combined_ms': combined_ms,
+        'identical': sequential == concurrent == combined,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rtt-ms", type=float, default=50.0)
+    parser.add_argument("--tenants", type=int, default=20)
+    parser.add_argument("--farms", type=int, default=1000)
+    parser.add_argument("--cameras", type=int, default=20000)
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+    
+    if duckdb is None:
+        print("This benchmark needs the duckdb package: pip install duckdb")
+        sys.exit(1)
+    
+    result = run(args.rtt_ms, args.tenants, args.farms, args.cameras, args.iterations)
+    print(f"Mapping load, {result['rows']} rows, {result['rtt_ms']:.0f} ms simulated round trip "
+          f"(DuckDB stand-in, median of {args.iterations}):")
+    print(f"  sequential (3 statements):  {result['sequential_ms']:>8.1f} ms")
+    print(f"  concurrent (3 connections): {result['concurrent_ms']:>8.1f} ms")
+    print(f"  combined (1 statement):     {result['combined_ms']:>8.1f} ms  "
+          f"({result['sequential_ms'] / max(result['combined_ms'], 1e-9):.1f}x faster than sequential)")
+    print(f"  mappings identical: {result['identical']}")
+
+
+if __name__ == "__main__":
+    main()
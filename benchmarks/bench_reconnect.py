@@ -0,0 +1,109 @@
+"""
+Microbenchmark: cost of a Databricks reconnect before and after token caching.
+
+"Before" replays the legacy get_databricks_connection() sequence: build a
+WorkspaceClient, authenticate, connect, run a verification SELECT 1.
+"After" calls the current get_databricks_connection() with a warm
+DatabricksTokenProvider, which only pays for the connect handshake.
+
+Latencies are simulated by the stubbed SDK/connector in benchmarks.fakes.
+
+Usage:
+    python -m benchmarks.bench_reconnect [--iterations 20] [--rtt-ms 50]
+"""
+
+import argparse
+import contextlib
+import io
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Ensure parent directory is in path
+_parent = Path(__file__).resolve().parent.parent
+if str(_parent) not in sys.path:
+    sys.path.insert(0, str(_parent))
+
+from benchmarks.fakes import FakeCursor, FakeWorkspaceClient, make_fake_connect
+from infrastructure import databricks_client
+
+
+def _legacy_reconnect(rtt: float, fake_connect) -> None:
+    """Replay the pre-token-cache reconnect: SDK init + auth + connect + SELECT 1."""
+    client = FakeWorkspaceClient(init_latency=rtt, auth_latency=rtt)
+    access_token = client.config.authenticate()["Authorization"][7:]
+    connection = fake_connect(
+        server_hostname=client.config.host.replace("https://", ""),
+        http_path="/sql/1.0/warehouses/fake",
+        access_token=access_token,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 as test")
+        cursor.fetchone()
+
+
+def _time_calls(func, iterations: int) -> list:
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def run(iterations: int = 20, rtt_ms: float = 50.0) -> dict:
+    """
+    Run both reconnect variants and return latency summaries in milliseconds.
+    
+    Args:
+        iterations: Reconnects to time per variant.
+        rtt_ms: Simulated round-trip time of each SDK/connector call.
+    """
+    rtt = rtt_ms / 1000
+    fake_connect = make_fake_connect(
+        connect_latency=rtt,
+        cursor_factory=lambda: FakeCursor(query_latency=rtt),
+    )
+    
+    provider = databricks_client.DatabricksTokenProvider(
+        client_factory=lambda: FakeWorkspaceClient(init_latency=rtt, auth_latency=rtt),
+    )
+    original_connect = databricks_client.sql.connect
+    original_provider = databricks_client.databricks_token_provider
+    databricks_client.sql.connect = fake_connect
+    databricks_client.databricks_token_provider = provider
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            provider.get_token()  # Warm the cache, as after the first connection
+        before = _time_calls(lambda: _legacy_reconnect(rtt, fake_connect), iterations)
+        after = _time_calls(databricks_client.get_databricks_connection, iterations)
+    finally:
+        databricks_client.sql.connect = original_connect
+        databricks_client.databricks_token_provider = original_provider
+        provider.stop()
+    
+    return {
+        'rtt_ms': rtt_ms,
+        'before_p50_ms': statistics.median(before),
+        'after_p50_ms': statistics.median(after),
+        'speedup': statistics.median(before) / statistics.median(after),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--rtt-ms", type=float, default=50.0)
+    args = parser.parse_args()
+    
+    result = run(args.iterations, args.rtt_ms)
+    print(f"Reconnect cost with {result['rtt_ms']:.0f} ms simulated round trips:")
+    print(f"  Before (SDK init + auth + connect + SELECT 1): {result['before_p50_ms']:.1f} ms p50")
+    print(f"  After  (cached token + connect):               {result['after_p50_ms']:.1f} ms p50")
+    print(f"  Speedup: {result['speedup']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
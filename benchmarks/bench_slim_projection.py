@@ -0,0 +1,71 @@
+"""
+Benchmark: slim list projection vs the full linked-query projection.
+
+The list query leaves frame URI arrays and raw model responses out and
+loads them per row when one is selected. This compares, for a synthetic
+result set, the Arrow bytes transferred and the pandas memory held in
+the per-session AppState.query_results with and without those columns.
+
+Usage:
+    python -m benchmarks.bench_slim_projection [--rows 5000]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+# Ensure parent directory is in path
+_parent = Path(__file__).resolve().parent.parent
+if str(_parent) not in sys.path:
+    sys.path.insert(0, str(_parent))
+
+from benchmarks.synthetic import make_linked_results_table
+
+# Columns returned by DatabricksQueryBuilder.linked_results()
+SLIM_COLUMNS = [
+    "session_id", "farm_id", "camera_id", "stage1_timestamp", "stage1_category",
+    "stage1_confidence", "stage1_should_forward", "frame_count", "stage2_inference_id",
+    "stage2_timestamp", "stage2_classification", "stage2_confidence", "stage2_should_forward",
+    "video_gcs_path", "blk_file", "event_timestamp",
+]
+
+
+def run(n_rows: int = 5000) -> dict:
+    """
+    Measure both projections.
+    
+    Args:
+        n_rows: Result set size.
+    """
+    full = make_linked_results_table(n_rows)
+    slim = full.select(SLIM_COLUMNS)
+    
+    def measure(table) -> dict:
+        df = table.to_pandas(types_mapper=pd.ArrowDtype)
+        return {
+            'arrow_mb': table.nbytes / 1e6,
+            'pandas_mb': int(df.memory_usage(deep=True).sum()) / 1e6,
+        }
+    
+    return {'rows': n_rows, 'full': measure(full), 'slim': measure(slim)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    args = parser.parse_args()
+    
+    result = run(args.rows)
+    print(f"Linked results, {result['rows']} rows:")
+    print(f"  {'projection':>10}  {'arrow MB':>9}  {'pandas MB':>9}")
+    for label in ("full", "slim"):
+        m = result[label]
+        print(f"  {label:>10}  {m['arrow_mb']:>9.2f}  {m['pandas_mb']:>9.2f}")
+    ratio = result['full']['arrow_mb'] / result['slim']['arrow_mb']
+    print(f"  slim transfers {ratio:.1f}x fewer bytes")
+
+
+if __name__ == "__main__":
+    main()
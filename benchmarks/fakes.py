@@ -0,0 +1,203 @@
+"""Stand-ins for the Databricks SDK and SQL connector with simulated latency."""
+
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+
+class FakeSdkConfig:
+    """Mimics databricks.sdk.core.Config for token fetching."""
+    
+    def __init__(self, auth_latency: float = 0.0, token: str = "fake-token"):
+        self.host = "https://fake-workspace.cloud.databricks.com"
+        self.auth_type = "oauth-m2m"
+        self.client_id = "fake-client-id"
+        self._auth_latency = auth_latency
+        self._token = token
+        self.authenticate_calls = 0
+    
+    def authenticate(self) -> Dict[str, str]:
+        self.authenticate_calls += 1
+        time.sleep(self._auth_latency)
+        return {"Authorization": f"Bearer {self._token}"}
+
+
+class FakeWorkspaceClient:
+    """Mimics databricks.sdk.WorkspaceClient; construction resolves config."""
+    
+    def __init__(self, init_latency: float = 0.0, auth_latency: float = 0.0):
+        time.sleep(init_latency)
+        self.config = FakeSdkConfig(auth_latency=auth_latency)
+
+
+class FakeCursor:
+    """
+    Mimics a databricks-sql-connector cursor over an in-memory result set.
+    
+    Args:
+        columns: Column names reported in ``description``.
+        rows: Rows returned by the fetch methods.
+        query_latency: Seconds each execute() sleeps.
+    """
+    
+    def __init__(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        rows: Optional[List[tuple]] = None,
+        query_latency: float = 0.0,
+    ):
+        self._columns = list(columns or ["test"])
+        self._rows = rows if rows is not None else [(1,)]
+        self._query_latency = query_latency
+        self._pos = 0
+        self.executed: List[str] = []
+        self.cancelled = False
+    
+    @property
+    def description(self):
+        return [(name, None, None, None, None, None, None) for name in self._columns]
+    
+    def execute(self, operation: str, parameters: Any = None):
+        self.executed.append(operation)
+        self._pos = 0
+        time.sleep(self._query_latency)
+        return self
+    
+    def fetchone(self):
+        if self._pos >= len(self._rows):
+            return None
+        row = self._rows[self._pos]
+        self._pos += 1
+        return row
+    
+    def fetchmany(self, size: int = 1):
+        rows = self._rows[self._pos:self._pos + size]
+        self._pos += len(rows)
+        return rows
+    
+    def fetchall(self):
+        rows = self._rows[self._pos:]
+        self._pos = len(self._rows)
+        return rows
+    
+    def cancel(self):
+        self.cancelled = True
+    
+    def close(self):
+        pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class FakeArrowCursor(FakeCursor):
+    """
+    FakeCursor backed by a pyarrow Table, exposing the connector's Arrow fetch API.
+    
+    fetchall()/fetchmany() convert to row tuples, as the real connector does
+    when building Row objects from its Arrow batches.
+    """
+    
+    def __init__(self, table, query_latency: float = 0.0):
+        super().__init__(columns=table.column_names, rows=[], query_latency=query_latency)
+        self._table = table
+    
+    def _to_rows(self, table) -> List[tuple]:
+        return list(zip(*[column.to_pylist() for column in table.columns]))
+    
+    def fetchall_arrow(self):
+        table = self._table.slice(self._pos)
+        self._pos = self._table.num_rows
+        return table
+    
+    def fetchmany_arrow(self, size: int = 1):
+        table = self._table.slice(self._pos, size)
+        self._pos += table.num_rows
+        return table
+    
+    def fetchall(self):
+        return self._to_rows(self.fetchall_arrow())
+    
+    def fetchmany(self, size: int = 1):
+        return self._to_rows(self.fetchmany_arrow(size))
+    
+    def fetchone(self):
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+
+class FakeConnection:
+    """Mimics a databricks-sql-connector connection."""
+    
+    def __init__(self, cursor_factory=None):
+        self.open = True
+        self._cursor_factory = cursor_factory or FakeCursor
+    
+    def cursor(self):
+        return self._cursor_factory()
+    
+    def close(self):
+        self.open = False
+
+
+def make_fake_connect(connect_latency: float = 0.0, cursor_factory=None):
+    """Build a replacement for ``databricks.sql.connect`` that sleeps like a handshake."""
+    def fake_connect(**kwargs):
+        time.sleep(connect_latency)
+        return FakeConnection(cursor_factory=cursor_factory)
+    return fake_connect
+
+
+class FakeBlob:
+    """Mimics google.cloud.storage.Blob for objects held in a FakeStorageClient."""
+    
+    def __init__(self, client: "FakeStorageClient", uri: str):
+        self._client = client
+        self._uri = uri
+    
+    def exists(self) -> bool:
+        return self._uri in self._client.objects
+    
+    def download_as_bytes(self) -> bytes:
+        self._client.downloads += 1
+        time.sleep(self._client.download_latency)
+        try:
+            return self._client.objects[self._uri]
+        except KeyError:
+            raise FileNotFoundError(f"No such object: {self._uri}") from None
+    
+    def download_to_filename(self, filename: str) -> None:
+        with open(filename, "wb") as f:
+            f.write(self.download_as_bytes())
+
+
+class FakeBucket:
+    """Mimics google.cloud.storage.Bucket."""
+    
+    def __init__(self, client: "FakeStorageClient", name: str):
+        self._client = client
+        self.name = name
+    
+    def blob(self, blob_name: str) -> FakeBlob:
+        return FakeBlob(self._client, f"gs://{self.name}/{blob_name}")
+
+
+class FakeStorageClient:
+    """
+    Local blob store standing in for google.cloud.storage.Client.
+    
+    Args:
+        objects: Object bytes by gs:// URI.
+        download_latency: Seconds each download sleeps.
+    """
+    
+    def __init__(self, objects: Optional[Dict[str, bytes]] = None, download_latency: float = 0.0):
+        self.objects = dict(objects or {})
+        self.download_latency = download_latency
+        self.downloads = 0
+    
+    def bucket(self, bucket_name: str) -> FakeBucket:
+        return FakeBucket(self, bucket_name)
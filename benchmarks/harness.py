@@ -0,0 +1,141 @@
+"""Latency, throughput and memory measurement for benchmark scenarios, with JSON results and regression checks."""
+
+import gc
+import json
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import pyarrow as pa
+
+# Differences below these are noise, whatever the relative change
+_NOISE_FLOOR = {'p50_ms': 1.0, 'p95_ms': 2.0, 'peak_mb': 1.0}
+
+
+def _percentile(values: List[float], percent: int) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[percent - 1]
+
+
+def measure(func: Callable[[], Any], repeats: int = 20, warmup: int = 1, items: int = 1) -> Dict[str, float]:
+    """
+    Time repeated calls of a scenario, then measure its peak memory in a separate call.
+    
+    Timing runs without tracemalloc, which slows allocation-heavy code.
+    Peak memory is the Python/NumPy peak seen by tracemalloc plus the Arrow
+    buffers still held by the call's result.
+    
+    Args:
+        func: Zero-argument callable running the scenario once.
+        repeats: Timed calls.
+        warmup: Untimed calls first (imports, caches, lazy initialization).
+        items: Work items per call (e.g. rows), for throughput.
+        
+    Returns:
+        Dict with p50_ms, p95_ms, mean_ms, throughput_per_s (items per second
+        at the median), peak_mb, repeats and items
+    """
+    for _ in range(warmup):
+        func()
+    
+    latencies = []
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+    
+    gc.collect()
+    arrow_before = pa.total_allocated_bytes()
+    tracemalloc.start()
+    result = func()
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    arrow_held = max(pa.total_allocated_bytes() - arrow_before, 0)
+    del result
+    
+    p50 = statistics.median(latencies)
+    return {
+        'p50_ms': p50 * 1000,
+        'p95_ms': _percentile(latencies, 95) * 1000,
+        'mean_ms': statistics.fmean(latencies) * 1000,
+        'throughput_per_s': items / p50 if p50 > 0 else float("inf"),
+        'peak_mb': (python_peak + arrow_held) / 1e6,
+        'repeats': repeats,
+        'items': items,
+    }
+
+
+def environment() -> Dict[str, Any]:
+    """Where and on what code a run happened, so results can be compared like for like."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+    }
+
+
+def write_results(path: Path, results: Dict[str, Dict[str, float]], config: Dict[str, Any]) -> None:
+    """Write a run's results as JSON: {"environment", "config", "scenarios": {name: metrics}}."""
+    payload = {'environment': environment(), 'config': config, 'scenarios': results}
+    Path(path).write_text(json.dumps(payload, indent=2, sort_keys=True))
+
+
+def load_results(path: Path) -> Dict[str, Dict[str, float]]:
+    """Scenario metrics of a JSON file written by write_results()."""
+    return json.loads(Path(path).read_text())['scenarios']
+
+
+def compare(
+    current: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float = 0.10,
+    metrics: tuple = ("p50_ms", "p95_ms", "peak_mb")
+) -> List[Dict[str, Any]]:
+    """
+    Find scenarios that got slower or hungrier than the baseline.
+    
+    Only scenarios present in both runs are compared. A metric regresses
+    when it grows by more than threshold (relative) and by more than its
+    noise floor (absolute).
+    
+    Args:
+        current: Scenario metrics of this run.
+        baseline: Scenario metrics of the run to compare against.
+        threshold: Allowed relative increase, e.g. 0.10 for 10%.
+        metrics: Metrics to check (all lower-is-better).
+        
+    Returns:
+        List of {scenario, metric, baseline, current, change} dicts, change relative
+    """
+    regressions = []
+    for name in sorted(current.keys() & baseline.keys()):
+        for metric in metrics:
+            old, new = baseline[name].get(metric), current[name].get(metric)
+            if old is None or new is None or old <= 0:
+                continue
+            change = new / old - 1
+            if change > threshold and new - old > _NOISE_FLOOR.get(metric, 0.0):
+                regressions.append({
+                    'scenario': name,
+                    'metric': metric,
+                    'baseline': old,
+                    'current': new,
+                    'change': change,
+                })
+    return regressions
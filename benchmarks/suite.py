@@ -0,0 +1,238 @@
+"""
+Benchmark suite: reproducible scenarios for the query, formatting and media paths.
+
+Every scenario runs on synthetic data (benchmarks.synthetic) against
+in-process stand-ins (benchmarks.fakes), so results depend on this code and
+this machine only:
+
+- linked_query/<rows>: DatabricksQueryService.query_stage1_stage2_linked
+  building its DataFrame from a fake cursor (caches off).
+- format/<rows>: ui.formatters.format_results_for_display with loaded mappings.
+- row_details: DatabricksQueryService.get_row_details end to end (result cache off).
+- gif/<frames>: MediaService.create_animated_gif_from_frames with generated
+  720p JPEG frames served by a local blob store.
+  
+Each reports p50/p95 latency, throughput and peak memory. Results are
+written as JSON; given a baseline file from an earlier run, regressions
+beyond the threshold are listed and the run exits with status 1.
+
+Usage:
+    python -m benchmarks.suite [--quick] [--scenarios linked_query format]
+        [--output results.json] [--baseline previous.json] [--threshold 0.10]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import pyarrow as pa
+
+# Ensure parent directory is in path
+_parent = Path(__file__).resolve().parent.parent
+if str(_parent) not in sys.path:
+    sys.path.insert(0, str(_parent))
+
+from benchmarks.fakes import FakeArrowCursor, FakeConnection, FakeStorageClient
+from benchmarks.harness import compare, load_results, measure, write_results
+from benchmarks.synthetic import make_jpeg_frames, make_linked_results_table, make_mapping_tables
+from config.settings import settings
+from infrastructure.databricks_client import DatabricksConnectionPool
+from services.databricks_mapping_service import MappingSnapshot, databricks_mapping_service
+from services.databricks_query_builder import LINKED_COLUMNS
+from services.databricks_query_service import DatabricksQueryService
+from services.media_service import MediaService
+from services.parquet_result_cache import ParquetResultCache
+from services.query_result_cache import QueryResultCache
+from ui.formatters import format_results_for_display
+
+# Larger tables repeat a generated block; content variety doesn't change the cost measured
+_BLOCK_ROWS = 50_000
+
+# (row counts or frame counts, repeats) per scenario, full and --quick
+_SIZES = {
+    'linked_query': ([1_000, 10_000, 100_000, 1_000_000], [1_000, 10_000]),
+    'format': ([100, 10_000, 100_000, 1_000_000], [100, 10_000]),
+    'row_details': ([1], [1]),
+    'gif': ([8, 24], [8]),
+}
+_REPEATS = {'full': 20, 'quick': 5, 'large': 5}
+_LARGE_ROWS = 100_000
+
+
+def _table(n_rows: int) -> pa.Table:
+    if n_rows <= _BLOCK_ROWS:
+        return make_linked_results_table(n_rows)
+    block = make_linked_results_table(_BLOCK_ROWS)
+    return pa.concat_tables([block] * -(-n_rows // _BLOCK_ROWS)).slice(0, n_rows)
+
+
+def _query_service(cursor_factory: Callable[[], FakeArrowCursor], cache_dir: Path) -> DatabricksQueryService:
+    """A query service on fake connections, with both result caches effectively off."""
+    return DatabricksQueryService(
+        pool=DatabricksConnectionPool(connection_factory=lambda: FakeConnection(cursor_factory=cursor_factory)),
+        result_cache=QueryResultCache(max_bytes=0),
+        disk_cache=ParquetResultCache(cache_dir=cache_dir, max_bytes=0),
+    )
+
+
+def _quiet(func: Callable) -> Callable:
+    """The scenario without the services' progress output."""
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func()
+    return run
+
+
+def linked_query_scenarios(sizes: List[int], cache_dir: Path) -> Dict[str, Tuple[Callable, int]]:
+    today = datetime.now(timezone.utc).date().isoformat()
+    scenarios = {}
+    for n_rows in sizes:
+        table = _table(n_rows).select(LINKED_COLUMNS)
+        service = _query_service(lambda table=table: FakeArrowCursor(table), cache_dir)
+        scenarios[f"linked_query/{n_rows}"] = (
+            _quiet(lambda service=service, n_rows=n_rows: service.query_stage1_stage2_linked(today, limit=n_rows)),
+            n_rows,
+        )
+    return scenarios
+
+
+def format_scenarios(sizes: List[int]) -> Dict[str, Tuple[Callable, int]]:
+    # Mappings as loaded from the warehouse (400 cameras, 20 farms, 3 tenants)
+    mappings = {name: table.to_pylist() for name, table in make_mapping_tables().items()}
+    tenants = {row['tenant_id']: {'name': row['tenant_name'], 'ui_url': row['tenant_ui_url'], 'slug': row['tenant_slug']}
+               for row in mappings['tenant_map']}
+    farms = {
+        row['farm_id']: {'name': row['farm_name'], 'tenant_id': row['tenant_id'],
+                         'tenant_name': tenants[row['tenant_id']]['name']}
+        for row in mappings['farm_map']
+    }
+    cameras = {
+        row['camera_id']: {'name': row['camera_name'], 'farm_id': row['farm_id'],
+                           'tenant_id': farms[row['farm_id']]['tenant_id']}
+        for row in mappings['farm_camera_map']
+    }
+    databricks_mapping_service._publish(MappingSnapshot(cameras, farms, tenants))
+    
+    scenarios = {}
+    for n_rows in sizes:
+        df = _table(n_rows).select(LINKED_COLUMNS).to_pandas()
+        scenarios[f"format/{n_rows}"] = (lambda df=df: format_results_for_display(df), n_rows)
+    return scenarios
+
+
+def row_details_scenarios(cache_dir: Path) -> Dict[str, Tuple[Callable, int]]:
+    row = make_linked_results_table(1)
+    details = row.select(["frame_uris", "stage1_raw_response", "stage2_raw_response"])
+    service = _query_service(lambda: FakeArrowCursor(details), cache_dir)
+    session_id = row.column("session_id")[0].as_py()
+    stage2_inference_id = row.column("stage2_inference_id")[0].as_py()
+    stage1_timestamp = row.column("stage1_timestamp")[0].as_py()
+    return {
+        'row_details': (
+            _quiet(lambda: service.get_row_details(session_id, stage2_inference_id, stage1_timestamp)),
+            1,
+        ),
+    }
+
+
+def gif_scenarios(sizes: List[int]) -> Dict[str, Tuple[Callable, int]]:
+    scenarios = {}
+    for n_frames in sizes:
+        frames = make_jpeg_frames(n_frames)
+        media = MediaService(client=FakeStorageClient(frames))
+        
+        def create_gif(media=media, uris=list(frames)):
+            path = media.create_animated_gif_from_frames(uris)
+            if path:
+                os.unlink(path)
+            return path
+        
+        scenarios[f"gif/{n_frames}"] = (_quiet(create_gif), n_frames)
+    return scenarios
+
+
+def build_scenarios(names: List[str], quick: bool, cache_dir: Path) -> Dict[str, Tuple[Callable, int]]:
+    """Scenario callables and their work items (rows or frames), by scenario name."""
+    sizes = {name: full_and_quick[1] if quick else full_and_quick[0] for name, full_and_quick in _SIZES.items()}
+    scenarios = {}
+    if "linked_query" in names:
+        scenarios.update(linked_query_scenarios(sizes['linked_query'], cache_dir))
+    if "format" in names:
+        scenarios.update(format_scenarios(sizes['format']))
+    if "row_details" in names:
+        scenarios.update(row_details_scenarios(cache_dir))
+    if "gif" in names:
+        scenarios.update(gif_scenarios(sizes['gif']))
+    return scenarios
+
+
+def run(names: List[str], quick: bool = False) -> Dict[str, Dict[str, float]]:
+    """
+    Run the selected scenarios.
+    
+    Args:
+        names: Scenario groups (keys of _SIZES).
+        quick: Smaller sizes and fewer repeats, for a fast check.
+        
+    Returns:
+        Metrics from harness.measure() by scenario name
+    """
+    original_enabled = settings.linkage_table_enabled
+    original_mode = settings.linkage_mode
+    # The live SQL join path: no linkage table lookups against the fake warehouse
+    settings.linkage_table_enabled, settings.linkage_mode = False, "sql"
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            for name, (func, items) in build_scenarios(names, quick, Path(cache_dir)).items():
+                repeats = _REPEATS['quick' if quick else 'full']
+                if items >= _LARGE_ROWS:
+                    repeats = _REPEATS['large']
+                results[name] = measure(func, repeats=repeats, items=items)
+                _print_result(name, results[name])
+    finally:
+        settings.linkage_table_enabled, settings.linkage_mode = original_enabled, original_mode
+    return results
+
+
+def _print_result(name: str, metrics: Dict[str, float]) -> None:
+    print(f"  {name:<24} p50 {metrics['p50_ms']:>9.2f} ms  p95 {metrics['p95_ms']:>9.2f} ms  "
+          f"{metrics['throughput_per_s']:>12,.0f}/s  peak {metrics['peak_mb']:>8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scenarios", nargs="+", choices=list(_SIZES), default=list(_SIZES))
+    parser.add_argument("--quick", action="store_true", help="smaller sizes and fewer repeats")
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative increase (default 0.10)")
+    args = parser.parse_args()
+    
+    print(f"Benchmark suite ({'quick' if args.quick else 'full'}): {', '.join(args.scenarios)}")
+    results = run(args.scenarios, args.quick)
+    
+    if args.output:
+        write_results(args.output, results, {'scenarios': args.scenarios, 'quick': args.quick})
+        print(f"✓ Results written to {args.output}")
+    
+    if args.baseline:
+        regressions = compare(results, load_results(args.baseline), args.threshold)
+        if not regressions:
+            print(f"✓ No regressions against {args.baseline} (threshold {args.threshold:.0%})")
+            return
+        print(f"✗ {len(regressions)} regression(s) against {args.baseline} (threshold {args.threshold:.0%}):")
+        for regression in regressions:
+            print(f"  {regression['scenario']:<24} {regression['metric']:<8} "
+                  f"{regression['baseline']:.2f} -> {regression['current']:.2f} (+{regression['change']:.0%})")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
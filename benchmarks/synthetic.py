@@ -0,0 +1,342 @@
+"""
+Synthetic, reproducible query results shaped like the dashboard's real tables.
+
+Also writes a complete local dataset (Stage 1, Stage 2 and the mapping
+tables as Parquet) for the "local" platform:
+
+    python -m benchmarks.synthetic --out local_data --rows-per-day 20000 --days 7
+    APP_PLATFORM=local LOCAL_DATA_DIR=local_data python databricks_app.py
+"""
+
+import argparse
+import io
+import json
+import random
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Ensure parent directory is in path
+_parent = Path(__file__).resolve().parent.parent
+if str(_parent) not in sys.path:
+    sys.path.insert(0, str(_parent))
+
+from config.settings import settings
+
+CATEGORIES = ["animal_husbandry", "down_cow", "quick_movements", "no_event"]
+CLASSIFICATIONS = ["down_cow", "calving", "normal_activity", "no_event"]
+
+
+def _raw_response(rng: random.Random, category: str) -> str:
+    """A Gemini-style raw JSON response of realistic size (~1 KB)."""
+    return json.dumps({
+        "category": category,
+        "reasoning": " ".join(rng.choice(["cow", "pen", "frame", "movement", "lying", "standing"]) for _ in range(120)),
+        "probabilities": {c: round(rng.random(), 4) for c in CATEGORIES},
+    })
+
+
+def make_linked_results_table(n_rows: int, seed: int = 42, date_str: str = "2026-01-14") -> pa.Table:
+    """
+    Build a table with every linked-query column, including the heavy detail
+    columns (frame_uris, raw responses) that the list query now leaves to
+    DatabricksQueryService.get_row_details.
+    
+    Args:
+        n_rows: Number of rows.
+        seed: Random seed, so runs are comparable.
+        date_str: Day the Stage 1 timestamps fall on.
+    
+    Returns:
+        pyarrow Table
+    """
+    rng = random.Random(seed)
+    day_start = datetime.fromisoformat(date_str)
+    farms = [f"farm-{i:03d}" for i in range(20)]
+    cameras = [f"camera-{i:04d}" for i in range(400)]
+    
+    columns = {name: [] for name in [
+        "session_id", "farm_id", "camera_id", "stage1_timestamp", "stage1_category",
+        "stage1_confidence", "stage1_should_forward", "frame_uris", "trigger_frame_uri",
+        "frame_count", "probability_animal_husbandry", "probability_down_cow",
+        "probability_quick_movements", "probability_no_event", "stage1_raw_response",
+        "stage2_inference_id", "stage2_timestamp", "stage2_classification", "stage2_confidence",
+        "stage2_should_forward", "video_gcs_path", "video_filename", "stage2_raw_response",
+        "blk_file", "event_timestamp", "video_url_derived",
+    ]}
+    
+    for i in range(n_rows):
+        camera_id = rng.choice(cameras)
+        ts = day_start + timedelta(seconds=rng.randrange(86400))
+        ts_key = ts.strftime("%Y-%m-%dT%H:%M:%S")
+        blk_file = f"{rng.randrange(1000):03d}_{rng.randrange(10_000_000):07d}"
+        n_frames = rng.randint(4, 12)
+        frame_uris = [
+            f"gs://animal-welfare-staging/frames-to-analyze/{camera_id}/{blk_file}_{ts_key}_{f}.jpg"
+            for f in range(n_frames)
+        ]
+        category = rng.choice(CATEGORIES)
+        forwarded = rng.random() < 0.3
+        video_path = frame_uris[0].replace("frames-to-analyze", "video-to-analyze").replace(".jpg", ".mp4")
+        
+        columns["session_id"].append(f"session-{seed}-{i:08d}")
+        columns["farm_id"].append(farms[cameras.index(camera_id) % len(farms)])
+        columns["camera_id"].append(camera_id)
+        columns["stage1_timestamp"].append(ts)
+        columns["stage1_category"].append(category)
+        columns["stage1_confidence"].append(rng.random())
+        columns["stage1_should_forward"].append(forwarded)
+        columns["frame_uris"].append(frame_uris)
+        columns["trigger_frame_uri"].append(frame_uris[0])
+        columns["frame_count"].append(n_frames)
+        for prob in ("probability_animal_husbandry", "probability_down_cow",
+                     "probability_quick_movements", "probability_no_event"):
+            columns[prob].append(rng.random())
+        columns["stage1_raw_response"].append(_raw_response(rng, category))
+        columns["stage2_inference_id"].append(f"inference-{i:08d}" if forwarded else None)
+        columns["stage2_timestamp"].append(ts + timedelta(seconds=rng.randint(5, 120)) if forwarded else None)
+        columns["stage2_classification"].append(rng.choice(CLASSIFICATIONS) if forwarded else None)
+        columns["stage2_confidence"].append(rng.random() if forwarded else None)
+        columns["stage2_should_forward"].append(rng.random() < 0.5 if forwarded else None)
+        columns["video_gcs_path"].append(video_path if forwarded else None)
+        columns["video_filename"].append(f"{blk_file}_{ts_key}.mp4" if forwarded else None)
+        columns["stage2_raw_response"].append(_raw_response(rng, category) if forwarded else None)
+        columns["blk_file"].append(blk_file)
+        columns["event_timestamp"].append(ts_key)
+        columns["video_url_derived"].append(video_path)
+    
+    return pa.table(columns)
+
+
+def make_stage_tables(
+    n_rows_per_day: int,
+    days: List[str],
+    seed: int = 42,
+    n_farms: int = 20,
+    n_cameras: int = 400,
+    raw_responses: bool = False
+) -> Tuple[pa.Table, pa.Table]:
+    """
+    Build raw Stage 1 and Stage 2 tables (warehouse column names) for the given days.
+    
+    About 30% of Stage 1 sessions are forwarded and get a Stage 2 inference
+    a few seconds to two minutes later (sometimes on the next day); Stage 2
+    also holds unrelated inferences, so not every row joins. Camera i
+    belongs to farm i % n_farms, as in make_mapping_tables().
+    
+    Args:
+        n_rows_per_day: Stage 1 rows per day.
+        days: Dates (YYYY-MM-DD) to generate.
+        seed: Random seed, so runs are comparable.
+        n_farms: Number of farms.
+        n_cameras: Number of cameras.
+        raw_responses: Also generate the raw model response columns
+            (gemini_raw_response, model_votes; ~1 KB per row) read by row details.
+            
+    Returns:
+        Tuple of (stage1, stage2) pyarrow Tables
+    """
+    rng = random.Random(seed)
+    farms = [f"farm-{i:03d}" for i in range(n_farms)]
+    cameras = [f"camera-{i:04d}" for i in range(n_cameras)]
+    
+    stage1 = {name: [] for name in [
+        "session_id", "farm_id", "camera_id", "processing_timestamp", "highest_probability_category",
+        "highest_probability_value", "should_forward", "frame_uris",
+    ] + (["gemini_raw_response"] if raw_responses else [])}
+    stage2 = {name: [] for name in [
+        "inference_id", "camera_id", "inference_timestamp", "classification",
+        "max_probability_score", "should_forward", "video_gcs_path", "file_name",
+    ] + (["model_votes"] if raw_responses else [])}
+    
+    def add_stage2(camera_id: str, ts: datetime, blk_file: str, ts_key: str) -> None:
+        file_name = f"{blk_file}_{ts_key}.mp4"
+        stage2["inference_id"].append(f"inference-{seed}-{len(stage2['inference_id']):08d}")
+        stage2["camera_id"].append(camera_id)
+        stage2["inference_timestamp"].append(ts)
+        stage2["classification"].append(rng.choice(CLASSIFICATIONS))
+        stage2["max_probability_score"].append(rng.random())
+        stage2["should_forward"].append(rng.random() < 0.5)
+        stage2["video_gcs_path"].append(f"gs://animal-welfare-staging/video-to-analyze/{camera_id}/{file_name}")
+        stage2["file_name"].append(file_name)
+        if raw_responses:
+            stage2["model_votes"].append(_raw_response(rng, stage2["classification"][-1]))
+    
+    for date_str in days:
+        day_start = datetime.fromisoformat(date_str)
+        for i in range(n_rows_per_day):
+            camera_index = rng.randrange(len(cameras))
+            camera_id = cameras[camera_index]
+            ts = day_start + timedelta(seconds=rng.randrange(86400))
+            ts_key = ts.strftime("%Y-%m-%dT%H:%M:%S")
+            blk_file = f"{rng.randrange(1000):03d}_{rng.randrange(10_000_000):07d}"
+            forwarded = rng.random() < 0.3
+            category = rng.choice(CATEGORIES)
+            
+            stage1["session_id"].append(f"session-{date_str}-{i:08d}")
+            stage1["farm_id"].append(farms[camera_index % len(farms)])
+            stage1["camera_id"].append(camera_id)
+            stage1["processing_timestamp"].append(ts)
+            stage1["highest_probability_category"].append(category)
+            stage1["highest_probability_value"].append(rng.random())
+            stage1["should_forward"].append(forwarded)
+            stage1["frame_uris"].append([
+                f"gs://animal-welfare-staging/frames-to-analyze/{camera_id}/{blk_file}_{ts_key}_{f}.jpg"
+                for f in range(rng.randint(4, 12))
+            ])
+            if raw_responses:
+                stage1["gemini_raw_response"].append(_raw_response(rng, category))
+            if forwarded:
+                add_stage2(camera_id, ts + timedelta(seconds=rng.randint(5, 120)), blk_file, ts_key)
+            if rng.random() < 0.1:
+                # Inference with no Stage 1 session in the data (e.g. a manual upload)
+                noise_key = (ts - timedelta(seconds=rng.randint(1, 600))).strftime("%Y-%m-%dT%H:%M:%S")
+                add_stage2(camera_id, ts, f"{rng.randrange(1000):03d}_{rng.randrange(10_000_000):07d}", noise_key)
+    
+    return pa.table(stage1), pa.table(stage2)
+
+
+def make_jpeg_frames(n_frames: int, width: int = 1280, height: int = 720, seed: int = 42) -> Dict[str, bytes]:
+    """
+    Generate JPEG camera frames, keyed by gs:// URIs in the frames-to-analyze layout.
+    
+    Each frame is a noisy gradient with a moving block, so it compresses
+    like a real camera frame rather than a flat colour.
+    
+    Args:
+        n_frames: Number of frames.
+        width: Frame width in pixels.
+        height: Frame height in pixels.
+        seed: Random seed.
+        
+    Returns:
+        Dict of frame URI to JPEG bytes, in frame order
+    """
+    from PIL import Image, ImageDraw
+    
+    rng = random.Random(seed)
+    background = Image.linear_gradient("L").resize((width, height))
+    frames = {}
+    for i in range(n_frames):
+        noise = Image.effect_noise((width, height), 24 + rng.random() * 8)
+        channels = [Image.blend(background, noise, 0.35 + 0.1 * c) for c in range(3)]
+        frame = Image.merge("RGB", channels)
+        x = (i * width // max(n_frames, 1)) % width
+        ImageDraw.Draw(frame).rectangle([x, height // 3, x + width // 8, height // 3 + height // 4], fill=(140, 110, 90))
+        buffer = io.BytesIO()
+        frame.save(buffer, format="JPEG", quality=85)
+        uri = f"gs://animal-welfare-staging/frames-to-analyze/camera-0000/000_0000000_2026-01-14T00:00:00_{i}.jpg"
+        frames[uri] = buffer.getvalue()
+    return frames
+
+
+def make_mapping_tables(n_tenants: int = 3, n_farms: int = 20, n_cameras: int = 400) -> Dict[str, pa.Table]:
+    """
+    Build the tenant_map, farm_map and farm_camera_map tables for make_stage_tables() IDs.
+    
+    Farm i belongs to tenant i % n_tenants; camera i belongs to farm i % n_farms.
+    
+    Returns:
+        Dict of table name to pyarrow Table
+    """
+    tenants = [f"tenant-{i:02d}" for i in range(n_tenants)]
+    return {
+        "tenant_map": pa.table({
+            "tenant_id": tenants,
+            "tenant_name": [f"Tenant {i}" for i in range(n_tenants)],
+            "tenant_ui_url": [f"https://tenant-{i:02d}.example.com" for i in range(n_tenants)],
+            "tenant_slug": [f"tenant-{i:02d}" for i in range(n_tenants)],
+        }),
+        "farm_map": pa.table({
+            "farm_id": [f"farm-{i:03d}" for i in range(n_farms)],
+            "farm_name": [f"Farm {i}" for i in range(n_farms)],
+            "tenant_id": [tenants[i % n_tenants] for i in range(n_farms)],
+        }),
+        "farm_camera_map": pa.table({
+            "camera_id": [f"camera-{i:04d}" for i in range(n_cameras)],
+            "camera_name": [f"Camera {i} (Farm {i % n_farms})" for i in range(n_cameras)],
+            "farm_id": [f"farm-{i % n_farms:03d}" for i in range(n_cameras)],
+        }),
+    }
+
+
+def write_local_dataset(
+    out_dir: Path,
+    rows_per_day: int,
+    days: List[str],
+    n_tenants: int = 3,
+    n_farms: int = 20,
+    n_cameras: int = 400,
+    seed: int = 42
+) -> Dict[str, int]:
+    """
+    Write Stage 1, Stage 2 and mapping tables as Parquet, one directory per table.
+    
+    The layout read by the "local" platform (see infrastructure.local_sql_client);
+    Stage tables get one file per day, like date-partitioned warehouse data.
+    Existing files of these tables are replaced.
+    
+    Args:
+        out_dir: Directory to write to.
+        rows_per_day: Stage 1 rows per day.
+        days: Dates (YYYY-MM-DD) to generate.
+        n_tenants: Number of tenants.
+        n_farms: Number of farms.
+        n_cameras: Number of cameras.
+        seed: Random seed.
+        
+    Returns:
+        Dict of table name to rows written
+    """
+    out_dir = Path(out_dir)
+    tables = make_mapping_tables(n_tenants, n_farms, n_cameras)
+    # One day at a time keeps memory flat at large scales
+    per_day = {settings.stage1_table: [], settings.stage2_table: []}
+    for i, day in enumerate(days):
+        stage1, stage2 = make_stage_tables(rows_per_day, [day], seed + i, n_farms, n_cameras, raw_responses=True)
+        per_day[settings.stage1_table].append((day, stage1))
+        per_day[settings.stage2_table].append((day, stage2))
+    
+    counts = {}
+    for name in [*tables, *per_day]:
+        table_dir = out_dir / name
+        table_dir.mkdir(parents=True, exist_ok=True)
+        for old in table_dir.glob("*.parquet"):
+            old.unlink()
+    for name, table in tables.items():
+        pq.write_table(table, out_dir / name / "part-0.parquet")
+        counts[name] = table.num_rows
+    for name, parts in per_day.items():
+        for day, table in parts:
+            pq.write_table(table, out_dir / name / f"day={day}.parquet")
+        counts[name] = sum(table.num_rows for _, table in parts)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic dataset for the local platform")
+    parser.add_argument("--out", type=Path, default=None, help="Output directory (default: settings.local_data_dir)")
+    parser.add_argument("--rows-per-day", type=int, default=20000)
+    parser.add_argument("--days", type=int, default=7, help="Days of data, ending today")
+    parser.add_argument("--end-date", default=None, help="Last day (YYYY-MM-DD, default: today)")
+    parser.add_argument("--tenants", type=int, default=3)
+    parser.add_argument("--farms", type=int, default=20)
+    parser.add_argument("--cameras", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    
+    out_dir = args.out or settings.local_data_dir
+    end = date.fromisoformat(args.end_date) if args.end_date else date.today()
+    days = [(end - timedelta(days=offset)).isoformat() for offset in reversed(range(args.days))]
+    counts = write_local_dataset(out_dir, args.rows_per_day, days, args.tenants, args.farms, args.cameras, args.seed)
+    print(f"✓ Wrote {len(days)} days ({days[0]} to {days[-1]}) to {out_dir}:")
+    for name, rows in counts.items():
+        print(f"  {name}: {rows} rows")
+
+
+if __name__ == "__main__":
+    main()
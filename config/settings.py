@@ -1,6 +1,7 @@
 """Application settings and configuration constants."""
 
 import os
+import tempfile
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional
@@ -10,8 +11,8 @@ from typing import Optional
 class Settings:
     """Application configuration settings."""
     
-    # Platform selection: "bigquery" or "databricks"
-    platform: str = "databricks"
+    # Platform selection: "bigquery", "databricks", or "local" (embedded DuckDB over local files)
+    platform: str = field(default_factory=lambda: os.getenv("APP_PLATFORM", "databricks"))
     
     # BigQuery settings (legacy - for reference)
     project_id: str = "invisible-animal-welfare"
@@ -22,6 +23,84 @@ class Settings:
     # Default HTTP path to your SQL Warehouse
     databricks_http_path: Optional[str] = "/sql/1.0/warehouses/1066550024e48b7a"
     databricks_access_token: Optional[str] = None
+    databricks_token_refresh_margin: float = 300.0  # Refresh the OAuth token this many seconds before expiry
+    databricks_token_default_ttl: float = 3600.0  # Assumed token lifetime when it has no exp claim
+    
+    # Databricks SQL connection pool
+    db_pool_size: int = 4  # Max connections open at once (idle + checked out)
+    db_pool_checkout_timeout: float = 30.0  # Seconds to wait for a free connection
+    db_pool_max_idle_seconds: float = 600.0  # Close connections idle longer than this
+    db_pool_max_lifetime_seconds: float = 3600.0  # Recycle connections older than this
+    db_pool_validation_interval: float = 60.0  # Re-check connections idle longer than this
+    
+    # Warehouse warm-up and keepalive (background scheduler started with the app)
+    keepalive_enabled: bool = True
+    keepalive_warm_connections: int = 2  # Connections opened at app start
+    keepalive_interval: float = 240.0  # Seconds between pings of idle connections; below db_pool_max_idle_seconds
+    keepalive_idle_shutdown: float = 1800.0  # Stop pinging after this many seconds without user queries
+    warmup_times: Optional[str] = None  # Comma-separated HH:MM (UTC) shift starts; defaults to $WAREHOUSE_WARMUP_TIMES
+    warmup_lead_minutes: float = 10.0  # Start the warehouse this long before each shift
+    
+    # Background mapping refresh (reloads tenant/farm/camera mappings when their tables change)
+    mapping_refresh_enabled: bool = True
+    mapping_refresh_interval: float = 600.0  # Seconds between Delta version checks of the mapping tables
+    # Mappings saved after each warehouse load and served at startup; defaults to
+    # $MAPPING_SNAPSHOT_PATH or <disk_cache_dir>/mappings.json
+    mapping_snapshot_path: Optional[Path] = None
+    
+    # Warehouse retry policy and circuit breaker
+    retry_max_attempts: int = 4  # Attempts per request, including the first
+    retry_base_delay: float = 0.5  # Seconds; doubles per retry, with full jitter
+    retry_max_delay: float = 8.0  # Cap on a single backoff
+    retry_deadline: float = 30.0  # Total seconds a request may spend retrying
+    circuit_failure_threshold: int = 5  # Consecutive transient failures that open the breaker
+    circuit_reset_timeout: float = 30.0  # Seconds the breaker stays open before a half-open probe
+    
+    # Fetch query results as Arrow tables (Arrow-backed pandas dtypes); False uses fetchall()
+    arrow_fetch_enabled: bool = True
+    
+    # A Stage 2 inference links to a Stage 1 session only within this many hours of the session's
+    # own timestamp (the Stage 2 scan is pruned to the Stage 1 time range widened by the same)
+    stage2_window_slack_hours: float = 24.0
+    
+    # Stage 1 / Stage 2 linkage: "sql" joins on the warehouse per request; "client" fetches
+    # and caches unfiltered per-day slices of each table and joins them in memory
+    linkage_mode: Optional[str] = None  # Defaults to $LINKAGE_MODE or "sql"
+    
+    # Materialized linkage table (pre-joined, keys extracted), kept current by LinkageTableService.merge()
+    linkage_table: str = "stage1_stage2_linkage"  # In catalog_name.schema_name
+    linkage_table_enabled: bool = True  # Read ranges the table covers from it instead of the live join
+    linkage_merge_lookback_hours: float = 24.0  # Each merge redoes this much before the watermark (late rows)
+    linkage_backfill_days: int = 30  # History loaded by the first merge
+    linkage_coverage_ttl: float = 300.0  # Seconds the table's coverage (watermark) is cached
+    
+    # Streaming query results: small first chunk for a fast first paint, then larger chunks
+    stream_first_chunk_rows: int = 100
+    stream_chunk_rows: int = 1000
+    query_row_budget: int = 5000  # Max rows a streamed query fetches and keeps in memory
+    results_page_size: int = 200  # Rows per results page; Next/Previous seek by (stage1_timestamp, session_id, stage2_inference_id)
+    
+    # In-process cache of linked query results
+    result_cache_max_bytes: int = 256 * 1024 * 1024
+    result_cache_recent_ttl: float = 60.0  # Seconds results for today (and not yet final days) stay fresh
+    result_cache_ingestion_lag_hours: float = 6.0  # A day's data is final this long after the day ends (UTC)
+    
+    # On-disk Parquet cache of results for final past dates (survives restarts, shared by processes)
+    disk_cache_enabled: bool = True
+    disk_cache_dir: Optional[Path] = None  # Defaults to $RESULT_CACHE_DIR or <tmp>/anomaly_tracer_cache
+    disk_cache_max_bytes: int = 2 * 1024 * 1024 * 1024
+    
+    # Date-range queries run one query per day, concurrently
+    date_range_workers: int = 4  # Days queried at once (each holds a pooled connection)
+    max_date_range_days: int = 31
+    
+    # Async query executor (threads running connector calls for async handlers)
+    async_query_workers: int = 8
+    # Concurrent events per Gradio handler; async handlers don't hold a thread while waiting
+    gradio_concurrency_limit: int = 32
+    
+    # Local platform: one directory (Parquet files or a Delta table) per table
+    local_data_dir: Optional[Path] = None  # Defaults to $LOCAL_DATA_DIR or ./local_data next to the package
     
     # Catalog and schema for Unity Catalog
     catalog_name: str = "stg_cv_catalog"
@@ -48,6 +127,18 @@ class Settings:
         if self.camera_config_dir is None:
             # Default to camera_config directory next to the package
             self.camera_config_dir = Path(__file__).parent.parent / "camera_config"
+        if self.local_data_dir is None:
+            self.local_data_dir = Path(os.getenv("LOCAL_DATA_DIR") or Path(__file__).parent.parent / "local_data")
+        if self.linkage_mode is None:
+            self.linkage_mode = os.getenv("LINKAGE_MODE", "sql")
+        if self.warmup_times is None:
+            self.warmup_times = os.getenv("WAREHOUSE_WARMUP_TIMES", "")
+        if self.disk_cache_dir is None:
+            self.disk_cache_dir = Path(
+                os.getenv("RESULT_CACHE_DIR") or Path(tempfile.gettempdir()) / "anomaly_tracer_cache"
+            )
+        if self.mapping_snapshot_path is None:
+            self.mapping_snapshot_path = Path(os.getenv("MAPPING_SNAPSHOT_PATH") or self.disk_cache_dir / "mappings.json")
         
         # Load Databricks settings from environment if not set
         # Support both DATABRICKS_SERVER_HOSTNAME and DATABRICKS_HOST (Databricks Apps provides the latter)
@@ -62,7 +153,7 @@ class Settings:
     @property
     def full_stage1_table(self) -> str:
         """Get fully qualified table name for Stage 1."""
-        if self.platform == "databricks":
+        if self.platform in ("databricks", "local"):
             return f"{self.catalog_name}.{self.schema_name}.{self.stage1_table}"
         else:
             return f"{self.project_id}.{self.dataset_id}.{self.stage1_table}"
@@ -70,10 +161,15 @@ class Settings:
     @property
     def full_stage2_table(self) -> str:
         """Get fully qualified table name for Stage 2."""
-        if self.platform == "databricks":
+        if self.platform in ("databricks", "local"):
             return f"{self.catalog_name}.{self.schema_name}.{self.stage2_table}"
         else:
             return f"{self.project_id}.{self.dataset_id}.{self.stage2_table}"
+    
+    @property
+    def full_linkage_table(self) -> str:
+        """Get fully qualified name of the materialized linkage table."""
+        return f"{self.catalog_name}.{self.schema_name}.{self.linkage_table}"
 
 
 # Global settings instance
@@ -74,8 +74,10 @@ except Exception as e:
 
 from config import settings
 from config.secrets_loader import load_secrets_from_yaml, ensure_required_secrets
+from infrastructure.warehouse_keepalive import warehouse_keepalive
 from services import camera_config_service
 from services.databricks_mapping_service import databricks_mapping_service
+from services.mapping_refresher import mapping_refresher
 from ui import create_app
 
 
@@ -166,41 +168,55 @@ def main():
     print(f"Stage 2 Table: {settings.full_stage2_table}")
     print()
     
-    # Verify Databricks connection settings
-    if not settings.databricks_server_hostname:
-        print("ERROR: DATABRICKS_SERVER_HOSTNAME not set!")
-        print("Please set environment variable DATABRICKS_SERVER_HOSTNAME")
-        sys.exit(1)
-    
-    if not settings.databricks_http_path:
-        print("ERROR: DATABRICKS_HTTP_PATH not set!")
-        print("Please set environment variable DATABRICKS_HTTP_PATH")
-        sys.exit(1)
-    
-    # Verify required Databricks OAuth secrets
-    required_secrets = ['DATABRICKS_CLIENT_ID', 'DATABRICKS_CLIENT_SECRET']
-    if not ensure_required_secrets(required_secrets):
-        print("ERROR: Missing required Databricks OAuth credentials!")
-        print("Please add them to app.secrets.yaml or set as environment variables")
-        sys.exit(1)
-    
-    print(f"Databricks Server: {settings.databricks_server_hostname}")
-    print(f"HTTP Path: {settings.databricks_http_path}")
-    print()
+    if settings.platform == "local":
+        # Embedded engine over local files; no warehouse or credentials needed
+        print(f"Local data: {settings.local_data_dir}")
+        print()
+    else:
+        # Verify Databricks connection settings
+        if not settings.databricks_server_hostname:
+            print("ERROR: DATABRICKS_SERVER_HOSTNAME not set!")
+            print("Please set environment variable DATABRICKS_SERVER_HOSTNAME")
+            sys.exit(1)
+        
+        if not settings.databricks_http_path:
+            print("ERROR: DATABRICKS_HTTP_PATH not set!")
+            print("Please set environment variable DATABRICKS_HTTP_PATH")
+            sys.exit(1)
+        
+        # Verify required Databricks OAuth secrets
+        required_secrets = ['DATABRICKS_CLIENT_ID', 'DATABRICKS_CLIENT_SECRET']
+        if not ensure_required_secrets(required_secrets):
+            print("ERROR: Missing required Databricks OAuth credentials!")
+            print("Please add them to app.secrets.yaml or set as environment variables")
+            sys.exit(1)
+        
+        print(f"Databricks Server: {settings.databricks_server_hostname}")
+        print(f"HTTP Path: {settings.databricks_http_path}")
+        print()
     
     # Configure GCP credentials for GCS access
     print("Checking GCP credentials for GCS access...")
     configure_gcp_credentials()
     print()
     
-    # Load mappings from Databricks tables
-    print("Loading camera/farm/tenant mappings from Databricks...")
+    # Pre-open pooled connections in the background and keep them alive while the app is in use
+    if settings.keepalive_enabled:
+        warehouse_keepalive.start()
+    
+    # Serve saved mappings right away; the warehouse load runs in the background
+    print("Loading camera/farm/tenant mappings...")
     try:
-        cam_map, farm_map, tenant_map = databricks_mapping_service.load()
-        print(f"✓ Loaded mappings: {len(tenant_map)} tenants, {len(farm_map)} farms, {len(cam_map)} cameras")
+        mappings = databricks_mapping_service.warm_start()
+        print(f"✓ Serving mappings ({mappings.source}): {len(mappings.tenant)} tenants, "
+              f"{len(mappings.farm)} farms, {len(mappings.camera)} cameras; revalidating in the background")
     except Exception as e:
         print(f"Warning: Could not load mappings: {e}")
         print("  (Names will show as IDs)")
+    
+    # Pick up mapping table changes (new farms, cameras) without a restart
+    if settings.mapping_refresh_enabled:
+        mapping_refresher.start()
     print()
     
     # Create and launch the app
@@ -215,7 +231,10 @@ def main():
     
     # For Databricks Apps behind reverse proxy
     # Queue is needed for proper request handling
-    app.queue()
+    # Async handlers await the warehouse without holding a thread, so allow
+    # many concurrent events per handler instead of Gradio's default of 1.
+    # Shown results live in per-session gr.State, so sessions don't share rows
+    app.queue(default_concurrency_limit=settings.gradio_concurrency_limit)
     
     # WORKAROUND: Prevent Gradio from checking localhost accessibility
     # by monkey-patching the networking check
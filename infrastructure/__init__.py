@@ -12,15 +12,42 @@ if str(_parent) not in sys.path:
 from config.settings import settings
 
 # Import appropriate clients based on platform
-if settings.platform == "databricks":
-    from infrastructure.databricks_client import get_databricks_connection, get_workspace_client
+if settings.platform in ("databricks", "local"):
+    # The local platform swaps the warehouse for an embedded engine behind the same pool
+    from infrastructure.databricks_client import (
+        DatabricksConnectionPool,
+        databricks_connection_pool,
+        get_databricks_connection,
+        get_workspace_client,
+    )
     from infrastructure.databricks_storage import get_storage_client
+    from infrastructure.single_flight import SingleFlight, single_flight
+    from infrastructure.warehouse_keepalive import WarehouseKeepalive, warehouse_keepalive
+    from infrastructure.warehouse_retry import CircuitOpenError, WarehouseRetrier, warehouse_retrier
     
     __all__ = [
+        "CircuitOpenError",
+        "WarehouseRetrier",
+        "warehouse_retrier",
+        "DatabricksConnectionPool",
+        "databricks_connection_pool",
         "get_databricks_connection",
         "get_workspace_client",
         "get_storage_client",
+        "SingleFlight",
+        "single_flight",
+        "WarehouseKeepalive",
+        "warehouse_keepalive",
     ]
+    
+    if settings.platform == "local":
+        from infrastructure.local_sql_client import LocalSqlConnection, create_local_database, get_local_connection
+        
+        __all__ += [
+            "LocalSqlConnection",
+            "create_local_database",
+            "get_local_connection",
+        ]
 else:
     from infrastructure.bigquery_client import get_bigquery_client
     from infrastructure.gcs_client import get_storage_client
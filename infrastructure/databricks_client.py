@@ -1,13 +1,20 @@
 """Databricks SQL client factory and connection management."""
 
+import atexit
+import base64
+import json
 import os
 import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Deque, Dict, Iterator, Optional
 
 from databricks import sql
 from databricks.sdk import WorkspaceClient
-from databricks.sdk.core import Config
 
 # Ensure parent directory is in path
 _parent = Path(__file__).resolve().parent.parent
@@ -15,14 +22,199 @@ if str(_parent) not in sys.path:
     sys.path.insert(0, str(_parent))
 
 from config.settings import settings
+from infrastructure.warehouse_retry import ErrorKind, classify_error
+
+
+class DatabricksTokenProvider:
+    """
+    Caches the SDK bearer token and refreshes it in the background before expiry.
+    
+    A single WorkspaceClient is created on first use and reused for every
+    token refresh, so opening a new connection costs one connect round trip
+    instead of SDK setup + authentication + connect + verification query.
+    """
+    
+    def __init__(
+        self,
+        refresh_margin: Optional[float] = None,
+        default_ttl: Optional[float] = None,
+        client_factory: Optional[Callable[[], WorkspaceClient]] = None,
+    ):
+        """
+        Initialize the token provider. Nothing is fetched until first use.
+        
+        Args:
+            refresh_margin: Seconds before expiry at which the token is refreshed.
+            default_ttl: Token lifetime assumed when the token carries no expiry claim.
+            client_factory: Callable returning a WorkspaceClient. Defaults to WorkspaceClient.
+        """
+        self._refresh_margin = refresh_margin if refresh_margin is not None else settings.databricks_token_refresh_margin
+        self._default_ttl = default_ttl if default_ttl is not None else settings.databricks_token_default_ttl
+        self._client_factory = client_factory or WorkspaceClient
+        self._client: Optional[WorkspaceClient] = None
+        self._token: Optional[str] = None
+        self._expires_at = 0.0  # Epoch seconds
+        self._lock = threading.Lock()  # Guards token state; never held across a network call
+        self._fetch_lock = threading.Lock()  # Serializes cfg.authenticate() calls
+        self._refreshing = False
+        self._refresh_timer: Optional[threading.Timer] = None
+        self._refreshes = 0
+    
+    @property
+    def client(self) -> WorkspaceClient:
+        """Lazy-load the shared WorkspaceClient."""
+        with self._lock:
+            if self._client is None:
+                self._client = self._client_factory()
+            return self._client
+    
+    @property
+    def host(self) -> str:
+        """Workspace hostname without scheme, as expected by sql.connect()."""
+        return self.client.config.host.replace("https://", "").replace("http://", "")
+    
+    @staticmethod
+    def _token_expiry(access_token: str) -> Optional[float]:
+        """Read the ``exp`` claim from a JWT access token, if it is one."""
+        try:
+            payload = access_token.split(".")[1]
+            payload += "=" * (-len(payload) % 4)
+            return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+        except Exception:
+            return None
+    
+    def _fetch_token(self, force: bool = False) -> str:
+        """
+        Authenticate through the SDK and swap in the new token.
+        
+        The network call runs without ``self._lock`` so readers keep getting
+        the current token meanwhile; ``self._fetch_lock`` only keeps two
+        refreshes from authenticating at once.
+        
+        Args:
+            force: Re-authenticate even if another thread just refreshed the token.
+            
+        Returns:
+            Access token string
+        """
+        with self._fetch_lock:
+            with self._lock:
+                if not force and self._token is not None and time.time() < self._expires_at - 5.0:
+                    return self._token
+            cfg = self.client.config
+            
+            auth_headers = cfg.authenticate()
+            if not auth_headers or not isinstance(auth_headers, dict):
+                raise ValueError(f"cfg.authenticate() returned invalid data: {type(auth_headers)}")
+            
+            auth_header = auth_headers.get("Authorization")
+            if not auth_header:
+                raise ValueError(f"No Authorization header. Available headers: {list(auth_headers.keys())}")
+            
+            if not auth_header.startswith("Bearer "):
+                raise ValueError(f"Authorization header doesn't start with 'Bearer ': {auth_header[:50]}")
+            
+            # Extract token (remove "Bearer " prefix)
+            token = auth_header[7:]
+            expires_at = self._token_expiry(token) or (time.time() + self._default_ttl)
+            
+            with self._lock:
+                self._token = token
+                self._expires_at = expires_at
+                self._refreshes += 1
+                self._schedule_refresh()
+        
+        print(f"  ✓ Got access token (auth type: {cfg.auth_type}, "
+              f"expires in {int(expires_at - time.time())}s)")
+        return token
+    
+    def _schedule_refresh(self, delay: Optional[float] = None) -> None:
+        """Schedule the next background refresh. Caller holds the lock."""
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+        if delay is None:
+            delay = max(self._expires_at - self._refresh_margin - time.time(), 1.0)
+        self._refresh_timer = threading.Timer(delay, self._background_refresh)
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+    
+    def _background_refresh(self) -> None:
+        """Refresh the token ahead of expiry; retry shortly if the refresh fails."""
+        with self._lock:
+            self._refreshing = True
+        try:
+            self._fetch_token(force=True)
+        except Exception as e:
+            print(f"  ⚠️  Background token refresh failed: {e}")
+            with self._lock:
+                self._schedule_refresh(delay=min(30.0, max(self._expires_at - time.time(), 1.0)))
+        finally:
+            with self._lock:
+                self._refreshing = False
+    
+    def get_token(self) -> str:
+        """
+        Get a valid bearer token, fetching synchronously only if none is cached
+        or the cached one is about to expire.
+        
+        While a background refresh is in flight the current token is served
+        as long as it has not actually expired.
+        
+        Returns:
+            Access token string
+        """
+        with self._lock:
+            if self._token is not None:
+                now = time.time()
+                if now < self._expires_at - 5.0 or (self._refreshing and now < self._expires_at):
+                    return self._token
+        return self._fetch_token()
+    
+    def invalidate(self) -> None:
+        """Drop the cached token so the next get_token() re-authenticates."""
+        with self._lock:
+            self._token = None
+            self._expires_at = 0.0
+    
+    def stop(self) -> None:
+        """Cancel the background refresh timer."""
+        with self._lock:
+            if self._refresh_timer is not None:
+                self._refresh_timer.cancel()
+                self._refresh_timer = None
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Token refresh counters."""
+        with self._lock:
+            return {
+                'refreshes': self._refreshes,
+                'expires_in_s': max(self._expires_at - time.time(), 0.0) if self._token else 0.0,
+            }
+
+
+# Global token provider shared by every new connection
+databricks_token_provider = DatabricksTokenProvider()
+
+
+def is_connection_alive(connection: Any) -> bool:
+    """
+    Cheap, client-side liveness check for a Databricks SQL connection.
+    
+    Checks the connector's own ``open`` flag rather than issuing a query;
+    a session the server has expired surfaces on first use and is handled
+    by the retry path.
+    """
+    return bool(getattr(connection, "open", True))
 
 
 def get_databricks_connection():
     """
     Get authenticated Databricks SQL connection.
     
-    Uses Databricks SDK's unified authentication which automatically
-    detects and uses the available credentials (OAuth, PAT, etc.)
+    Uses the cached bearer token from databricks_token_provider, which
+    wraps the Databricks SDK's unified authentication (OAuth, PAT, etc.).
+    The connection is not verified with a query here; callers rely on
+    is_connection_alive() and the retry path instead.
     
     Returns:
         Databricks SQL connection
@@ -40,79 +232,24 @@ def get_databricks_connection():
     print(f"Connecting to Databricks SQL...")
     print(f"  HTTP Path: {http_path}")
     
-    # Show which credentials are being used
-    client_id = os.getenv("DATABRICKS_CLIENT_ID", "NOT SET")
-    print(f"  Client ID from env: {client_id[:12]}..." if len(client_id) > 12 else f"  Client ID: {client_id}")
-    
-    # Use Databricks SDK unified authentication
-    # This automatically picks up credentials from environment:
-    # - DATABRICKS_HOST
-    # - DATABRICKS_CLIENT_ID + DATABRICKS_CLIENT_SECRET (OAuth M2M)
-    # - DATABRICKS_TOKEN (PAT)
-    # - Or other configured auth methods
-    
     try:
-        # Use Databricks SDK to handle authentication
-        from databricks.sdk import WorkspaceClient
-        
-        # Create SDK client (this handles OAuth M2M, PAT, etc. automatically)
-        w = WorkspaceClient()
-        cfg = w.config
-        
-        print(f"  Host: {cfg.host}")
-        print(f"  Auth Type: {cfg.auth_type}")
-        print(f"  SDK Client ID: {cfg.client_id[:12] if cfg.client_id else 'None'}...")
-        
-        # Get authentication token from SDK
-        print(f"  Getting authentication token...")
-        auth_headers = cfg.authenticate()
-        
-        if not auth_headers or not isinstance(auth_headers, dict):
-            raise ValueError(f"cfg.authenticate() returned invalid data: {type(auth_headers)}")
-        
-        auth_header = auth_headers.get("Authorization")
-        if not auth_header:
-            raise ValueError(f"No Authorization header. Available headers: {list(auth_headers.keys())}")
-        
-        if not auth_header.startswith("Bearer "):
-            raise ValueError(f"Authorization header doesn't start with 'Bearer ': {auth_header[:50]}")
-        
-        # Extract token (remove "Bearer " prefix)
-        access_token = auth_header[7:]
-        print(f"  ✓ Got access token (first 20 chars): {access_token[:20]}...")
-        
         # Connect using the access token directly
         # Note: Using access_token instead of credentials_provider avoids 
         # compatibility issues with the databricks-sql-connector
-        print(f"  Attempting connection...")
         connection = sql.connect(
-            server_hostname=cfg.host.replace("https://", "").replace("http://", ""),
+            server_hostname=databricks_token_provider.host,
             http_path=http_path,
-            access_token=access_token,
+            access_token=databricks_token_provider.get_token(),
         )
-        
         print(f"  ✓ Connection object created!")
-        
-        # Test the connection with a simple query
-        print(f"  Testing connection with simple query...")
-        try:
-            with connection.cursor() as cursor:
-                cursor.execute("SELECT 1 as test")
-                result = cursor.fetchone()
-                print(f"  ✓ Test query successful! Result: {result}")
-        except Exception as test_error:
-            print(f"  ✗ Test query failed: {test_error}")
-            raise
-        
-        print(f"  ✓ Connection fully verified!")
         return connection
         
     except Exception as e:
         print(f"  ✗ Connection error: {e}")
         print(f"  Error type: {type(e).__name__}")
-        print(f"  Error details: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        # A rejected token should be re-fetched on the next attempt
+        if 'unauthorized' in str(e).lower() or '401' in str(e) or '403' in str(e):
+            databricks_token_provider.invalidate()
         raise
 
 
@@ -121,6 +258,379 @@ def get_workspace_client() -> WorkspaceClient:
     Get Databricks Workspace client for API operations.
     
     Returns:
-        Databricks WorkspaceClient
+        Databricks WorkspaceClient (shared with the token provider)
+    """
+    return databricks_token_provider.client
+
+
+def is_connection_error(error: Exception) -> bool:
+    """
+    Check whether an exception indicates a broken or stale connection.
+    
+    Args:
+        error: Exception raised by the connector or a query function
+        
+    Returns:
+        True if the connection should be discarded rather than reused
+    """
+    return classify_error(error) is ErrorKind.TRANSIENT
+
+
+class PoolTimeoutError(RuntimeError):
+    """Raised when no pooled connection becomes available in time."""
+
+
+@dataclass
+class PooledConnection:
+    """A Databricks SQL connection plus the bookkeeping the pool needs."""
+    connection: Any
+    created_at: float = field(default_factory=time.monotonic)
+    last_used_at: float = field(default_factory=time.monotonic)
+
+
+class DatabricksConnectionPool:
+    """
+    Bounded, thread-safe pool of Databricks SQL connections.
+    
+    Connections are created lazily up to ``max_size``. Each checkout validates
+    the connection (cheap state check, plus a probe query if it sat idle past
+    ``validation_interval``); idle connections past ``max_idle_seconds`` are
+    evicted and connections older than ``max_lifetime_seconds`` are recycled.
     """
-    return WorkspaceClient()
+    
+    def __init__(
+        self,
+        connection_factory: Optional[Callable[[], Any]] = None,
+        max_size: Optional[int] = None,
+        checkout_timeout: Optional[float] = None,
+        max_idle_seconds: Optional[float] = None,
+        max_lifetime_seconds: Optional[float] = None,
+        validation_interval: Optional[float] = None,
+    ):
+        """
+        Initialize the pool. No connections are opened until first checkout.
+        
+        Args:
+            connection_factory: Callable returning a new connection. Defaults to get_databricks_connection.
+            max_size: Maximum connections open at once. Defaults to settings.db_pool_size.
+            checkout_timeout: Seconds to wait for a free connection before raising PoolTimeoutError.
+            max_idle_seconds: Idle connections older than this are closed.
+            max_lifetime_seconds: Connections older than this are closed on return.
+            validation_interval: Connections idle longer than this are probed before reuse.
+        """
+        self._factory = connection_factory or get_databricks_connection
+        self._max_size = max_size or settings.db_pool_size
+        self._checkout_timeout = checkout_timeout if checkout_timeout is not None else settings.db_pool_checkout_timeout
+        self._max_idle = max_idle_seconds if max_idle_seconds is not None else settings.db_pool_max_idle_seconds
+        self._max_lifetime = max_lifetime_seconds if max_lifetime_seconds is not None else settings.db_pool_max_lifetime_seconds
+        self._validation_interval = validation_interval if validation_interval is not None else settings.db_pool_validation_interval
+        
+        self._idle: Deque[PooledConnection] = deque()
+        self._in_use = 0  # Checked out, or being created for a waiting caller
+        self._cond = threading.Condition()
+        
+        # Metrics
+        self._checkouts = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+        self._timeouts = 0
+        self._created = 0
+        self._evicted_idle = 0
+        self._recycled = 0
+        self._discarded = 0
+        self._failed_validations = 0
+        self._peak_in_use = 0
+        self._pings = 0
+        self._failed_pings = 0
+        self._last_user_checkout_at: Optional[float] = None  # time.monotonic() of the last non-background checkout
+    
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+    
+    @property
+    def last_user_checkout_at(self) -> Optional[float]:
+        """
+        time.monotonic() of the last checkout made for the app's users, or None.
+        
+        Keepalive pings and background checkouts (e.g. mapping refreshes)
+        don't count, so schedulers can tell whether anyone is using the app.
+        """
+        with self._cond:
+            return self._last_user_checkout_at
+    
+    def _is_expired(self, pooled: PooledConnection, now: float) -> bool:
+        """Check idle and lifetime limits."""
+        return (
+            now - pooled.last_used_at > self._max_idle or
+            now - pooled.created_at > self._max_lifetime
+        )
+    
+    def _is_healthy(self, pooled: PooledConnection) -> bool:
+        """Validate a connection before handing it out."""
+        if not is_connection_alive(pooled.connection):
+            return False
+        if time.monotonic() - pooled.last_used_at <= self._validation_interval:
+            return True
+        try:
+            with pooled.connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            return True
+        except Exception as e:
+            print(f"  ⚠️  Pooled connection failed validation: {e}")
+            return False
+    
+    @staticmethod
+    def _close(pooled: PooledConnection) -> None:
+        try:
+            pooled.connection.close()
+        except Exception as e:
+            print(f"  (Error closing pooled connection: {e})")
+    
+    def _create(self) -> PooledConnection:
+        """Open a new connection for a slot already reserved in _in_use."""
+        try:
+            connection = self._factory()
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._created += 1
+        return PooledConnection(connection=connection)
+    
+    def checkout(self, timeout: Optional[float] = None, background: bool = False) -> PooledConnection:
+        """
+        Check out a healthy connection, waiting for one if the pool is exhausted.
+        
+        Args:
+            timeout: Seconds to wait. Defaults to the pool's checkout_timeout.
+            background: True for work the app does on its own (not for a user),
+                which doesn't update last_user_checkout_at.
+                
+        Returns:
+            PooledConnection that must be returned with checkin()
+        """
+        timeout = self._checkout_timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        reused: Optional[PooledConnection] = None
+        expired = []
+        
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                while self._idle:
+                    candidate = self._idle.pop()  # LIFO so surplus connections age out
+                    if self._is_expired(candidate, now):
+                        expired.append(candidate)
+                        self._evicted_idle += 1
+                        continue
+                    reused = candidate
+                    break
+                if reused is not None or self._in_use + len(self._idle) < self._max_size:
+                    self._in_use += 1
+                    self._peak_in_use = max(self._peak_in_use, self._in_use)
+                    break
+                remaining = deadline - now
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"No Databricks connection available after {timeout:.1f}s "
+                        f"(pool size {self._max_size})"
+                    )
+                self._cond.wait(remaining)
+            
+            waited = time.monotonic() - start
+            if not background:
+                self._last_user_checkout_at = time.monotonic()
+            self._checkouts += 1
+            self._wait_time_total += waited
+            self._wait_time_max = max(self._wait_time_max, waited)
+        
+        for pooled in expired:
+            self._close(pooled)
+        
+        if reused is not None:
+            if self._is_healthy(reused):
+                return reused
+            with self._cond:
+                self._failed_validations += 1
+            self._close(reused)
+        
+        return self._create()
+    
+    def checkin(self, pooled: PooledConnection, discard: bool = False) -> None:
+        """
+        Return a connection to the pool.
+        
+        Args:
+            pooled: Connection previously returned by checkout()
+            discard: If True, close the connection instead of reusing it
+        """
+        now = time.monotonic()
+        recycle = now - pooled.created_at > self._max_lifetime
+        close = discard or recycle or not is_connection_alive(pooled.connection)
+        
+        with self._cond:
+            self._in_use -= 1
+            if close:
+                if discard:
+                    self._discarded += 1
+                else:
+                    self._recycled += 1
+            else:
+                pooled.last_used_at = now
+                self._idle.append(pooled)
+            self._cond.notify()
+        
+        if close:
+            self._close(pooled)
+    
+    @contextmanager
+    def connection(self, background: bool = False) -> Iterator[Any]:
+        """
+        Context manager that checks out a connection and returns it afterwards.
+        
+        The connection is discarded instead of reused if the block raises a
+        connection-related error.
+        
+        Args:
+            background: True for work the app does on its own; see checkout().
+        """
+        pooled = self.checkout(background=background)
+        discard = False
+        try:
+            yield pooled.connection
+        except Exception as e:
+            discard = is_connection_error(e)
+            raise
+        finally:
+            self.checkin(pooled, discard=discard)
+    
+    def warm(self, count: int) -> int:
+        """
+        Open connections until at least count exist (bounded by max_size).
+        
+        Args:
+            count: Connections to have open afterwards.
+            
+        Returns:
+            Number of connections opened
+        """
+        with self._cond:
+            created = self._created
+        held = []
+        try:
+            for _ in range(min(count, self._max_size)):
+                held.append(self.checkout(timeout=0))
+        except PoolTimeoutError:
+            pass  # Pool busy with real queries: it's warm already
+        finally:
+            for pooled in held:
+                self.checkin(pooled)
+        with self._cond:
+            return self._created - created
+    
+    def ping_idle(self) -> int:
+        """
+        Run a cheap query on every idle connection so its session stays alive.
+        
+        Pinged connections count as freshly used (so they aren't evicted as
+        idle); connections that fail the ping are closed.
+        
+        Returns:
+            Number of connections pinged successfully
+        """
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._in_use += len(idle)
+        
+        pinged = 0
+        for pooled in idle:
+            try:
+                with pooled.connection.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                    cursor.fetchone()
+            except Exception as e:
+                print(f"  ⚠️  Keepalive ping failed: {e}")
+                with self._cond:
+                    self._failed_pings += 1
+                self.checkin(pooled, discard=True)
+                continue
+            pinged += 1
+            self.checkin(pooled)
+        
+        with self._cond:
+            self._pings += pinged
+        return pinged
+    
+    def evict_idle(self) -> int:
+        """
+        Close idle connections past their idle or lifetime limit.
+        
+        Returns:
+            Number of connections closed
+        """
+        now = time.monotonic()
+        with self._cond:
+            keep = [p for p in self._idle if not self._is_expired(p, now)]
+            expired = [p for p in self._idle if self._is_expired(p, now)]
+            self._idle = deque(keep)
+            self._evicted_idle += len(expired)
+            if expired:
+                self._cond.notify_all()
+        for pooled in expired:
+            self._close(pooled)
+        return len(expired)
+    
+    def close_all(self) -> None:
+        """Close all idle connections. Checked-out connections close on return."""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for pooled in idle:
+            self._close(pooled)
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Snapshot of pool wait time and utilization metrics.
+        
+        Returns:
+            Dictionary of counters and gauges
+        """
+        with self._cond:
+            checkouts = self._checkouts
+            return {
+                'max_size': self._max_size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'utilization': self._in_use / self._max_size if self._max_size else 0.0,
+                'peak_in_use': self._peak_in_use,
+                'checkouts': checkouts,
+                'wait_time_total_s': self._wait_time_total,
+                'wait_time_avg_ms': (self._wait_time_total / checkouts * 1000) if checkouts else 0.0,
+                'wait_time_max_ms': self._wait_time_max * 1000,
+                'timeouts': self._timeouts,
+                'created': self._created,
+                'evicted_idle': self._evicted_idle,
+                'recycled': self._recycled,
+                'discarded': self._discarded,
+                'failed_validations': self._failed_validations,
+                'pings': self._pings,
+                'failed_pings': self._failed_pings,
+            }
+
+
+# Global pool shared by the query and mapping services; on the "local"
+# platform its connections go to the embedded engine instead of the warehouse
+if settings.platform == "local":
+    from infrastructure.local_sql_client import get_local_connection
+    databricks_connection_pool = DatabricksConnectionPool(connection_factory=get_local_connection)
+else:
+    databricks_connection_pool = DatabricksConnectionPool()
+atexit.register(databricks_connection_pool.close_all)
@@ -0,0 +1,168 @@
+"""Embedded DuckDB engine standing in for the Databricks SQL warehouse (platform "local")."""
+
+import re
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import duckdb
+import pyarrow as pa
+
+# Ensure parent directory is in path
+_parent = Path(__file__).resolve().parent.parent
+if str(_parent) not in sys.path:
+    sys.path.insert(0, str(_parent))
+
+from config.settings import settings
+
+# `:name` markers (not `::` casts or `12:34` inside literals)
+_NAMED_PARAMETER = re.compile(r"(?<![:\w]):([A-Za-z_]\w*)")
+
+# Rows per Arrow batch when results are streamed with fetchmany_arrow()
+_STREAM_BATCH_ROWS = 2048
+
+
+def _table_source(path: Path) -> str:
+    """Table function reading a local table directory: Delta if it has a log, else Parquet files."""
+    if (path / "_delta_log").is_dir():
+        return f"delta_scan('{path.as_posix()}')"
+    return f"read_parquet('{path.as_posix()}/**/*.parquet', union_by_name = true)"
+
+
+def create_local_database(data_dir: Optional[Path] = None) -> "duckdb.DuckDBPyConnection":
+    """
+    Open an in-memory DuckDB database exposing local tables under the warehouse names.
+    
+    Every subdirectory of data_dir (Parquet files, or a Delta table) becomes
+    a view named catalog_name.schema_name.<directory>, so the services'
+    fully qualified table names resolve unchanged. Tables the app creates
+    (e.g. the linkage table) live in memory.
+    
+    Args:
+        data_dir: Directory of table directories. Defaults to settings.local_data_dir.
+        
+    Returns:
+        DuckDB connection; open per-thread cursors with LocalSqlConnection.
+    """
+    data_dir = Path(data_dir or settings.local_data_dir)
+    if not data_dir.is_dir():
+        raise FileNotFoundError(
+            f"Local data directory not found: {data_dir}. "
+            f"Generate one with: python -m benchmarks.synthetic --out {data_dir}"
+        )
+    
+    database = duckdb.connect()
+    database.execute(f"ATTACH ':memory:' AS {settings.catalog_name}")
+    database.execute(f"CREATE SCHEMA IF NOT EXISTS {settings.catalog_name}.{settings.schema_name}")
+    
+    tables = sorted(path for path in data_dir.iterdir() if path.is_dir())
+    if any((path / "_delta_log").is_dir() for path in tables):
+        database.execute("LOAD delta")
+    for path in tables:
+        database.execute(
+            f"CREATE VIEW {settings.catalog_name}.{settings.schema_name}.{path.name} "
+            f"AS SELECT * FROM {_table_source(path)}"
+        )
+    print(f"✓ Local SQL engine: {len(tables)} table(s) from {data_dir}")
+    return database
+
+
+class LocalSqlCursor:
+    """
+    databricks-sql-connector style cursor over a DuckDB cursor.
+    
+    Translates the builder's `:name` markers to DuckDB's `$name` and binds
+    only the parameters the statement references.
+    """
+    
+    def __init__(self, database: "duckdb.DuckDBPyConnection"):
+        self._cursor = database.cursor()
+        self._reader: Optional[pa.RecordBatchReader] = None
+        self._pending: List[pa.RecordBatch] = []
+        self.description = None
+    
+    def execute(self, operation: str, parameters: Optional[Dict[str, Any]] = None):
+        names = set(_NAMED_PARAMETER.findall(operation))
+        bound = {name: value for name, value in (parameters or {}).items() if name in names}
+        self._cursor.execute(_NAMED_PARAMETER.sub(r"$\1", operation), bound)
+        self._reader, self._pending = None, []
+        self.description = self._cursor.description
+        return self
+    
+    def fetchone(self):
+        return self._cursor.fetchone()
+    
+    def fetchmany(self, size: int = 1):
+        return self._cursor.fetchmany(size)
+    
+    def fetchall(self):
+        return self._cursor.fetchall()
+    
+    def fetchall_arrow(self) -> pa.Table:
+        if self._reader is None:
+            return self._cursor.to_arrow_table()
+        table = pa.Table.from_batches([*self._pending, *self._reader], schema=self._reader.schema)
+        self._pending = []
+        return table
+    
+    def fetchmany_arrow(self, size: int = 1) -> pa.Table:
+        if self._reader is None:
+            self._reader = self._cursor.to_arrow_reader(_STREAM_BATCH_ROWS)
+        buffered = sum(batch.num_rows for batch in self._pending)
+        while buffered < size:
+            try:
+                batch = self._reader.read_next_batch()
+            except StopIteration:
+                break
+            self._pending.append(batch)
+            buffered += batch.num_rows
+        table = pa.Table.from_batches(self._pending, schema=self._reader.schema)
+        self._pending = table.slice(size).to_batches()
+        return table.slice(0, size)
+    
+    def cancel(self):
+        """Interrupt the running statement (called from another thread)."""
+        self._cursor.interrupt()
+    
+    def close(self):
+        self._cursor.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class LocalSqlConnection:
+    """databricks-sql-connector style connection to a shared DuckDB database."""
+    
+    def __init__(self, database: "duckdb.DuckDBPyConnection"):
+        self._database = database
+        self.open = True
+    
+    def cursor(self) -> LocalSqlCursor:
+        return LocalSqlCursor(self._database)
+    
+    def close(self):
+        self.open = False
+
+
+_database: Optional["duckdb.DuckDBPyConnection"] = None
+_database_lock = threading.Lock()
+
+
+def get_local_connection() -> LocalSqlConnection:
+    """
+    Get a connection to the shared local database, opening it on first use.
+    
+    Drop-in replacement for get_databricks_connection() as a pool's
+    connection factory.
+    """
+    global _database
+    with _database_lock:
+        if _database is None:
+            _database = create_local_database()
+    return LocalSqlConnection(_database)
@@ -0,0 +1,197 @@
+"""Cancellation of in-flight Databricks SQL statements."""
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+class QueryCancelledError(RuntimeError):
+    """Raised when a query is cancelled before or while it runs."""
+
+
+class CancellationToken:
+    """
+    Handle used to cancel the warehouse statement(s) started on behalf of one request.
+    
+    The query service attaches each cursor it opens; cancel() calls
+    cursor.cancel() on every attached cursor so the warehouse stops work
+    instead of finishing a result nobody will read.
+    """
+    
+    def __init__(self):
+        self._cursors: List[Any] = []
+        self._cancelled = False
+        self._lock = threading.Lock()
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+    
+    def raise_if_cancelled(self) -> None:
+        if self._cancelled:
+            raise QueryCancelledError("Query cancelled")
+    
+    def attach(self, cursor: Any) -> None:
+        """Track a cursor; raises QueryCancelledError if already cancelled."""
+        with self._lock:
+            self.raise_if_cancelled()
+            self._cursors.append(cursor)
+    
+    def detach(self, cursor: Any) -> None:
+        with self._lock:
+            if cursor in self._cursors:
+                self._cursors.remove(cursor)
+    
+    def cancel(self) -> int:
+        """
+        Cancel all attached cursors.
+        
+        Returns:
+            Number of cursors that had a statement in flight
+        """
+        with self._lock:
+            self._cancelled = True
+            cursors = list(self._cursors)
+        for cursor in cursors:
+            try:
+                cursor.cancel()
+            except Exception as e:
+                print(f"  (Error cancelling cursor: {e})")
+        return len(cursors)
+
+
+@dataclass
+class _InFlightQuery:
+    """A session's running request and when it started."""
+    token: CancellationToken
+    started: float  # time.monotonic()
+
+
+class InFlightQueryRegistry:
+    """
+    Tracks the warehouse requests each UI session has running.
+    
+    Requests are grouped by slot (e.g. "results", "filters"). Starting a
+    request cancels the session's running request in the same slot, plus any
+    slots it supersedes, since their results would be thrown away. When the
+    session disconnects, all of its requests are cancelled.
+    
+    Metrics count cancellations by reason. The compute saved by each
+    cancelled statement is estimated as the average completed request
+    duration minus the time the statement had already run.
+    """
+    
+    def __init__(self):
+        self._sessions: Dict[str, Dict[str, _InFlightQuery]] = {}
+        self._lock = threading.Lock()
+        
+        # Metrics
+        self._started = 0
+        self._completed = 0
+        self._completed_seconds = 0.0
+        self._superseded = 0
+        self._disconnected = 0
+        self._statements_cancelled = 0
+        self._cancelled_elapsed_seconds = 0.0
+        self._estimated_saved_seconds = 0.0
+    
+    def begin(self, session_id: Optional[str], slot: str, supersedes: Iterable[str] = ()) -> CancellationToken:
+        """
+        Register a new request and cancel the requests it supersedes.
+        
+        Args:
+            session_id: UI session (Gradio session hash); None registers nothing.
+            slot: Kind of request; a running request in the same slot is cancelled.
+            supersedes: Other slots whose running requests are cancelled too.
+            
+        Returns:
+            Token to pass to the query service for this request.
+        """
+        token = CancellationToken()
+        if not session_id:
+            return token
+        
+        with self._lock:
+            slots = self._sessions.setdefault(session_id, {})
+            superseded = [slots.pop(name) for name in (slot, *supersedes) if name in slots]
+            slots[slot] = _InFlightQuery(token, time.monotonic())
+            self._started += 1
+        
+        for query in superseded:
+            self._cancel(query, "superseded")
+        return token
+    
+    def end(self, session_id: Optional[str], slot: str, token: CancellationToken) -> None:
+        """Unregister a request once it has finished (or been cancelled)."""
+        if not session_id:
+            return
+        with self._lock:
+            slots = self._sessions.get(session_id, {})
+            query = slots.get(slot)
+            if query is None or query.token is not token:
+                return  # Already superseded
+            del slots[slot]
+            if not slots:
+                del self._sessions[session_id]
+            if not token.cancelled:
+                self._completed += 1
+                self._completed_seconds += time.monotonic() - query.started
+    
+    @contextmanager
+    def track(self, session_id: Optional[str], slot: str, supersedes: Iterable[str] = ()) -> Iterator[CancellationToken]:
+        """begin() a request for the duration of the block and end() it afterwards."""
+        token = self.begin(session_id, slot, supersedes)
+        try:
+            yield token
+        finally:
+            self.end(session_id, slot, token)
+    
+    def cancel_session(self, session_id: Optional[str]) -> int:
+        """
+        Cancel every running request of a session (e.g. when it disconnects).
+        
+        Returns:
+            Number of requests cancelled
+        """
+        with self._lock:
+            slots = self._sessions.pop(session_id, {}) if session_id else {}
+        for query in slots.values():
+            self._cancel(query, "disconnected")
+        return len(slots)
+    
+    def _cancel(self, query: _InFlightQuery, reason: str) -> None:
+        elapsed = time.monotonic() - query.started
+        statements = query.token.cancel()
+        with self._lock:
+            if reason == "superseded":
+                self._superseded += 1
+            else:
+                self._disconnected += 1
+            if statements:
+                self._statements_cancelled += statements
+                self._cancelled_elapsed_seconds += elapsed
+                if self._completed:
+                    average = self._completed_seconds / self._completed
+                    self._estimated_saved_seconds += statements * max(average - elapsed, 0.0)
+        if statements:
+            print(f"  ✗ Cancelled {statements} {reason} statement(s) after {elapsed:.1f}s")
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'in_flight': sum(len(slots) for slots in self._sessions.values()),
+                'sessions': len(self._sessions),
+                'started': self._started,
+                'completed': self._completed,
+                'superseded': self._superseded,
+                'disconnected': self._disconnected,
+                'statements_cancelled': self._statements_cancelled,
+                'cancelled_elapsed_s': self._cancelled_elapsed_seconds,
+                'estimated_saved_s': self._estimated_saved_seconds,
+            }
+
+
+# Global instance
+in_flight_queries = InFlightQueryRegistry()
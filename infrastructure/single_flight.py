@@ -0,0 +1,137 @@
+"""Single-flight coalescing of identical concurrent warehouse requests."""
+
+import sys
+import threading
+from collections import Counter
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# Ensure parent directory is in path
+_parent = Path(__file__).resolve().parent.parent
+if str(_parent) not in sys.path:
+    sys.path.insert(0, str(_parent))
+
+from infrastructure.query_cancellation import CancellationToken, QueryCancelledError
+
+# How often a waiting caller checks its own cancellation token
+_WAIT_POLL_SECONDS = 0.1
+
+
+class SingleFlight:
+    """
+    Lets one caller run a request while identical concurrent callers wait for its result.
+    
+    Requests are identified by a normalized, hashable key; the first element
+    of a tuple key names the request kind in the metrics. Only requests that
+    are in flight at the same time are coalesced, and nothing is kept once
+    the request finishes (caching is the result caches' job).
+    
+    Each caller keeps its own cancellation: a waiting caller whose token is
+    cancelled stops waiting, and if the leading request is cancelled by its
+    own caller, the waiting callers run the request themselves.
+    """
+    
+    def __init__(self):
+        self._flights: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        
+        # Metrics, by request kind
+        self._executed: Counter = Counter()
+        self._coalesced: Counter = Counter()
+    
+    @staticmethod
+    def _kind(key: Hashable) -> str:
+        return str(key[0]) if isinstance(key, tuple) and key else str(key)
+    
+    def start(self, key: Hashable) -> Tuple[Future, bool]:
+        """
+        Join the in-flight request for key, or register a new one.
+        
+        Returns:
+            Tuple of (future with the request's result, True if the caller
+            leads and must run the request and call finish())
+        """
+        with self._lock:
+            future = self._flights.get(key)
+            if future is not None:
+                self._coalesced[self._kind(key)] += 1
+                return future, False
+            future = Future()
+            self._flights[key] = future
+            self._executed[self._kind(key)] += 1
+            return future, True
+    
+    def finish(self, key: Hashable, future: Future, result: Any = None, error: Optional[BaseException] = None) -> None:
+        """Publish the leader's result (or error) to waiting callers and retire the key."""
+        with self._lock:
+            if self._flights.get(key) is future:
+                del self._flights[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    
+    def wait(self, future: Future, cancel_token: Optional[CancellationToken] = None) -> Any:
+        """
+        Wait for a joined request's result.
+        
+        Raises:
+            QueryCancelledError: If cancel_token is cancelled while waiting, or
+                the leader was cancelled (check cancel_token to tell them apart).
+            Exception: The leader's error.
+        """
+        while True:
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            try:
+                return future.result(timeout=_WAIT_POLL_SECONDS)
+            except FutureTimeoutError:
+                continue
+    
+    def do(self, key: Hashable, func: Callable[[], Any], cancel_token: Optional[CancellationToken] = None) -> Any:
+        """
+        Run func, or wait for an identical in-flight call to finish and share its result.
+        
+        Args:
+            key: Normalized request key.
+            func: Runs the request; called at most once per flight.
+            cancel_token: The caller's cancellation token.
+            
+        Returns:
+            func's result
+        """
+        while True:
+            future, leader = self.start(key)
+            if leader:
+                try:
+                    result = func()
+                except BaseException as e:
+                    self.finish(key, future, error=e)
+                    raise
+                self.finish(key, future, result=result)
+                return result
+            
+            try:
+                return self.wait(future, cancel_token)
+            except QueryCancelledError:
+                if cancel_token is not None and cancel_token.cancelled:
+                    raise
+                # The leader was cancelled by its own caller; run the request ourselves
+                print(f"  ⚠️  Coalesced request was cancelled by its leader; retrying")
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            executed = sum(self._executed.values())
+            coalesced = sum(self._coalesced.values())
+            return {
+                'in_flight': len(self._flights),
+                'executed': executed,
+                'coalesced': coalesced,
+                'coalesced_rate': coalesced / (executed + coalesced) if executed + coalesced else 0.0,
+                'coalesced_by_kind': dict(self._coalesced),
+            }
+
+
+# Global instance shared by the query and mapping services
+single_flight = SingleFlight()
@@ -0,0 +1,211 @@
+"""Background warm-up and keepalive of pooled warehouse connections."""
+
+import atexit
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from datetime import time as dt_time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Ensure parent directory is in path
+_parent = Path(__file__).resolve().parent.parent
+if str(_parent) not in sys.path:
+    sys.path.insert(0, str(_parent))
+
+from config.settings import settings
+from infrastructure.databricks_client import DatabricksConnectionPool, databricks_connection_pool
+
+# Longest the scheduler sleeps between checks
+_MAX_TICK_SECONDS = 60.0
+
+
+def parse_warmup_times(value: Optional[str]) -> List[dt_time]:
+    """
+    Parse comma-separated HH:MM (UTC) shift start times, skipping invalid entries.
+    
+    Args:
+        value: e.g. "06:00, 14:00". Empty or None means no scheduled warm-ups.
+    """
+    times = []
+    for part in (value or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            times.append(dt_time.fromisoformat(part))
+        except ValueError:
+            print(f"  ⚠️  Ignoring invalid warm-up time: {part!r} (expected HH:MM)")
+    return sorted(times)
+
+
+class WarehouseKeepalive:
+    """
+    Keeps pooled warehouse sessions warm while the app is in use.
+    
+    On start it opens a few pooled connections, so the first query doesn't
+    pay for connecting. While users are running queries, idle connections
+    are pinged within the pool's idle timeout, so they are neither evicted
+    nor dropped by the warehouse. Optionally the warehouse is also warmed a
+    few minutes before configured shift start times.
+    
+    Pinging stops once nobody has run a query for ``idle_shutdown`` seconds,
+    so an unused app lets the warehouse auto-stop; the next query (or
+    scheduled warm-up) resumes it.
+    """
+    
+    def __init__(
+        self,
+        pool: Optional[DatabricksConnectionPool] = None,
+        warm_connections: Optional[int] = None,
+        interval: Optional[float] = None,
+        idle_shutdown: Optional[float] = None,
+        warmup_times: Optional[str] = None,
+        warmup_lead_minutes: Optional[float] = None,
+    ):
+        """
+        Initialize the scheduler. Nothing runs until start().
+        
+        Args:
+            pool: Connection pool to keep warm. Defaults to the shared global pool.
+            warm_connections: Connections opened on start and by warm-ups. Defaults to settings.keepalive_warm_connections.
+            interval: Seconds between pings. Defaults to settings.keepalive_interval.
+            idle_shutdown: Seconds without queries after which pinging stops.
+                Defaults to settings.keepalive_idle_shutdown.
+            warmup_times: Comma-separated HH:MM (UTC) shift starts. Defaults to settings.warmup_times.
+            warmup_lead_minutes: Minutes before each shift to warm up. Defaults to settings.warmup_lead_minutes.
+        """
+        self._pool = pool
+        self._warm_connections = (
+            warm_connections if warm_connections is not None else settings.keepalive_warm_connections
+        )
+        self._interval = interval if interval is not None else settings.keepalive_interval
+        self._idle_shutdown = idle_shutdown if idle_shutdown is not None else settings.keepalive_idle_shutdown
+        self._warmup_times = parse_warmup_times(warmup_times if warmup_times is not None else settings.warmup_times)
+        self._warmup_lead = timedelta(
+            minutes=warmup_lead_minutes if warmup_lead_minutes is not None else settings.warmup_lead_minutes
+        )
+        
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at = time.monotonic()
+        self._last_ping_at = 0.0
+        self._next_warmup: Optional[datetime] = None
+        self._paused = False
+        
+        # Metrics
+        self._warmups = 0
+        self._ping_rounds = 0
+        self._pauses = 0
+    
+    @property
+    def pool(self) -> DatabricksConnectionPool:
+        """Pool to keep warm; resolved lazily so tests can swap the global pool."""
+        return self._pool or databricks_connection_pool
+    
+    def next_warmup_after(self, now: datetime) -> Optional[datetime]:
+        """Next scheduled warm-up (shift start minus the lead time) after now, or None."""
+        candidates = []
+        for day in (now.date(), now.date() + timedelta(days=1)):
+            for shift in self._warmup_times:
+                warmup = datetime.combine(day, shift, timezone.utc) - self._warmup_lead
+                if warmup > now:
+                    candidates.append(warmup)
+        return min(candidates) if candidates else None
+    
+    def start(self) -> None:
+        """Start the background scheduler (no-op if it is already running)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._started_at = time.monotonic()
+            self._next_warmup = self.next_warmup_after(datetime.now(timezone.utc))
+            self._thread = threading.Thread(target=self._run, name="warehouse-keepalive", daemon=True)
+            self._thread.start()
+        
+        print(f"✓ Warehouse keepalive started (ping every {self._interval:.0f}s, "
+              f"pause after {self._idle_shutdown:.0f}s without queries)")
+        if self._next_warmup is not None:
+            print(f"  Next warehouse warm-up: {self._next_warmup:%Y-%m-%d %H:%M} UTC")
+    
+    def stop(self) -> None:
+        """Stop the background scheduler."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        self._stop.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5.0)
+    
+    def _run(self) -> None:
+        self._warm("startup")
+        tick = min(self._interval, _MAX_TICK_SECONDS)
+        while not self._stop.wait(tick):
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"  ⚠️  Warehouse keepalive error: {e}")
+    
+    def _warm(self, reason: str) -> None:
+        """Open the warm connections and ping them, which also starts a stopped warehouse."""
+        start = time.perf_counter()
+        try:
+            opened = self.pool.warm(self._warm_connections)
+            self.pool.ping_idle()
+        except Exception as e:
+            print(f"  ⚠️  Warehouse warm-up ({reason}) failed: {e}")
+            return
+        with self._lock:
+            self._warmups += 1
+            self._last_ping_at = time.monotonic()
+        print(f"  ✓ Warehouse warm-up ({reason}): opened {opened} connection(s) "
+              f"in {time.perf_counter() - start:.1f}s")
+    
+    def tick(self) -> None:
+        """Run any due warm-up, then ping idle connections if the app is in use."""
+        now_utc = datetime.now(timezone.utc)
+        if self._next_warmup is not None and now_utc >= self._next_warmup:
+            self._next_warmup = self.next_warmup_after(now_utc)
+            # Opening connections counts as a user checkout, so pinging continues into the shift
+            self._warm("scheduled")
+        
+        now = time.monotonic()
+        last_used = max(self.pool.last_user_checkout_at or 0.0, self._started_at)
+        if now - last_used >= self._idle_shutdown:
+            if not self._paused:
+                self._paused = True
+                with self._lock:
+                    self._pauses += 1
+                print(f"  Warehouse keepalive paused: no queries for {now - last_used:.0f}s")
+            # Let the pool close its connections as they pass the idle limit
+            self.pool.evict_idle()
+            return
+        
+        if self._paused:
+            self._paused = False
+            print(f"  Warehouse keepalive resumed")
+        if now - self._last_ping_at >= self._interval:
+            self.pool.ping_idle()
+            with self._lock:
+                self._last_ping_at = now
+                self._ping_rounds += 1
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        last_used = max(self.pool.last_user_checkout_at or 0.0, self._started_at)
+        with self._lock:
+            return {
+                'running': self._thread is not None,
+                'paused': self._paused,
+                'warmups': self._warmups,
+                'ping_rounds': self._ping_rounds,
+                'pauses': self._pauses,
+                'idle_s': time.monotonic() - last_used,
+                'next_warmup': self._next_warmup.isoformat() if self._next_warmup else None,
+            }
+
+
+# Global scheduler for the shared connection pool
+warehouse_keepalive = WarehouseKeepalive()
+atexit.register(warehouse_keepalive.stop)
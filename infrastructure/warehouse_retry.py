@@ -0,0 +1,291 @@
+"""Retry policy and circuit breaker for Databricks SQL warehouse calls."""
+
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from databricks.sql import exc as sql_exc
+
+# Ensure parent directory is in path
+_parent = Path(__file__).resolve().parent.parent
+if str(_parent) not in sys.path:
+    sys.path.insert(0, str(_parent))
+
+from config.settings import settings
+
+
+class ErrorKind(Enum):
+    """How a failed warehouse call should be handled."""
+    TRANSIENT = "transient"  # Connection/session/network problem: retry on a fresh connection
+    FATAL = "fatal"  # Query or programming error: retrying cannot help
+
+
+def _connector_types(*names: str) -> tuple:
+    """Resolve connector exception classes by name, skipping ones this version lacks."""
+    return tuple(t for t in (getattr(sql_exc, name, None) for name in names) if isinstance(t, type))
+
+
+# Checked first: network errors the connector has declared unsafe or pointless to retry
+_NON_RETRYABLE_TYPES = _connector_types("NonRecoverableNetworkError", "UnsafeToRetryError")
+
+_TRANSIENT_TYPES = _connector_types(
+    "RequestError",
+    "SessionAlreadyClosedError",
+    "CursorAlreadyClosedError",
+    "MaxRetryDurationError",
+    "OperationalError",
+) + (ConnectionError, TimeoutError)
+
+# The server reports an expired session as a ServerOperationError; only these
+# messages are treated as transient, every other server error is a query error.
+_SERVER_SESSION_MESSAGES = ("invalid sessionhandle", "invalid session", "session expired", "session is closed")
+_SERVER_OPERATION_TYPES = _connector_types("ServerOperationError")
+
+# Errors the warehouse itself reported (query, data or server errors). Our own
+# errors (pool timeout, cancellation, bad input) never reached the warehouse.
+_WAREHOUSE_ERROR_TYPES = _connector_types("DatabaseError")
+
+
+def classify_error(error: BaseException) -> ErrorKind:
+    """
+    Classify a connector exception by type.
+    
+    Args:
+        error: Exception raised by a warehouse call
+    
+    Returns:
+        ErrorKind.TRANSIENT if the call may succeed on a fresh connection, else ErrorKind.FATAL
+    """
+    if _NON_RETRYABLE_TYPES and isinstance(error, _NON_RETRYABLE_TYPES):
+        return ErrorKind.FATAL
+    if isinstance(error, _TRANSIENT_TYPES):
+        return ErrorKind.TRANSIENT
+    if _SERVER_OPERATION_TYPES and isinstance(error, _SERVER_OPERATION_TYPES):
+        message = str(error).lower()
+        if any(fragment in message for fragment in _SERVER_SESSION_MESSAGES):
+            return ErrorKind.TRANSIENT
+    return ErrorKind.FATAL
+
+
+def is_warehouse_error(error: BaseException) -> bool:
+    """True if the warehouse answered with this error, as opposed to a network or client-side failure."""
+    if _NON_RETRYABLE_TYPES and isinstance(error, _NON_RETRYABLE_TYPES):
+        return False
+    return bool(_WAREHOUSE_ERROR_TYPES) and isinstance(error, _WAREHOUSE_ERROR_TYPES)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when the warehouse circuit breaker is open and no fallback is available."""
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff with full jitter, bounded by attempts and a per-request deadline."""
+    max_attempts: int = 4
+    base_delay: float = 0.5  # Seconds before the first retry (before jitter)
+    max_delay: float = 8.0  # Cap on a single backoff
+    multiplier: float = 2.0
+    deadline: float = 30.0  # Total seconds a request may spend including retries
+    
+    def compute_delay(self, attempt: int) -> float:
+        """
+        Backoff before retry number ``attempt`` (1-based), with full jitter.
+        
+        Full jitter spreads the retries of many concurrent callers so a
+        warehouse restart is not met by a synchronized reconnect storm.
+        """
+        ceiling = min(self.max_delay, self.base_delay * (self.multiplier ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+    
+    @classmethod
+    def from_settings(cls) -> "RetryPolicy":
+        return cls(
+            max_attempts=settings.retry_max_attempts,
+            base_delay=settings.retry_base_delay,
+            max_delay=settings.retry_max_delay,
+            deadline=settings.retry_deadline,
+        )
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker for the SQL warehouse.
+    
+    Opens after ``failure_threshold`` consecutive transient failures. While open,
+    calls fail fast; after ``reset_timeout`` one half-open probe is let through
+    and its outcome closes or re-opens the breaker.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, failure_threshold: Optional[int] = None, reset_timeout: Optional[float] = None):
+        self._failure_threshold = failure_threshold or settings.circuit_failure_threshold
+        self._reset_timeout = reset_timeout if reset_timeout is not None else settings.circuit_reset_timeout
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self._times_opened = 0
+    
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+    
+    def allow_request(self) -> bool:
+        """Return True if a call may proceed; moves OPEN to HALF_OPEN once the reset timeout passes."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self._reset_timeout:
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self._state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+    
+    def record_success(self) -> None:
+        """The warehouse answered; close the breaker."""
+        with self._lock:
+            if self._state != self.CLOSED:
+                print("  ✓ Warehouse circuit breaker closed")
+            self._state = self.CLOSED
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+    
+    def release_probe(self) -> None:
+        """The call ended without reaching the warehouse; let another probe through, state unchanged."""
+        with self._lock:
+            self._probe_in_flight = False
+    
+    def record_failure(self) -> None:
+        """A transient failure; open the breaker at the threshold or when a probe fails."""
+        with self._lock:
+            self._consecutive_failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or (
+                self._state == self.CLOSED and self._consecutive_failures >= self._failure_threshold
+            ):
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._times_opened += 1
+                print(f"  ⚠️  Warehouse circuit breaker opened after {self._consecutive_failures} failures")
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'state': self._state,
+                'consecutive_failures': self._consecutive_failures,
+                'times_opened': self._times_opened,
+            }
+
+
+class WarehouseRetrier:
+    """Runs warehouse calls under a RetryPolicy and a shared CircuitBreaker."""
+    
+    def __init__(self, policy: Optional[RetryPolicy] = None, breaker: Optional[CircuitBreaker] = None):
+        """
+        Initialize the retrier.
+        
+        Args:
+            policy: Retry policy. Defaults to RetryPolicy.from_settings().
+            breaker: Circuit breaker. Defaults to a new breaker configured from settings.
+        """
+        self.policy = policy or RetryPolicy.from_settings()
+        self.breaker = breaker or CircuitBreaker()
+        self._lock = threading.Lock()
+        self._retries = 0
+        self._fast_failures = 0
+        self._fallbacks_served = 0
+    
+    def _fail(self, error: BaseException, fallback: Optional[Callable[[], Any]]):
+        if fallback is None:
+            raise error
+        with self._lock:
+            self._fallbacks_served += 1
+        print(f"  ↩️  Serving cached data: {error}")
+        return fallback()
+    
+    def call(
+        self,
+        func: Callable[[], Any],
+        fallback: Optional[Callable[[], Any]] = None,
+        deadline: Optional[float] = None,
+    ) -> Any:
+        """
+        Call ``func`` with backoff retries on transient errors.
+        
+        Args:
+            func: Zero-argument callable performing the warehouse call
+            fallback: Optional callable returning cached data, used instead of
+                raising when the breaker is open or retries are exhausted
+            deadline: Seconds this request may spend in total. Defaults to the policy deadline.
+        
+        Returns:
+            Result of func, or of fallback
+        """
+        if not self.breaker.allow_request():
+            with self._lock:
+                self._fast_failures += 1
+            return self._fail(CircuitOpenError("Databricks SQL warehouse unavailable (circuit open)"), fallback)
+        
+        deadline_at = time.monotonic() + (deadline if deadline is not None else self.policy.deadline)
+        attempt = 0
+        
+        while True:
+            attempt += 1
+            try:
+                result = func()
+            except Exception as e:
+                if classify_error(e) is ErrorKind.FATAL:
+                    if is_warehouse_error(e):
+                        # The warehouse answered; this is a query problem, not an outage
+                        self.breaker.record_success()
+                    else:
+                        # Raised before reaching the warehouse (pool timeout, cancellation, bad input)
+                        self.breaker.release_probe()
+                    raise
+                
+                self.breaker.record_failure()
+                delay = self.policy.compute_delay(attempt)
+                if (
+                    attempt >= self.policy.max_attempts or
+                    self.breaker.state == CircuitBreaker.OPEN or
+                    time.monotonic() + delay > deadline_at
+                ):
+                    return self._fail(e, fallback)
+                
+                print(f"  ⚠️  Transient warehouse error (attempt {attempt}/{self.policy.max_attempts}), "
+                      f"retrying in {delay:.2f}s")
+                print(f"  Error type: {type(e).__name__}")
+                print(f"  Error: {e}")
+                with self._lock:
+                    self._retries += 1
+                time.sleep(delay)
+                continue
+            
+            self.breaker.record_success()
+            return result
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = {
+                'retries': self._retries,
+                'fast_failures': self._fast_failures,
+                'fallbacks_served': self._fallbacks_served,
+            }
+        metrics.update({f"breaker_{k}": v for k, v in self.breaker.get_metrics().items()})
+        return metrics
+
+
+# Global retrier shared by the query and mapping services
+warehouse_retrier = WarehouseRetrier()
@@ -11,13 +11,24 @@ if str(_parent) not in sys.path:
 # Import settings to check platform
 from config.settings import settings
 from services.camera_config import CameraConfigService, camera_config_service
-from services.databricks_mapping_service import DatabricksMappingService, databricks_mapping_service
+from services.databricks_mapping_service import DatabricksMappingService, MappingSnapshot, databricks_mapping_service
+from services.mapping_refresher import MappingRefresher, mapping_refresher
 from services.media_service import MediaService, media_service
 
 # Import the appropriate query service based on platform
 if settings.platform == "databricks":
     from services.databricks_query_service import DatabricksQueryService as QueryService
     from services.databricks_query_service import databricks_query_service as query_service
+    from services.async_query_service import AsyncDatabricksQueryService, async_query_service
+    from services.query_result_cache import QueryResultCache, query_result_cache
+    from services.parquet_result_cache import ParquetResultCache, parquet_result_cache
+elif settings.platform == "local":
+    # Same statements and caches as Databricks, on an embedded engine over local files
+    from services.local_query_service import LocalQueryService as QueryService
+    from services.local_query_service import local_query_service as query_service
+    from services.async_query_service import AsyncDatabricksQueryService, async_query_service
+    from services.query_result_cache import QueryResultCache, query_result_cache
+    from services.parquet_result_cache import ParquetResultCache, parquet_result_cache
 else:
     from services.query_service import QueryService, query_service
 
@@ -26,8 +37,21 @@ __all__ = [
     "camera_config_service",
     "DatabricksMappingService",
     "databricks_mapping_service",
+    "MappingSnapshot",
+    "MappingRefresher",
+    "mapping_refresher",
     "QueryService", 
     "query_service",
     "MediaService",
     "media_service",
 ]
+
+if settings.platform in ("databricks", "local"):
+    __all__ += [
+        "AsyncDatabricksQueryService",
+        "async_query_service",
+        "QueryResultCache",
+        "query_result_cache",
+        "ParquetResultCache",
+        "parquet_result_cache",
+    ]
@@ -0,0 +1,197 @@
+"""Asyncio wrapper around DatabricksQueryService for non-blocking Gradio handlers."""
+
+import asyncio
+import functools
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, List, Optional, Tuple
+
+import pandas as pd
+
+# Ensure parent directory is in path
+_parent = Path(__file__).resolve().parent.parent
+if str(_parent) not in sys.path:
+    sys.path.insert(0, str(_parent))
+
+from config.settings import settings
+from infrastructure.query_cancellation import CancellationToken
+from services.databricks_query_service import DatabricksQueryService, databricks_query_service
+
+
+class AsyncDatabricksQueryService:
+    """
+    Async variant of DatabricksQueryService.
+    
+    Connector calls run on a bounded thread pool so the event loop (and the
+    Gradio worker that awaits it) is free while the warehouse works.
+    Cancelling the awaiting task cancels the in-flight statement with
+    cursor.cancel().
+    """
+    
+    def __init__(
+        self,
+        query_service: Optional[DatabricksQueryService] = None,
+        max_workers: Optional[int] = None
+    ):
+        """
+        Initialize the async query service.
+        
+        Args:
+            query_service: Sync service to delegate to. Defaults to the global instance.
+            max_workers: Maximum concurrent warehouse calls. Defaults to settings.async_query_workers.
+        """
+        self._service = query_service or databricks_query_service
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or settings.async_query_workers,
+            thread_name_prefix="warehouse-query",
+        )
+    
+    async def _run(
+        self,
+        func: Callable[..., Any],
+        *args,
+        cancel_token: Optional[CancellationToken] = None,
+        **kwargs
+    ) -> Any:
+        """
+        Run a sync service method on the executor, cancelling its statement if the task is cancelled.
+        
+        A caller-supplied cancel_token (e.g. from the in-flight query registry)
+        can also cancel the statement from elsewhere.
+        """
+        cancel_token = cancel_token or CancellationToken()
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            self._executor,
+            functools.partial(func, *args, cancel_token=cancel_token, **kwargs),
+        )
+        try:
+            return await future
+        except asyncio.CancelledError:
+            cancelled = cancel_token.cancel()
+            if cancelled:
+                print(f"  ✗ Cancelled {cancelled} in-flight statement(s)")
+            raise
+    
+    async def get_filter_options(
+        self,
+        date_str: str,
+        end_date: Optional[str] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]], List[Tuple[str, str]]]:
+        """Async version of DatabricksQueryService.get_filter_options."""
+        return await self._run(self._service.get_filter_options, date_str, end_date=end_date, cancel_token=cancel_token)
+    
+    async def get_available_tenants(
+        self,
+        date_str: str,
+        end_date: Optional[str] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> List[Tuple[str, str]]:
+        """Async version of DatabricksQueryService.get_available_tenants."""
+        return await self._run(self._service.get_available_tenants, date_str, end_date=end_date, cancel_token=cancel_token)
+    
+    async def get_available_farms(
+        self,
+        date_str: str,
+        tenant_id: Optional[str] = None,
+        end_date: Optional[str] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> List[Tuple[str, str]]:
+        """Async version of DatabricksQueryService.get_available_farms."""
+        return await self._run(
+            self._service.get_available_farms, date_str, tenant_id, end_date=end_date, cancel_token=cancel_token
+        )
+    
+    async def get_available_cameras(
+        self,
+        date_str: str,
+        farm_id: Optional[str] = None,
+        end_date: Optional[str] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> List[Tuple[str, str]]:
+        """Async version of DatabricksQueryService.get_available_cameras."""
+        return await self._run(
+            self._service.get_available_cameras, date_str, farm_id, end_date=end_date, cancel_token=cancel_token
+        )
+    
+    async def search_available_cameras(
+        self,
+        date_str: str,
+        query: str,
+        tenant_id: Optional[str] = None,
+        farm_id: Optional[str] = None,
+        end_date: Optional[str] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> List[Tuple[str, str]]:
+        """Async version of DatabricksQueryService.search_available_cameras."""
+        return await self._run(
+            self._service.search_available_cameras, date_str, query, tenant_id, farm_id,
+            end_date=end_date, cancel_token=cancel_token,
+        )
+    
+    async def query_stage1_stage2_linked(self, date_str: str, **kwargs) -> pd.DataFrame:
+        """
+        Async version of DatabricksQueryService.query_stage1_stage2_linked.
+        
+        Accepts the same keyword filters as the sync method.
+        """
+        return await self._run(self._service.query_stage1_stage2_linked, date_str, **kwargs)
+    
+    async def query_linked_page(self, date_str: str, **kwargs) -> Tuple[pd.DataFrame, Optional[str]]:
+        """
+        Async version of DatabricksQueryService.query_linked_page.
+        
+        Accepts the same keyword filters as the sync method.
+        """
+        return await self._run(self._service.query_linked_page, date_str, **kwargs)
+    
+    async def iter_stage1_stage2_linked(
+        self,
+        date_str: str,
+        cancel_token: Optional[CancellationToken] = None,
+        **kwargs
+    ) -> AsyncIterator[pd.DataFrame]:
+        """
+        Async version of DatabricksQueryService.iter_stage1_stage2_linked.
+        
+        Each fetchmany() runs on the executor. If the consuming task is
+        cancelled or stops iterating early, the statement is cancelled and
+        the pooled connection is returned once the in-flight fetch finishes.
+        """
+        cancel_token = cancel_token or CancellationToken()
+        chunks = self._service.iter_stage1_stage2_linked(date_str, cancel_token=cancel_token, **kwargs)
+        exhausted = object()
+        finished = False
+        pending = None
+        try:
+            while True:
+                pending = self._executor.submit(next, chunks, exhausted)
+                chunk = await asyncio.wrap_future(pending)
+                if chunk is exhausted:
+                    finished = True
+                    return
+                yield chunk
+        finally:
+            if not finished:
+                cancelled = cancel_token.cancel()
+                if cancelled:
+                    print(f"  ✗ Cancelled {cancelled} in-flight statement(s)")
+            if pending is not None and not pending.done():
+                # The fetch is still running on a worker; close the generator once it returns
+                pending.add_done_callback(lambda _: chunks.close())
+            else:
+                chunks.close()
+    
+    def shutdown(self) -> None:
+        """Stop accepting work and release the executor threads."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Global instance, wrapping the configured platform's query service
+if settings.platform == "local":
+    from services.local_query_service import local_query_service
+    async_query_service = AsyncDatabricksQueryService(local_query_service)
+else:
+    async_query_service = AsyncDatabricksQueryService()
@@ -0,0 +1,167 @@
+"""In-memory Stage 1 / Stage 2 linkage over per-day table slices."""
+
+from datetime import datetime, timedelta
+from typing import Collection, Optional
+
+import pandas as pd
+
+from services.databricks_query_builder import LINKED_COLUMNS, PageCursor
+
+# Same patterns as the REGEXP_EXTRACT calls in DatabricksQueryBuilder.linked_results()
+STAGE1_BLK_PATTERN = r'/(?P<blk_file>\d{3}_\d{7})_'
+STAGE2_BLK_PATTERN = r'^(?P<blk_file>\d{3}_\d{7})_'
+TIMESTAMP_KEY_PATTERN = r'_(?P<timestamp_key>\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})'
+
+_STAGE2_KEYS = ["camera_id", "blk_file", "video_timestamp_key"]
+
+
+def extract_key(values: pd.Series, pattern: str) -> pd.Series:
+    """
+    Vectorized REGEXP_EXTRACT of a pattern's only (named) group.
+    
+    Matches Spark's semantics: an empty string when the pattern doesn't
+    match, null for null input.
+    """
+    extracted = values.str.extract(pattern, expand=False)
+    return extracted.fillna("").where(values.notna())
+
+
+def prepare_stage1_day(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Derive the linkage keys of a Stage 1 day slice and order it for paging.
+    
+    Replaces first_frame_uri with blk_file and event_timestamp, and sorts
+    by (stage1_timestamp, session_id) descending, so filtered subsets are
+    already in result order.
+    """
+    if df.empty:
+        return df.drop(columns=["first_frame_uri"], errors="ignore").assign(blk_file=[], event_timestamp=[])
+    uri = df["first_frame_uri"]
+    df = df.drop(columns=["first_frame_uri"]).assign(
+        blk_file=extract_key(uri, STAGE1_BLK_PATTERN),
+        event_timestamp=extract_key(uri, TIMESTAMP_KEY_PATTERN),
+    )
+    return df.sort_values(["stage1_timestamp", "session_id"], ascending=False, ignore_index=True)
+
+
+def prepare_stage2_day(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Derive the linkage keys of a Stage 2 day slice.
+    
+    Replaces file_name with blk_file and video_timestamp_key. Rows with a
+    null key can never match (NULL = NULL is not true in SQL), so they are
+    dropped here rather than on every join.
+    """
+    if df.empty:
+        return df.drop(columns=["file_name"], errors="ignore").assign(blk_file=[], video_timestamp_key=[])
+    file_name = df["file_name"]
+    df = df.drop(columns=["file_name"]).assign(
+        blk_file=extract_key(file_name, STAGE2_BLK_PATTERN),
+        video_timestamp_key=extract_key(file_name, TIMESTAMP_KEY_PATTERN),
+    )
+    return df.dropna(subset=_STAGE2_KEYS).reset_index(drop=True)
+
+
+def _column_time(column: pd.Series, value: datetime) -> pd.Timestamp:
+    """A bound comparable with a timestamp column (tz-aware columns are compared in UTC)."""
+    timestamp = pd.Timestamp(value)
+    column_tz = getattr(column.dt, "tz", None)
+    if column_tz is not None and timestamp.tzinfo is None:
+        return timestamp.tz_localize("UTC")
+    if column_tz is None and timestamp.tzinfo is not None:
+        return timestamp.tz_convert("UTC").tz_localize(None)
+    return timestamp
+
+
+def link_stage1_stage2(
+    stage1: pd.DataFrame,
+    stage2: pd.DataFrame,
+    range_start: datetime,
+    range_end: datetime,
+    stage2_start: datetime,
+    stage2_end: datetime,
+    stage2_slack: timedelta,
+    farm_ids: Optional[Collection[str]] = None,
+    camera_id: Optional[str] = None,
+    should_forward_only: bool = False,
+    after: Optional[PageCursor] = None,
+    limit: int = 50
+) -> pd.DataFrame:
+    """
+    The linked_results() query, evaluated in memory as a hash join.
+    
+    Args:
+        stage1: Stage 1 slice(s) from prepare_stage1_day(), in result order.
+        stage2: Stage 2 slice(s) from prepare_stage2_day() covering the Stage 2 window.
+        range_start: Start of the Stage 1 range (inclusive).
+        range_end: End of the Stage 1 range (exclusive).
+        stage2_start: Start of the Stage 2 window (inclusive).
+        stage2_end: End of the Stage 2 window (exclusive).
+        stage2_slack: A match must lie within this of its own Stage 1 row, as in the SQL join.
+        farm_ids: Optional farms to keep (a farm filter, or a tenant's farms).
+        camera_id: Optional camera ID filter.
+        should_forward_only: If True, only keep forwarded events.
+        after: Optional (stage1_timestamp, session_id, stage2_inference_id) keyset cursor.
+        limit: Maximum number of results.
+        
+    Returns:
+        DataFrame with the linked_results() columns, ordered by
+        (stage1_timestamp, session_id, stage2_inference_id) descending,
+        rows without a Stage 2 match last within their session.
+    """
+    if stage1.empty:
+        return pd.DataFrame(columns=LINKED_COLUMNS)
+    
+    ts = stage1["stage1_timestamp"]
+    mask = (ts >= _column_time(ts, range_start)) & (ts < _column_time(ts, range_end))
+    if farm_ids is not None:
+        mask &= stage1["farm_id"].isin(list(farm_ids))
+    if camera_id:
+        mask &= stage1["camera_id"] == camera_id
+    if should_forward_only:
+        mask &= stage1["stage1_should_forward"] == True  # noqa: E712 (nullable booleans)
+    if after is not None:
+        cursor_timestamp = _column_time(ts, after[0])
+        # Keeps the cursor's own session; its rows past the cursor are selected after the join
+        mask &= (ts < cursor_timestamp) | ((ts == cursor_timestamp) & (stage1["session_id"] <= after[1]))
+    
+    # The join only adds Stage 2 columns (and duplicates for multiple matches),
+    # so the first `limit` Stage 1 rows (plus the cursor's session) are the only ones that can be returned
+    s1 = stage1[mask.fillna(False)].head(limit if after is None else limit + 1).reset_index(drop=True)
+    
+    s2 = stage2
+    if not s2.empty:
+        s2_ts = s2["stage2_timestamp"]
+        s2_mask = (s2_ts >= _column_time(s2_ts, stage2_start)) & (s2_ts < _column_time(s2_ts, stage2_end))
+        if camera_id:
+            s2_mask &= s2["camera_id"] == camera_id
+        s2 = s2[s2_mask.fillna(False)]
+    
+    # Inner join on the keys, drop matches outside the slack of their Stage 1 row, then
+    # LEFT JOIN the rest back by Stage 1 row so sessions without a match keep one row
+    keys = ["camera_id", "blk_file", "event_timestamp"]
+    matches = s1[keys + ["stage1_timestamp"]].reset_index(names="s1_row").merge(
+        s2.rename(columns={"video_timestamp_key": "event_timestamp"}), on=keys
+    )
+    in_slack = (matches["stage2_timestamp"] >= matches["stage1_timestamp"] - stage2_slack) & (
+        matches["stage2_timestamp"] < matches["stage1_timestamp"] + stage2_slack
+    )
+    linked = s1.reset_index(names="s1_row").merge(
+        matches[in_slack.fillna(False)].drop(columns=keys + ["stage1_timestamp"]),
+        on="s1_row",
+        how="left",
+    )
+    # Within a session, matches in stage2_inference_id DESC NULLS LAST order (a stable sort keeps the Stage 1 order)
+    linked = linked.sort_values("stage2_inference_id", ascending=False, na_position="last", kind="stable")
+    linked = linked.sort_values(["stage1_timestamp", "session_id"], ascending=False, kind="stable")
+    if after is not None:
+        at_cursor = (linked["stage1_timestamp"] == _column_time(linked["stage1_timestamp"], after[0])) & (
+            linked["session_id"] == after[1]
+        )
+        if after[2] is None:
+            past = pd.Series(False, index=linked.index)
+        else:
+            inference_id = linked["stage2_inference_id"]
+            past = (inference_id < after[2]).fillna(False) | inference_id.isna()
+        linked = linked[~at_cursor.fillna(False) | past]
+    return linked[LINKED_COLUMNS].head(limit).reset_index(drop=True)
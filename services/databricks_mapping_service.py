@@ -1,128 +1,604 @@
 """Databricks table-based mapping service for cameras, farms, and tenants."""
 
-from typing import Dict, Tuple, Optional
-from infrastructure.databricks_client import get_databricks_connection
+import json
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Collection, Dict, Iterable, List, Tuple, Optional
+from infrastructure.databricks_client import DatabricksConnectionPool, databricks_connection_pool
+from infrastructure.single_flight import single_flight
+from infrastructure.warehouse_retry import warehouse_retrier
+from services.camera_config import CameraConfigService, camera_config_service
+from services.databricks_query_builder import DatabricksQueryBuilder, databricks_query_builder
 from config.settings import settings
 
+# Bumped when the snapshot file layout changes; other formats are ignored
+_SNAPSHOT_FORMAT = 2
 
-class DatabricksMappingService:
-    """Service for loading camera/farm/tenant mappings from Databricks tables."""
+# Most search results returned to a dropdown
+DEFAULT_SEARCH_LIMIT = 50
+
+
+def _match_rank(name: str, query: str) -> Optional[int]:
+    """0 if name starts with query, 1 if a word in it does, 2 if it contains it elsewhere, else None."""
+    position = name.find(query)
+    if position == 0:
+        return 0
+    while position != -1:
+        if not name[position - 1].isalnum():
+            return 1
+        position = name.find(query, position + 1)
+    return 2 if query in name else None
+
+
+class NameIndex:
+    """
+    Typeahead search over display names.
     
-    def __init__(self):
-        """Initialize the mapping service."""
-        self._camera_mapping: Dict[str, Dict[str, str]] = {}
-        self._farm_mapping: Dict[str, Dict[str, str]] = {}
-        self._tenant_mapping: Dict[str, Dict[str, str]] = {}
-        self._loaded = False
+    Matches are ranked as name prefix first, then word prefix (e.g. "barn"
+    finds "North Barn 2"), then any other substring, each in name order.
+    Name prefixes are a binary search over the sorted names; other matches
+    come from one scan of all names joined into a single lowercase string,
+    so building the index costs a sort and searching tens of thousands of
+    names takes a few milliseconds at most.
+    """
     
-    def load(self) -> Tuple[Dict, Dict, Dict]:
+    def __init__(self, entries: Iterable[Tuple[str, str]]):
+        """
+        Build the index.
+        
+        Args:
+            entries: (display_name, id) pairs.
         """
-        Load mappings from Databricks tables.
+        self.entries: List[Tuple[str, str]] = sorted(entries, key=lambda entry: (entry[0].casefold(), entry[1]))
+        self._names = [name.casefold() for name, _ in self.entries]
+        self._positions = {entry_id: i for i, (_, entry_id) in enumerate(self.entries)}
         
+        # All names joined by a separator no query contains, for substring lookups
+        self._text = "\n".join(self._names)
+        self._offsets = []
+        offset = 0
+        for name in self._names:
+            self._offsets.append(offset)
+            offset += len(name) + 1
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    def search(
+        self,
+        query: str,
+        limit: Optional[int] = DEFAULT_SEARCH_LIMIT,
+        ids: Optional[Collection[str]] = None,
+    ) -> List[Tuple[str, str]]:
+        """
+        Names matching query, best matches first.
+        
+        Args:
+            query: Text typed by the user; case-insensitive. Empty matches everything.
+            limit: Most results to return, or None for all.
+            ids: Optional ids to restrict the results to (e.g. one farm's cameras).
+            
         Returns:
-            Tuple of (camera_mapping, farm_mapping, tenant_mapping)
+            List of (display_name, id) tuples.
         """
-        if self._loaded:
-            return self._camera_mapping, self._farm_mapping, self._tenant_mapping
+        query = query.strip().casefold()
+        if ids is not None:
+            ids = ids if isinstance(ids, (set, frozenset, dict)) else set(ids)
+            # A farm's cameras are few; ranking them directly beats scanning every name
+            if len(ids) * 8 < len(self.entries):
+                return self._search_subset(query, limit, ids)
+        
+        results: List[Tuple[str, str]] = []
+        
+        def take(indexes: Iterable[int]) -> bool:
+            # Appends matches in order; True once the limit is reached
+            for i in indexes:
+                if ids is not None and self.entries[i][1] not in ids:
+                    continue
+                results.append(self.entries[i])
+                if limit is not None and len(results) >= limit:
+                    return True
+            return False
         
+        if not query:
+            take(range(len(self.entries)))
+            return results
+        
+        # Name prefix: a contiguous run of the sorted names
+        start = bisect_left(self._names, query)
+        end = bisect_right(self._names, query + "\uffff", lo=start)
+        if take(range(start, end)) or "\n" in query:
+            return results
+        
+        # Word prefix, then any other substring
+        words, others = [], []
+        for i in self._substring_matches(query):
+            rank = _match_rank(self._names[i], query)
+            if rank == 1:
+                words.append(i)
+                # Every later match ranks below these, so stop once they fill the page
+                if ids is None and limit is not None and len(results) + len(words) >= limit:
+                    break
+            elif rank == 2:
+                others.append(i)
+        if not take(words):
+            take(others)
+        return results
+    
+    def _search_subset(self, query: str, limit: Optional[int], ids: Collection[str]) -> List[Tuple[str, str]]:
+        ranked = []
+        for entry_id in ids:
+            i = self._positions.get(entry_id)
+            if i is None:
+                continue
+            rank = _match_rank(self._names[i], query)
+            if rank is not None:
+                ranked.append((rank, i))
+        ranked.sort()
+        return [self.entries[i] for _, i in ranked[:limit]]
+    
+    def _substring_matches(self, query: str) -> Iterable[int]:
+        # Indexes of the names containing query, in name order
+        position = self._text.find(query)
+        while position != -1:
+            i = bisect_right(self._offsets, position) - 1
+            yield i
+            # Continue after this name
+            position = self._text.find(query, self._offsets[i] + len(self._names[i]) + 1)
+
+
+@dataclass(frozen=True)
+class MappingSnapshot:
+    """
+    One consistent generation of the three mappings.
+    
+    Published by a single reference assignment and never mutated
+    afterwards, so a reader holding a snapshot sees matching camera, farm
+    and tenant mappings however many reloads happen meanwhile.
+    
+    Camera records carry their farm_id and tenant_id. The tenant→farms and
+    farm→cameras indexes and the name search indexes are built with the
+    snapshot, so cascades and typeahead never scan the mappings.
+    """
+    camera: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    farm: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    tenant: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    versions: Optional[Tuple] = None  # Delta versions of the mapping tables at load time, if known
+    loaded_at: float = 0.0  # time.time() of the warehouse load
+    source: str = "warehouse"  # "warehouse", "snapshot" (file), "camera_config" (YAML) or "none"
+    
+    # Hierarchy and search indexes, built once per snapshot in __post_init__
+    farms_by_tenant: Dict[str, Tuple[str, ...]] = field(init=False, repr=False, compare=False)
+    cameras_by_farm: Dict[str, Tuple[str, ...]] = field(init=False, repr=False, compare=False)
+    tenant_index: NameIndex = field(init=False, repr=False, compare=False)
+    farm_index: NameIndex = field(init=False, repr=False, compare=False)
+    camera_index: NameIndex = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        farm_index = NameIndex((farm['name'], farm_id) for farm_id, farm in self.farm.items())
+        camera_index = NameIndex((camera['name'], camera_id) for camera_id, camera in self.camera.items())
+        
+        # Children in name order, so they can be used as dropdown choices directly
+        farms_by_tenant: Dict[str, List[str]] = {}
+        for _, farm_id in farm_index.entries:
+            tenant_id = self.farm[farm_id].get('tenant_id')
+            if tenant_id:
+                farms_by_tenant.setdefault(tenant_id, []).append(farm_id)
+        cameras_by_farm: Dict[str, List[str]] = {}
+        for _, camera_id in camera_index.entries:
+            farm_id = self.camera[camera_id].get('farm_id')
+            if farm_id:
+                cameras_by_farm.setdefault(farm_id, []).append(camera_id)
+        
+        # Frozen dataclass: derived fields are set once here and never again
+        object.__setattr__(self, 'farms_by_tenant', {key: tuple(ids) for key, ids in farms_by_tenant.items()})
+        object.__setattr__(self, 'cameras_by_farm', {key: tuple(ids) for key, ids in cameras_by_farm.items()})
+        object.__setattr__(self, 'tenant_index',
+                           NameIndex((tenant['name'], tenant_id) for tenant_id, tenant in self.tenant.items()))
+        object.__setattr__(self, 'farm_index', farm_index)
+        object.__setattr__(self, 'camera_index', camera_index)
+
+
+class DatabricksMappingService:
+    """Service for loading camera/farm/tenant mappings from Databricks tables."""
+    
+    def __init__(
+        self,
+        snapshot_path: Optional[Path] = None,
+        camera_config: Optional[CameraConfigService] = None,
+        pool: Optional[DatabricksConnectionPool] = None,
+        builder: Optional[DatabricksQueryBuilder] = None,
+    ):
+        """
+        Initialize the mapping service.
+        
+        Args:
+            snapshot_path: File the mappings are saved to after each warehouse
+                load. Defaults to settings.mapping_snapshot_path.
+            camera_config: YAML camera config, the last fallback. Defaults to the shared global one.
+            pool: Optional connection pool. Defaults to the shared global pool.
+            builder: Optional statement builder (sets the SQL dialect). Defaults to the shared global one.
+        """
+        self._pool = pool
+        self.builder = builder or databricks_query_builder
+        self._snapshot_path = Path(snapshot_path or settings.mapping_snapshot_path)
+        self._camera_config = camera_config or camera_config_service
+        self._snapshot: Optional[MappingSnapshot] = None
+        self._reload_lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        
+        # Metrics
+        self._reloads = 0
+        self._unchanged = 0
+        self._failures = 0
+    
+    @property
+    def pool(self) -> DatabricksConnectionPool:
+        """Connection pool; resolved lazily so tests can swap the global pool."""
+        return self._pool or databricks_connection_pool
+    
+    def _fetch_mappings(self) -> Tuple[Dict, Dict, Dict]:
+        """Query the three mapping tables in one statement on a pooled connection, joining cameras to tenants."""
         camera_mapping = {}
         farm_mapping = {}
         tenant_mapping = {}
         
-        try:
-            conn = get_databricks_connection()
-            
-            print("Loading tenant mappings from Databricks...")
-            with conn.cursor() as cursor:
-                cursor.execute(f"""
-                    SELECT tenant_id, tenant_name, tenant_ui_url, tenant_slug
-                    FROM {settings.catalog_name}.{settings.schema_name}.tenant_map
-                    WHERE tenant_id IS NOT NULL
-                      AND tenant_id != 'tenant_id'
-                """)
-                
-                for row in cursor.fetchall():
-                    tenant_id, tenant_name, tenant_ui_url, tenant_slug = row
-                    tenant_mapping[tenant_id] = {
-                        'name': tenant_name or 'Unknown Tenant',
-                        'ui_url': tenant_ui_url or '',
-                        'slug': tenant_slug or ''
-                    }
-            
-            print(f"  ✓ Loaded {len(tenant_mapping)} tenants")
-            
-            print("Loading farm mappings from Databricks...")
-            with conn.cursor() as cursor:
-                cursor.execute(f"""
-                    SELECT farm_id, farm_name, tenant_id
-                    FROM {settings.catalog_name}.{settings.schema_name}.farm_map
-                    WHERE farm_id IS NOT NULL
-                      AND farm_id != 'farm_id'
-                """)
-                
-                for row in cursor.fetchall():
-                    farm_id, farm_name, tenant_id = row
-                    tenant_name = tenant_mapping.get(tenant_id, {}).get('name', 'Unknown Tenant') if tenant_id else 'Unknown Tenant'
-                    
-                    farm_mapping[farm_id] = {
-                        'name': farm_name or 'Unknown Farm',
-                        'tenant_id': tenant_id or '',
-                        'tenant_name': tenant_name
-                    }
-            
-            print(f"  ✓ Loaded {len(farm_mapping)} farms")
-            
-            print("Loading camera mappings from Databricks...")
+        print("Loading tenant/farm/camera mappings from Databricks...")
+        with self.pool.connection(background=True) as conn:
             with conn.cursor() as cursor:
-                cursor.execute(f"""
-                    SELECT camera_id, camera_name
-                    FROM {settings.catalog_name}.{settings.schema_name}.farm_camera_map
-                    WHERE camera_id IS NOT NULL
-                      AND camera_id != 'camera_id'
-                """)
+                query = self.builder.mappings()
+                cursor.execute(query.sql, query.parameters)
                 
-                for row in cursor.fetchall():
-                    camera_id, camera_name = row
-                    camera_mapping[camera_id] = {
-                        'name': camera_name or 'Unknown Camera'
-                    }
-            
-            print(f"  ✓ Loaded {len(camera_mapping)} cameras")
-            
-            conn.close()
-            
-        except Exception as e:
-            print(f"Warning: Error loading mappings from Databricks: {e}")
-            import traceback
-            traceback.print_exc()
-            print("  Continuing with empty mappings...")
+                for kind, row_id, name, parent_id, ui_url, slug in cursor.fetchall():
+                    if kind == 'camera':
+                        camera_mapping[row_id] = {
+                            'name': name or 'Unknown Camera',
+                            'farm_id': parent_id or '',
+                            'tenant_id': ''
+                        }
+                    elif kind == 'farm':
+                        farm_mapping[row_id] = {
+                            'name': name or 'Unknown Farm',
+                            'tenant_id': parent_id or '',
+                            'tenant_name': 'Unknown Tenant'
+                        }
+                    elif kind == 'tenant':
+                        tenant_mapping[row_id] = {
+                            'name': name or 'Unknown Tenant',
+                            'ui_url': ui_url or '',
+                            'slug': slug or ''
+                        }
         
-        self._camera_mapping = camera_mapping
-        self._farm_mapping = farm_mapping
-        self._tenant_mapping = tenant_mapping
-        self._loaded = True
+        # UNION ALL rows come in any order, so tenant names are resolved once all tenants are in
+        for farm in farm_mapping.values():
+            if farm['tenant_id'] in tenant_mapping:
+                farm['tenant_name'] = tenant_mapping[farm['tenant_id']]['name']
+        for camera in camera_mapping.values():
+            if camera['farm_id'] in farm_mapping:
+                camera['tenant_id'] = farm_mapping[camera['farm_id']]['tenant_id']
         
+        print(f"  ✓ Loaded {len(tenant_mapping)} tenants, {len(farm_mapping)} farms, {len(camera_mapping)} cameras")
         return camera_mapping, farm_mapping, tenant_mapping
     
-    def reload(self):
-        """Force reload of mappings from Databricks."""
-        self._loaded = False
-        return self.load()
+    def _fetch_versions(self) -> Optional[Tuple]:
+        """Latest Delta versions of the mapping tables, or None if the engine has none."""
+        queries = self.builder.mapping_table_versions()
+        if queries is None:
+            return None
+        
+        versions = []
+        with self.pool.connection(background=True) as conn:
+            for query in queries:
+                with conn.cursor() as cursor:
+                    cursor.execute(query.sql, query.parameters)
+                    row = cursor.fetchone()
+                    versions.append(row[0] if row else None)
+        return tuple(versions)
     
-    def get_camera_mapping(self) -> Dict[str, Dict[str, str]]:
-        if not self._loaded:
+    def _table_versions(self) -> Optional[Tuple]:
+        """Mapping table versions, or None if they can't be read (the mappings are then reloaded)."""
+        try:
+            return warehouse_retrier.call(self._fetch_versions)
+        except Exception as e:
+            print(f"  ⚠️  Could not read mapping table versions: {e}")
+            return None
+    
+    def _load_snapshot(self, versions: Optional[Tuple]) -> MappingSnapshot:
+        """Query the mapping tables into a new snapshot (raises on failure)."""
+        # Concurrent loads (e.g. several sessions hitting an unloaded service) share one set of queries
+        camera_mapping, farm_mapping, tenant_mapping = single_flight.do(
+            ("mappings",),
+            lambda: warehouse_retrier.call(self._fetch_mappings),
+        )
+        return MappingSnapshot(camera_mapping, farm_mapping, tenant_mapping, versions, time.time())
+    
+    def _save_snapshot_later(self, snapshot: MappingSnapshot) -> None:
+        """Save published mappings on a background thread, so loads don't wait for the file write."""
+        threading.Thread(target=self._save_snapshot, args=(snapshot,), name="mapping-snapshot", daemon=True).start()
+    
+    def _save_snapshot(self, snapshot: MappingSnapshot) -> None:
+        """
+        Write warehouse-loaded mappings to the snapshot file.
+        
+        Written to a temporary file and moved into place with os.replace(),
+        so app processes sharing the file never read a partial one. Failures
+        are logged and ignored.
+        """
+        with self._save_lock:
+            # A newer load has been published meanwhile and saves itself
+            if self._snapshot is not snapshot:
+                return
+            self._write_snapshot(snapshot)
+    
+    def _write_snapshot(self, snapshot: MappingSnapshot) -> None:
+        tmp_path = self._snapshot_path.with_name(f".{self._snapshot_path.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp")
+        try:
+            self._snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            payload = {
+                'format': _SNAPSHOT_FORMAT,
+                'camera': snapshot.camera,
+                'farm': snapshot.farm,
+                'tenant': snapshot.tenant,
+                'versions': snapshot.versions,
+                'loaded_at': snapshot.loaded_at,
+            }
+            tmp_path.write_text(json.dumps(payload))
+            os.replace(tmp_path, self._snapshot_path)
+        except Exception as e:
+            print(f"  ⚠️  Could not save mapping snapshot to {self._snapshot_path}: {e}")
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+    
+    def _read_snapshot(self) -> Optional[MappingSnapshot]:
+        """Mappings saved by the last warehouse load, or None if there is no usable snapshot file."""
+        try:
+            payload = json.loads(self._snapshot_path.read_text())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"  ⚠️  Ignoring unreadable mapping snapshot {self._snapshot_path}: {e}")
+            return None
+        if payload.get('format') != _SNAPSHOT_FORMAT:
+            return None
+        versions = payload.get('versions')
+        return MappingSnapshot(
+            camera=payload.get('camera', {}),
+            farm=payload.get('farm', {}),
+            tenant=payload.get('tenant', {}),
+            versions=tuple(versions) if versions is not None else None,
+            loaded_at=payload.get('loaded_at', 0.0),
+            source="snapshot",
+        )
+    
+    def _camera_config_snapshot(self) -> MappingSnapshot:
+        """Camera and farm names from the YAML camera config (no tenants)."""
+        camera_config, farm_config = self._camera_config.load()
+        camera_mapping = {
+            camera_id: {'name': camera['name'], 'farm_id': camera.get('farm_id', ''), 'tenant_id': ''}
+            for camera_id, camera in camera_config.items()
+        }
+        farm_mapping = {
+            farm_id: {'name': farm_name, 'tenant_id': '', 'tenant_name': 'Unknown Tenant'}
+            for farm_id, farm_name in farm_config.items()
+        }
+        return MappingSnapshot(camera_mapping, farm_mapping, {}, source="camera_config" if camera_mapping else "none")
+    
+    def _fallback_snapshot(self) -> MappingSnapshot:
+        """Best mappings available without the warehouse: the snapshot file, else the YAML camera config."""
+        snapshot = self._read_snapshot()
+        if snapshot is not None:
+            age_h = (time.time() - snapshot.loaded_at) / 3600
+            print(f"  ✓ Mappings from snapshot {self._snapshot_path} (saved {age_h:.1f}h ago)")
+            return snapshot
+        
+        try:
+            snapshot = self._camera_config_snapshot()
+        except Exception as e:
+            print(f"  ⚠️  Could not load camera config: {e}")
+            snapshot = MappingSnapshot(source="none")
+        if snapshot.source == "camera_config":
+            print(f"  ✓ Mappings from camera config: {len(snapshot.farm)} farms, {len(snapshot.camera)} cameras")
+        else:
+            print("  ⚠️  No mapping snapshot or camera config; names will show as IDs")
+        return snapshot
+    
+    def warm_start(self) -> MappingSnapshot:
+        """
+        Serve mappings without waiting for the warehouse, then revalidate them in the background.
+        
+        Publishes the snapshot file saved by the last warehouse load (or the
+        YAML camera config if there is none) and starts a reload that skips
+        the table scans if the mapping tables haven't changed since. Requests
+        never wait for the warehouse, so startup time doesn't depend on it.
+        
+        Returns:
+            The mappings served until the revalidation completes
+        """
+        snapshot = self._fallback_snapshot()
+        self._publish(snapshot)
+        threading.Thread(
+            target=lambda: self.reload(force=False),
+            name="mapping-revalidate",
+            daemon=True,
+        ).start()
+        return snapshot
+    
+    def snapshot(self) -> MappingSnapshot:
+        """
+        The current mappings as one consistent snapshot, loading them on first use.
+        
+        Use this when reading more than one mapping, so all lookups come from
+        the same generation even if a reload is swapped in meanwhile.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
             self.load()
-        return self._camera_mapping
+            snapshot = self._snapshot
+        return snapshot
+    
+    def load(self) -> Tuple[Dict, Dict, Dict]:
+        """
+        Load mappings from Databricks tables, unless they are already loaded.
+        
+        If the first load fails the service continues with the fallback
+        mappings (the snapshot file, else the YAML camera config, else none,
+        so names show as IDs) until a reload succeeds.
+        
+        Returns:
+            Tuple of (camera_mapping, farm_mapping, tenant_mapping)
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            try:
+                snapshot = self._load_snapshot(self._table_versions())
+            except Exception as e:
+                print(f"Warning: Error loading mappings from Databricks: {e}")
+                import traceback
+                traceback.print_exc()
+                print("  Continuing with fallback mappings...")
+                snapshot = self._fallback_snapshot()
+                with self._metrics_lock:
+                    self._failures += 1
+            self._publish(snapshot)
+            if snapshot.source == "warehouse":
+                self._save_snapshot_later(snapshot)
+        
+        return snapshot.camera, snapshot.farm, snapshot.tenant
+        
+    def _publish(self, snapshot: MappingSnapshot) -> None:
+        # A single reference assignment: readers see the old snapshot or the new one, never a mix
+        self._snapshot = snapshot
+        
+    def reload(self, force: bool = True) -> Tuple[Dict, Dict, Dict]:
+        """
+        Reload mappings from Databricks and swap them in atomically.
+        
+        Readers keep using the current mappings while the new ones load, and
+        keep them if the reload fails (e.g. while the warehouse is down).
+        
+        Args:
+            force: If False, skip the reload when the mapping tables' Delta
+                versions are unchanged since the current mappings were loaded.
+                
+        Returns:
+            Tuple of (camera_mapping, farm_mapping, tenant_mapping) now served
+        """
+        with self._reload_lock:
+            current = self._snapshot
+            versions = self._table_versions()
+            if (not force and current is not None and versions is not None
+                    and None not in versions and versions == current.versions):
+                with self._metrics_lock:
+                    self._unchanged += 1
+                return current.camera, current.farm, current.tenant
+            
+            try:
+                snapshot = self._load_snapshot(versions)
+            except Exception as e:
+                print(f"  ⚠️  Mapping reload failed, keeping current mappings: {e}")
+                with self._metrics_lock:
+                    self._failures += 1
+                if current is None:
+                    current = self._fallback_snapshot()
+                    self._publish(current)
+                return current.camera, current.farm, current.tenant
+            
+            self._publish(snapshot)
+            self._save_snapshot_later(snapshot)
+            with self._metrics_lock:
+                self._reloads += 1
+        
+        print(f"  ✓ Mappings reloaded: {len(snapshot.tenant)} tenants, {len(snapshot.farm)} farms, "
+              f"{len(snapshot.camera)} cameras")
+        return snapshot.camera, snapshot.farm, snapshot.tenant
+    
+    def get_camera_mapping(self) -> Dict[str, Dict[str, str]]:
+        return self.snapshot().camera
     
     def get_farm_mapping(self) -> Dict[str, Dict[str, str]]:
-        if not self._loaded:
-            self.load()
-        return self._farm_mapping
+        return self.snapshot().farm
     
     def get_tenant_mapping(self) -> Dict[str, Dict[str, str]]:
-        if not self._loaded:
-            self.load()
-        return self._tenant_mapping
+        return self.snapshot().tenant
+    
+    def get_tenant_farms(self, tenant_id: str) -> Tuple[str, ...]:
+        """IDs of a tenant's farms, in farm name order."""
+        return self.snapshot().farms_by_tenant.get(tenant_id, ())
+    
+    def get_farm_cameras(self, farm_id: str) -> Tuple[str, ...]:
+        """IDs of a farm's cameras, in camera name order."""
+        return self.snapshot().cameras_by_farm.get(farm_id, ())
+    
+    def search_tenants(self, query: str, limit: Optional[int] = DEFAULT_SEARCH_LIMIT) -> List[Tuple[str, str]]:
+        """
+        Tenants whose name matches query (prefix matches first).
+        
+        Returns:
+            List of (display_name, tenant_id) tuples.
+        """
+        return self.snapshot().tenant_index.search(query, limit)
+    
+    def search_farms(
+        self,
+        query: str,
+        tenant_id: Optional[str] = None,
+        limit: Optional[int] = DEFAULT_SEARCH_LIMIT
+    ) -> List[Tuple[str, str]]:
+        """
+        Farms whose name matches query, optionally limited to a tenant.
+        
+        Returns:
+            List of (display_name, farm_id) tuples.
+        """
+        snapshot = self.snapshot()
+        ids = snapshot.farms_by_tenant.get(tenant_id, ()) if tenant_id else None
+        return snapshot.farm_index.search(query, limit, ids)
+    
+    def search_cameras(
+        self,
+        query: str,
+        farm_id: Optional[str] = None,
+        tenant_id: Optional[str] = None,
+        limit: Optional[int] = DEFAULT_SEARCH_LIMIT,
+        camera_ids: Optional[Collection[str]] = None
+    ) -> List[Tuple[str, str]]:
+        """
+        Cameras whose name matches query, optionally limited to a farm or tenant.
+        
+        Served from the in-memory indexes, without a warehouse round trip.
+        
+        Args:
+            query: Text typed by the user; case-insensitive. Empty matches every camera in scope.
+            farm_id: Optional farm to search within (takes precedence over tenant_id).
+            tenant_id: Optional tenant to search within.
+            limit: Most results to return, or None for all.
+            camera_ids: Optional cameras to restrict the results to (e.g. those with data on a date).
+            
+        Returns:
+            List of (display_name, camera_id) tuples.
+        """
+        snapshot = self.snapshot()
+        if farm_id:
+            ids = snapshot.cameras_by_farm.get(farm_id, ())
+        elif tenant_id:
+            ids = {
+                camera_id
+                for tenant_farm_id in snapshot.farms_by_tenant.get(tenant_id, ())
+                for camera_id in snapshot.cameras_by_farm.get(tenant_farm_id, ())
+            }
+        else:
+            ids = None
+        if camera_ids is not None:
+            ids = set(camera_ids) if ids is None else set(ids).intersection(camera_ids)
+        return snapshot.camera_index.search(query, limit, ids)
     
     def get_camera_display_name(self, camera_id: str) -> str:
         mapping = self.get_camera_mapping()
@@ -153,6 +629,19 @@ class DatabricksMappingService:
         if farm_id in mapping:
             return mapping[farm_id]
         return {'name': farm_id, 'tenant_id': '', 'tenant_name': 'Unknown'}
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        with self._metrics_lock:
+            return {
+                'loaded': snapshot is not None,
+                'source': snapshot.source if snapshot else None,
+                'loaded_at': snapshot.loaded_at if snapshot else None,
+                'versions': snapshot.versions if snapshot else None,
+                'reloads': self._reloads,
+                'unchanged': self._unchanged,
+                'failures': self._failures,
+            }
 
 
 databricks_mapping_service = DatabricksMappingService()
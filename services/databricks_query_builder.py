@@ -0,0 +1,721 @@
+"""SQL statements for the Databricks services, built as stable templates plus named parameters."""
+
+import hashlib
+import sys
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Ensure parent directory is in path
+_parent = Path(__file__).resolve().parent.parent
+if str(_parent) not in sys.path:
+    sys.path.insert(0, str(_parent))
+
+from config.settings import settings
+
+
+def normalize_time(time_str: str, default_seconds: str) -> str:
+    """Normalize HH:MM or HH:MM:SS to HH:MM:SS, filling in default_seconds."""
+    return time_str if time_str.count(':') == 2 else f"{time_str}:{default_seconds}"
+
+
+@dataclass(frozen=True)
+class SqlQuery:
+    """A SQL template with `:name` markers and the values bound to them."""
+    sql: str
+    parameters: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class SqlDialect:
+    """SQL fragments that differ between engines; `{0}` is the column expression."""
+    name: str
+    first_element: str  # First element of an array column
+    array_size: str
+    table_options: str = ""  # Appended to CREATE TABLE
+    table_version: str = ""  # Statement whose first column is a table's latest version; "" if the engine has none
+
+
+DATABRICKS_DIALECT = SqlDialect("databricks", first_element="{0}[0]", array_size="SIZE({0})",
+                                table_options="CLUSTER BY (stage1_timestamp)",
+                                table_version="DESCRIBE HISTORY {0} LIMIT 1")
+# Embedded engine of the "local" platform
+DUCKDB_DIALECT = SqlDialect("duckdb", first_element="{0}[1]", array_size="len({0})")
+
+# Linkage key patterns; [0-9] rather than \d, whose escaping in string literals differs between engines
+STAGE1_BLK_REGEX = "/([0-9]{3}_[0-9]{7})_"
+STAGE2_BLK_REGEX = "^([0-9]{3}_[0-9]{7})_"
+TIMESTAMP_KEY_REGEX = "_([0-9]{4}-[0-9]{2}-[0-9]{2}T[0-9]{2}:[0-9]{2}:[0-9]{2})"
+
+# Tables the tenant, farm and camera mappings are loaded from
+MAPPING_TABLES = ("tenant_map", "farm_map", "farm_camera_map")
+
+# Columns of the linked results, in order (the linkage table stores exactly these)
+LINKED_COLUMNS = [
+    "session_id", "farm_id", "camera_id", "stage1_timestamp", "stage1_category",
+    "stage1_confidence", "stage1_should_forward", "frame_count", "stage2_inference_id",
+    "stage2_timestamp", "stage2_classification", "stage2_confidence", "stage2_should_forward",
+    "video_gcs_path", "blk_file", "event_timestamp",
+]
+
+# Keyset cursor of a linked results page: the last row's
+# (stage1_timestamp, session_id, stage2_inference_id); the inference ID is None without a Stage 2 match
+PageCursor = Tuple[datetime, str, Optional[str]]
+
+
+class _Conditions:
+    """Collects WHERE clauses and the parameters they reference."""
+    
+    def __init__(self):
+        self.clauses: List[str] = []
+        self.parameters: Dict[str, Any] = {}
+    
+    def add(self, clause: str, **parameters: Any) -> None:
+        self.clauses.append(clause)
+        self.parameters.update(parameters)
+    
+    def sql(self) -> str:
+        return " AND ".join(self.clauses) if self.clauses else "1=1"
+
+
+class DatabricksQueryBuilder:
+    """
+    Builds the statements run by the Databricks query and mapping services.
+    
+    Filter values are never interpolated into the SQL text: they are passed
+    as named parameters for the connector's native parameter binding, so
+    every request with the same set of filters sends byte-identical SQL.
+    That lets the warehouse reuse plans and serve repeats from its query
+    result cache. Only trusted values (table names from settings, integer
+    limits) are inlined.
+    """
+    
+    def __init__(self, dialect: SqlDialect = DATABRICKS_DIALECT):
+        """
+        Initialize the builder.
+        
+        Args:
+            dialect: Engine the statements that use dialect hooks are written for.
+        """
+        self.dialect = dialect
+    
+    @staticmethod
+    def _time_range(
+        date_str: str,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None
+    ) -> Tuple[datetime, datetime]:
+        """
+        Half-open [start, end) timestamp range for a date and optional time bounds.
+        
+        Comparing the raw column against a range (instead of DATE(col) or
+        DATE_FORMAT(col)) lets the warehouse skip files by min/max stats.
+        The end time is inclusive to the second, as in the UI.
+        """
+        day_start = datetime.combine(date.fromisoformat(date_str), datetime.min.time())
+        
+        def offset(time_str: str) -> timedelta:
+            hours, minutes, seconds = (int(part) for part in time_str.split(":"))
+            return timedelta(hours=hours, minutes=minutes, seconds=seconds)
+        
+        start = day_start + offset(normalize_time(start_time, "00")) if start_time else day_start
+        if end_time:
+            end = day_start + offset(normalize_time(end_time, "59")) + timedelta(seconds=1)
+        else:
+            end = day_start + timedelta(days=1)
+        return start, end
+    
+    @staticmethod
+    def _stage1_conditions(
+        timestamp_column: str,
+        forward_column: str,
+        range_start: datetime,
+        range_end: datetime,
+        tenant_id: Optional[str],
+        farm_id: Optional[str],
+        camera_id: Optional[str],
+        should_forward_only: bool,
+        after: Optional[PageCursor]
+    ) -> _Conditions:
+        """
+        Stage 1 filters of a linked query, on the Stage 1 table or the linkage table.
+        
+        The keyset cursor bound keeps the cursor's own session, whose
+        remaining Stage 2 matches _after_tie_break() selects after the join.
+        """
+        s1 = _Conditions()
+        s1.add(
+            f"{timestamp_column} >= :range_start AND {timestamp_column} < :range_end",
+            range_start=range_start,
+            range_end=range_end,
+        )
+        if farm_id:
+            s1.add("farm_id = :farm_id", farm_id=farm_id)
+        elif tenant_id:
+            # Semi-join: the tenant's farms come from farm_map, not a literal list
+            s1.add(
+                f"farm_id IN (SELECT farm_id FROM {settings.catalog_name}.{settings.schema_name}.farm_map "
+                f"WHERE tenant_id = :tenant_id)",
+                tenant_id=tenant_id,
+            )
+        if camera_id:
+            s1.add("camera_id = :camera_id", camera_id=camera_id)
+        if should_forward_only:
+            s1.add(f"{forward_column} = true")
+        if after is not None:
+            cursor_timestamp, cursor_session_id, _ = after
+            # The plain upper bound prunes files by min/max stats; the OR breaks timestamp ties
+            s1.add(
+                f"{timestamp_column} <= :cursor_timestamp AND "
+                f"({timestamp_column} < :cursor_timestamp OR session_id <= :cursor_session_id)",
+                cursor_timestamp=cursor_timestamp,
+                cursor_session_id=cursor_session_id,
+            )
+        return s1
+    
+    @staticmethod
+    def _after_tie_break(
+        after: PageCursor,
+        timestamp_column: str = "stage1_timestamp",
+        session_column: str = "session_id",
+        inference_column: str = "stage2_inference_id"
+    ) -> _Conditions:
+        """
+        Rows of the cursor's session that come after it, ordered by Stage 2 inference.
+        
+        A session links to every matching Stage 2 inference, so
+        (stage1_timestamp, session_id) doesn't identify a row; the result is
+        ordered by stage2_inference_id DESC NULLS LAST within a session. A
+        cursor without an inference ID (no Stage 2 match) is the session's
+        last row. Combined with the _stage1_conditions() cursor bound.
+        """
+        cursor_timestamp, cursor_session_id, cursor_inference_id = after
+        ahead = f"{timestamp_column} < :cursor_timestamp OR {session_column} < :cursor_session_id"
+        conditions = _Conditions()
+        if cursor_inference_id is None:
+            conditions.add(f"({ahead})", cursor_timestamp=cursor_timestamp, cursor_session_id=cursor_session_id)
+        else:
+            conditions.add(
+                f"({ahead} OR {inference_column} < :cursor_inference_id OR {inference_column} IS NULL)",
+                cursor_timestamp=cursor_timestamp,
+                cursor_session_id=cursor_session_id,
+                cursor_inference_id=cursor_inference_id,
+            )
+        return conditions
+    
+    @staticmethod
+    def _stage2_slack_condition(stage1_column: str, stage2_column: str) -> str:
+        """
+        Join condition keeping a Stage 2 match within the slack of its own Stage 1 row.
+        
+        Whether a session links to an inference then depends only on the two
+        rows, not on the queried range, so the live join, the linkage table
+        and client-side linkage all produce the same links for any range.
+        """
+        slack_seconds = int(settings.stage2_window_slack_hours * 3600)
+        return (
+            f"{stage2_column} >= {stage1_column} - INTERVAL {slack_seconds} SECONDS "
+            f"AND {stage2_column} < {stage1_column} + INTERVAL {slack_seconds} SECONDS"
+        )
+    
+    def linked_time_ranges(
+        self,
+        date_str: str,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None
+    ) -> Tuple[datetime, datetime, datetime, datetime]:
+        """
+        Stage 1 range and Stage 2 window of a linked query, all half-open.
+        
+        The Stage 2 window follows the Stage 1 range, widened by
+        settings.stage2_window_slack_hours for processing delay. It only
+        prunes the Stage 2 scan: each match must also lie within the slack
+        of its own Stage 1 row (_stage2_slack_condition()).
+        
+        Returns:
+            Tuple of (range_start, range_end, stage2_start, stage2_end)
+        """
+        range_start, range_end = self._time_range(date_str, start_time, end_time)
+        slack = timedelta(hours=settings.stage2_window_slack_hours)
+        return range_start, range_end, range_start - slack, range_end + slack
+    
+    def distinct_farm_cameras(self, date_str: str) -> SqlQuery:
+        """
+        Distinct (farm_id, camera_id) pairs with Stage 1 data on a date.
+        
+        One scan that drives all three filter dropdowns.
+        
+        Args:
+            date_str: Date in YYYY-MM-DD format.
+        
+        Returns:
+            SqlQuery
+        """
+        range_start, range_end = self._time_range(date_str)
+        sql = f"""
+        SELECT DISTINCT farm_id, camera_id
+        FROM {settings.full_stage1_table}
+        WHERE processing_timestamp >= :range_start AND processing_timestamp < :range_end
+          AND (farm_id IS NOT NULL OR camera_id IS NOT NULL)
+        """
+        return SqlQuery(sql, {"range_start": range_start, "range_end": range_end})
+    
+    def linked_results(
+        self,
+        date_str: str,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        tenant_id: Optional[str] = None,
+        farm_id: Optional[str] = None,
+        camera_id: Optional[str] = None,
+        should_forward_only: bool = False,
+        limit: int = 50,
+        after: Optional[PageCursor] = None
+    ) -> SqlQuery:
+        """
+        Stage 1 results LEFT JOINed to their Stage 2 inferences.
+        
+        A slim projection for the results table: frame URI arrays and raw
+        model responses are left out and loaded per row with row_details().
+        
+        Rows are ordered by (stage1_timestamp, session_id, stage2_inference_id)
+        descending, rows without a Stage 2 match last within their session.
+        Passing the last row's key as `after` returns the next page as a range
+        seek below that key instead of an OFFSET scan.
+        
+        Args:
+            date_str: Date in YYYY-MM-DD format.
+            start_time: Optional start time filter (HH:MM or HH:MM:SS).
+            end_time: Optional end time filter (HH:MM or HH:MM:SS).
+            tenant_id: Optional tenant ID filter (farms looked up in farm_map).
+            farm_id: Optional farm ID filter; takes precedence over tenant_id.
+            camera_id: Optional camera ID filter.
+            should_forward_only: If True, only return forwarded events.
+            limit: Maximum number of results.
+            after: Optional (stage1_timestamp, session_id, stage2_inference_id) keyset
+                cursor; only rows after it in the result order are returned.
+        
+        Returns:
+            SqlQuery
+        """
+        range_start, range_end, stage2_start, stage2_end = self.linked_time_ranges(date_str, start_time, end_time)
+        
+        # Filters pushed into the stage1 CTE for early filtering
+        s1 = self._stage1_conditions(
+            "processing_timestamp", "should_forward", range_start, range_end,
+            tenant_id, farm_id, camera_id, should_forward_only, after,
+        )
+        
+        # Stage 2 window follows the Stage 1 range, widened for processing delay - push camera filter for faster joins
+        s2 = _Conditions()
+        s2.add(
+            "inference_timestamp >= :stage2_start AND inference_timestamp < :stage2_end",
+            stage2_start=stage2_start,
+            stage2_end=stage2_end,
+        )
+        if camera_id:
+            s2.add("camera_id = :camera_id", camera_id=camera_id)
+        
+        # The cursor's session is kept by the Stage 1 bound; its rows are cut after the join
+        linked = _Conditions()
+        if after is not None:
+            linked = self._after_tie_break(after, "s1.stage1_timestamp", "s1.session_id", "s2.stage2_inference_id")
+        
+        first_uri = self.dialect.first_element.format("frame_uris")
+        sql = f"""
+        WITH stage1_data AS (
+          SELECT
+            session_id,
+            farm_id,
+            camera_id,
+            processing_timestamp AS stage1_timestamp,
+            highest_probability_category AS stage1_category,
+            highest_probability_value AS stage1_confidence,
+            should_forward AS stage1_should_forward,
+            {self.dialect.array_size.format("frame_uris")} AS frame_count,
+            REGEXP_EXTRACT({first_uri}, '{STAGE1_BLK_REGEX}', 1) AS blk_file,
+            REGEXP_EXTRACT({first_uri}, '{TIMESTAMP_KEY_REGEX}', 1) AS frame_timestamp_key
+          FROM {settings.full_stage1_table}
+          WHERE {s1.sql()}
+        ),
+        
+        stage2_data AS (
+          SELECT
+            inference_id AS stage2_inference_id,
+            camera_id,
+            inference_timestamp AS stage2_timestamp,
+            classification AS stage2_classification,
+            max_probability_score AS stage2_confidence,
+            should_forward AS stage2_should_forward,
+            video_gcs_path,
+            REGEXP_EXTRACT(file_name, '{STAGE2_BLK_REGEX}', 1) AS blk_file,
+            REGEXP_EXTRACT(file_name, '{TIMESTAMP_KEY_REGEX}', 1) AS video_timestamp_key
+          FROM {settings.full_stage2_table}
+          WHERE {s2.sql()}
+        )
+        
+        SELECT
+          s1.session_id,
+          s1.farm_id,
+          s1.camera_id,
+          s1.stage1_timestamp,
+          s1.stage1_category,
+          s1.stage1_confidence,
+          s1.stage1_should_forward,
+          s1.frame_count,
+          
+          s2.stage2_inference_id,
+          s2.stage2_timestamp,
+          s2.stage2_classification,
+          s2.stage2_confidence,
+          s2.stage2_should_forward,
+          s2.video_gcs_path,
+          
+          s1.blk_file,
+          s1.frame_timestamp_key AS event_timestamp
+        
+        FROM stage1_data s1
+        LEFT JOIN stage2_data s2
+          ON s1.camera_id = s2.camera_id
+          AND s1.blk_file = s2.blk_file
+          AND s1.frame_timestamp_key = s2.video_timestamp_key
+          AND {self._stage2_slack_condition("s1.stage1_timestamp", "s2.stage2_timestamp")}
+        WHERE {linked.sql()}
+        
+        ORDER BY s1.stage1_timestamp DESC, s1.session_id DESC, s2.stage2_inference_id DESC NULLS LAST
+        LIMIT {int(limit)}
+        """
+        return SqlQuery(sql, {**s1.parameters, **s2.parameters, **linked.parameters})
+    
+    def linked_results_from_table(
+        self,
+        date_str: str,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        tenant_id: Optional[str] = None,
+        farm_id: Optional[str] = None,
+        camera_id: Optional[str] = None,
+        should_forward_only: bool = False,
+        limit: int = 50,
+        after: Optional[PageCursor] = None
+    ) -> SqlQuery:
+        """
+        The linked_results() rows, read from the materialized linkage table.
+        
+        Same arguments, columns and order as linked_results(), without the
+        key extraction and join. Only valid for ranges the table covers
+        (see LinkageTableService.covers()).
+        
+        Returns:
+            SqlQuery
+        """
+        range_start, range_end, _, _ = self.linked_time_ranges(date_str, start_time, end_time)
+        conditions = self._stage1_conditions(
+            "stage1_timestamp", "stage1_should_forward", range_start, range_end,
+            tenant_id, farm_id, camera_id, should_forward_only, after,
+        )
+        if after is not None:
+            tie_break = self._after_tie_break(after)
+            conditions.add(tie_break.sql(), **tie_break.parameters)
+        sql = f"""
+        SELECT {", ".join(LINKED_COLUMNS)}
+        FROM {settings.full_linkage_table}
+        WHERE {conditions.sql()}
+        ORDER BY stage1_timestamp DESC, session_id DESC, stage2_inference_id DESC NULLS LAST
+        LIMIT {int(limit)}
+        """
+        return SqlQuery(sql, conditions.parameters)
+    
+    def create_linkage_table(self) -> SqlQuery:
+        """Create the materialized linkage table if it doesn't exist."""
+        return SqlQuery(f"""
+        CREATE TABLE IF NOT EXISTS {settings.full_linkage_table} (
+          session_id STRING,
+          farm_id STRING,
+          camera_id STRING,
+          stage1_timestamp TIMESTAMP,
+          stage1_category STRING,
+          stage1_confidence DOUBLE,
+          stage1_should_forward BOOLEAN,
+          frame_count INT,
+          stage2_inference_id STRING,
+          stage2_timestamp TIMESTAMP,
+          stage2_classification STRING,
+          stage2_confidence DOUBLE,
+          stage2_should_forward BOOLEAN,
+          video_gcs_path STRING,
+          blk_file STRING,
+          event_timestamp STRING
+        ) {self.dialect.table_options}
+        """)
+    
+    def linkage_coverage(self) -> SqlQuery:
+        """Oldest and newest Stage 1 timestamps in the linkage table (the newest is the merge watermark)."""
+        return SqlQuery(f"""
+        SELECT MIN(stage1_timestamp) AS coverage_start, MAX(stage1_timestamp) AS watermark
+        FROM {settings.full_linkage_table}
+        """)
+    
+    def merge_linkage(self, window_start: datetime) -> SqlQuery:
+        """
+        Bring the linkage table up to date for Stage 1 rows from window_start on.
+        
+        The source is the live join of those Stage 1 rows (keys extracted
+        once here) with Stage 2 from the slack window before them onwards,
+        each match bounded by the slack around its own Stage 1 row exactly
+        as in linked_results(), so reads of the table return the same links.
+        Rows are keyed by (session_id, stage2_inference_id), whose columns
+        never change, so the merge only inserts new rows and deletes rows
+        of the window that the source no longer produces; e.g. a session
+        merged without Stage 2 whose inference has since arrived.
+        
+        Portable between Delta and the local stand-in engine (dialect hooks
+        for array access, explicit column lists).
+        
+        Args:
+            window_start: Merge Stage 1 rows processed at or after this time.
+            
+        Returns:
+            SqlQuery
+        """
+        first_uri = self.dialect.first_element.format("frame_uris")
+        columns = ", ".join(LINKED_COLUMNS)
+        source_columns = ", ".join(f"s.{column}" for column in LINKED_COLUMNS)
+        sql = f"""
+        MERGE INTO {settings.full_linkage_table} AS t
+        USING (
+          WITH stage1_data AS (
+            SELECT
+              session_id,
+              farm_id,
+              camera_id,
+              processing_timestamp AS stage1_timestamp,
+              highest_probability_category AS stage1_category,
+              highest_probability_value AS stage1_confidence,
+              should_forward AS stage1_should_forward,
+              {self.dialect.array_size.format("frame_uris")} AS frame_count,
+              REGEXP_EXTRACT({first_uri}, '{STAGE1_BLK_REGEX}', 1) AS blk_file,
+              REGEXP_EXTRACT({first_uri}, '{TIMESTAMP_KEY_REGEX}', 1) AS frame_timestamp_key
+            FROM {settings.full_stage1_table}
+            WHERE processing_timestamp >= :window_start
+          ),
+          
+          stage2_data AS (
+            SELECT
+              inference_id AS stage2_inference_id,
+              camera_id,
+              inference_timestamp AS stage2_timestamp,
+              classification AS stage2_classification,
+              max_probability_score AS stage2_confidence,
+              should_forward AS stage2_should_forward,
+              video_gcs_path,
+              REGEXP_EXTRACT(file_name, '{STAGE2_BLK_REGEX}', 1) AS blk_file,
+              REGEXP_EXTRACT(file_name, '{TIMESTAMP_KEY_REGEX}', 1) AS video_timestamp_key
+            FROM {settings.full_stage2_table}
+            WHERE inference_timestamp >= :stage2_start
+          )
+          
+          SELECT
+            s1.session_id,
+            s1.farm_id,
+            s1.camera_id,
+            s1.stage1_timestamp,
+            s1.stage1_category,
+            s1.stage1_confidence,
+            s1.stage1_should_forward,
+            s1.frame_count,
+            s2.stage2_inference_id,
+            s2.stage2_timestamp,
+            s2.stage2_classification,
+            s2.stage2_confidence,
+            s2.stage2_should_forward,
+            s2.video_gcs_path,
+            s1.blk_file,
+            s1.frame_timestamp_key AS event_timestamp
+          FROM stage1_data s1
+          LEFT JOIN stage2_data s2
+            ON s1.camera_id = s2.camera_id
+            AND s1.blk_file = s2.blk_file
+            AND s1.frame_timestamp_key = s2.video_timestamp_key
+            AND {self._stage2_slack_condition("s1.stage1_timestamp", "s2.stage2_timestamp")}
+        ) AS s
+        ON t.session_id = s.session_id
+          AND t.stage2_inference_id IS NOT DISTINCT FROM s.stage2_inference_id
+        WHEN NOT MATCHED THEN INSERT ({columns}) VALUES ({source_columns})
+        WHEN NOT MATCHED BY SOURCE AND t.stage1_timestamp >= :window_start THEN DELETE
+        """
+        slack = timedelta(hours=settings.stage2_window_slack_hours)
+        return SqlQuery(sql, {"window_start": window_start, "stage2_start": window_start - slack})
+    
+    def stage1_day(self, date_str: str) -> SqlQuery:
+        """
+        One day of Stage 1 rows for in-memory linkage (client-side linkage mode).
+        
+        Unfiltered, so the slice serves every filter combination on that day.
+        The raw first frame URI is returned; the linkage keys are extracted
+        client-side (see services.client_linkage).
+        
+        Args:
+            date_str: Date in YYYY-MM-DD format.
+            
+        Returns:
+            SqlQuery
+        """
+        range_start, range_end = self._time_range(date_str)
+        sql = f"""
+        SELECT
+          session_id,
+          farm_id,
+          camera_id,
+          processing_timestamp AS stage1_timestamp,
+          highest_probability_category AS stage1_category,
+          highest_probability_value AS stage1_confidence,
+          should_forward AS stage1_should_forward,
+          {self.dialect.array_size.format("frame_uris")} AS frame_count,
+          {self.dialect.first_element.format("frame_uris")} AS first_frame_uri
+        FROM {settings.full_stage1_table}
+        WHERE processing_timestamp >= :range_start AND processing_timestamp < :range_end
+        """
+        return SqlQuery(sql, {"range_start": range_start, "range_end": range_end})
+    
+    def stage2_day(self, date_str: str) -> SqlQuery:
+        """
+        One day of Stage 2 inferences for in-memory linkage (client-side linkage mode).
+        
+        Args:
+            date_str: Date in YYYY-MM-DD format.
+            
+        Returns:
+            SqlQuery
+        """
+        range_start, range_end = self._time_range(date_str)
+        sql = f"""
+        SELECT
+          inference_id AS stage2_inference_id,
+          camera_id,
+          inference_timestamp AS stage2_timestamp,
+          classification AS stage2_classification,
+          max_probability_score AS stage2_confidence,
+          should_forward AS stage2_should_forward,
+          video_gcs_path,
+          file_name
+        FROM {settings.full_stage2_table}
+        WHERE inference_timestamp >= :range_start AND inference_timestamp < :range_end
+        """
+        return SqlQuery(sql, {"range_start": range_start, "range_end": range_end})
+    
+    def row_details(
+        self,
+        session_id: str,
+        stage2_inference_id: Optional[str],
+        stage1_timestamp: datetime
+    ) -> SqlQuery:
+        """
+        Heavy columns (frame URIs, raw responses) for one result row.
+        
+        Args:
+            session_id: Stage 1 session ID of the row.
+            stage2_inference_id: Linked Stage 2 inference ID, if any.
+            stage1_timestamp: Stage 1 timestamp of the row, used to prune both tables.
+            
+        Returns:
+            SqlQuery
+        """
+        if stage1_timestamp.tzinfo is not None:
+            stage1_timestamp = stage1_timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+        # A day either side absorbs any session time zone offset
+        range_start = stage1_timestamp - timedelta(days=1)
+        range_end = stage1_timestamp + timedelta(days=1)
+        slack = timedelta(hours=settings.stage2_window_slack_hours)
+        
+        sql = f"""
+        SELECT
+          frame_uris,
+          gemini_raw_response AS stage1_raw_response,
+          (
+            SELECT model_votes
+            FROM {settings.full_stage2_table}
+            WHERE inference_id = :stage2_inference_id
+              AND inference_timestamp >= :stage2_start AND inference_timestamp < :stage2_end
+            LIMIT 1
+          ) AS stage2_raw_response
+        FROM {settings.full_stage1_table}
+        WHERE session_id = :session_id
+          AND processing_timestamp >= :range_start AND processing_timestamp < :range_end
+        LIMIT 1
+        """
+        return SqlQuery(sql, {
+            "session_id": session_id,
+            # No Stage 2 row matches an empty ID, so one template serves both cases
+            "stage2_inference_id": stage2_inference_id or "",
+            "range_start": range_start,
+            "range_end": range_end,
+            "stage2_start": range_start - slack,
+            "stage2_end": range_end + slack,
+        })
+    
+    def template_fingerprint(self) -> str:
+        """
+        Hash of the SQL templates (with every optional filter enabled).
+        
+        Changes whenever a statement, its columns or the configured tables
+        change, so persisted results can be versioned against it.
+        """
+        templates = [
+            self.distinct_farm_cameras("2000-01-01").sql,
+            self.linked_results("2000-01-01", "00:00", "00:00", farm_id="f", camera_id="c",
+                                should_forward_only=True, limit=1).sql,
+            self.linked_results("2000-01-01", tenant_id="t", limit=1, after=(datetime(2000, 1, 1), "s", "i")).sql,
+            self.row_details("s", "i", datetime(2000, 1, 1)).sql,
+            self.stage1_day("2000-01-01").sql,
+            self.stage2_day("2000-01-01").sql,
+            self.linked_results_from_table("2000-01-01", "00:00", "00:00", farm_id="f", camera_id="c",
+                                           should_forward_only=True, limit=1, after=(datetime(2000, 1, 1), "s", "i")).sql,
+        ]
+        return hashlib.sha256("\n".join(templates).encode()).hexdigest()[:16]
+    
+    def mappings(self) -> SqlQuery:
+        """
+        All three mapping tables in one statement, so loading them costs a single round trip.
+        
+        Rows are (kind, id, name, parent_id, ui_url, slug) with kind "tenant",
+        "farm" or "camera"; parent_id is a farm's tenant_id or a camera's
+        farm_id, and columns a table doesn't have are NULL.
+        """
+        prefix = f"{settings.catalog_name}.{settings.schema_name}"
+        return SqlQuery(f"""
+        SELECT 'tenant' AS kind, tenant_id AS id, tenant_name AS name,
+               CAST(NULL AS STRING) AS parent_id, tenant_ui_url AS ui_url, tenant_slug AS slug
+        FROM {prefix}.tenant_map
+        WHERE tenant_id IS NOT NULL
+          AND tenant_id != 'tenant_id'
+        UNION ALL
+        SELECT 'farm', farm_id, farm_name, tenant_id, NULL, NULL
+        FROM {prefix}.farm_map
+        WHERE farm_id IS NOT NULL
+          AND farm_id != 'farm_id'
+        UNION ALL
+        SELECT 'camera', camera_id, camera_name, farm_id, NULL, NULL
+        FROM {prefix}.farm_camera_map
+        WHERE camera_id IS NOT NULL
+          AND camera_id != 'camera_id'
+        """)
+    
+    def mapping_table_versions(self) -> Optional[List[SqlQuery]]:
+        """
+        One statement per mapping table returning its latest Delta version in the first column.
+        
+        Returns:
+            Statements in MAPPING_TABLES order, or None if the dialect has no table versions
+        """
+        if not self.dialect.table_version:
+            return None
+        return [
+            SqlQuery(self.dialect.table_version.format(f"{settings.catalog_name}.{settings.schema_name}.{table}"))
+            for table in MAPPING_TABLES
+        ]
+
+
+# Global instance, in the SQL dialect of the configured platform
+databricks_query_builder = DatabricksQueryBuilder(DUCKDB_DIALECT if settings.platform == "local" else DATABRICKS_DIALECT)
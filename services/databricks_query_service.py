@@ -1,11 +1,16 @@
 """Databricks SQL query service for Stage 1 and Stage 2 data."""
 
+import base64
+import json
 import sys
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
 from pathlib import Path
-from typing import List, Optional, Tuple
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
 
 import pandas as pd
-from databricks import sql
 
 # Ensure parent directory is in path
 _parent = Path(__file__).resolve().parent.parent
@@ -13,407 +18,586 @@ if str(_parent) not in sys.path:
     sys.path.insert(0, str(_parent))
 
 from config.settings import settings
-from infrastructure.databricks_client import get_databricks_connection
+from infrastructure.databricks_client import DatabricksConnectionPool, databricks_connection_pool
+from infrastructure.query_cancellation import CancellationToken, QueryCancelledError
+from infrastructure.single_flight import SingleFlight, single_flight
+from infrastructure.warehouse_retry import WarehouseRetrier, warehouse_retrier
+from services.client_linkage import link_stage1_stage2, prepare_stage1_day, prepare_stage2_day
 from services.databricks_mapping_service import databricks_mapping_service
+from services.databricks_query_builder import DatabricksQueryBuilder, PageCursor, SqlQuery, databricks_query_builder
+from services.linkage_table_service import LinkageTableService, linkage_table_service
+from services.parquet_result_cache import ParquetResultCache, parquet_result_cache
+from services.query_result_cache import QueryResultCache, is_date_final, query_result_cache
+
+
+def fetch_dataframe(cursor, size: Optional[int] = None) -> pd.DataFrame:
+    """
+    Fetch rows of an executed cursor as a DataFrame.
+    
+    Uses the connector's Arrow fetch so results go straight from the wire
+    format into Arrow-backed pandas columns without building per-row Python
+    objects. Falls back to fetchall()/fetchmany() when Arrow fetching is
+    disabled or unavailable (e.g. connector installed without pyarrow).
+    
+    Args:
+        cursor: Executed Databricks SQL cursor
+        size: Fetch at most this many rows (fetchmany); None fetches all remaining rows
+        
+    Returns:
+        DataFrame of the fetched rows (empty once the result set is exhausted)
+    """
+    arrow_fetch = "fetchall_arrow" if size is None else "fetchmany_arrow"
+    if settings.arrow_fetch_enabled and hasattr(cursor, arrow_fetch):
+        try:
+            table = cursor.fetchall_arrow() if size is None else cursor.fetchmany_arrow(size)
+        except (ImportError, NotImplementedError) as e:
+            print(f"  (Arrow fetch unavailable, falling back to row fetch: {e})")
+        else:
+            return table.to_pandas(types_mapper=pd.ArrowDtype)
+    
+    columns = [desc[0] for desc in cursor.description]
+    rows = cursor.fetchall() if size is None else cursor.fetchmany(size)
+    return pd.DataFrame(rows, columns=columns)
+
+
+def days_in_range(date_str: str, end_date: Optional[str] = None) -> List[str]:
+    """
+    Dates from date_str through end_date (inclusive), newest first.
+    
+    Args:
+        date_str: First date in YYYY-MM-DD format.
+        end_date: Optional last date in YYYY-MM-DD format; None for date_str only.
+    
+    Returns:
+        List of YYYY-MM-DD strings.
+    
+    Raises:
+        ValueError: If a date is malformed, end_date is before date_str, or the
+            range spans more than settings.max_date_range_days days.
+    """
+    start = date.fromisoformat(date_str)
+    end = date.fromisoformat(end_date) if end_date else start
+    if end < start:
+        raise ValueError(f"End date {end_date} is before start date {date_str}")
+    n_days = (end - start).days + 1
+    if n_days > settings.max_date_range_days:
+        raise ValueError(f"Date range spans {n_days} days; the maximum is {settings.max_date_range_days}")
+    return [(end - timedelta(days=i)).isoformat() for i in range(n_days)]
+
+
+def encode_page_token(stage1_timestamp: datetime, session_id: str, stage2_inference_id: Optional[str] = None) -> str:
+    """
+    Opaque page token for the keyset cursor (stage1_timestamp, session_id, stage2_inference_id).
+    
+    Args:
+        stage1_timestamp: Stage 1 timestamp of the last row on the current page.
+        session_id: Session ID of that row.
+        stage2_inference_id: Stage 2 inference ID of that row; None (or NA) if it has no Stage 2 match.
+        
+    Returns:
+        URL-safe token string.
+    """
+    if isinstance(stage1_timestamp, pd.Timestamp):
+        stage1_timestamp = stage1_timestamp.to_pydatetime()
+    if stage1_timestamp.tzinfo is not None:
+        stage1_timestamp = stage1_timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    inference_id = None if pd.isna(stage2_inference_id) else str(stage2_inference_id)
+    payload = json.dumps([stage1_timestamp.isoformat(), str(session_id), inference_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_page_token(page_token: str) -> PageCursor:
+    """
+    Keyset cursor (stage1_timestamp, session_id, stage2_inference_id) from a page token.
+    
+    Raises:
+        ValueError: If the token was not produced by encode_page_token.
+    """
+    try:
+        payload = base64.urlsafe_b64decode(page_token + "=" * (-len(page_token) % 4))
+        timestamp, session_id, inference_id = json.loads(payload)
+        return (
+            datetime.fromisoformat(timestamp),
+            str(session_id),
+            None if inference_id is None else str(inference_id),
+        )
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid page token") from e
 
 
 class DatabricksQueryService:
     """Service for querying Stage 1 and Stage 2 inference data from Databricks."""
     
-    def __init__(self, connection=None):
+    def __init__(
+        self,
+        pool: Optional[DatabricksConnectionPool] = None,
+        retrier: Optional[WarehouseRetrier] = None,
+        result_cache: Optional[QueryResultCache] = None,
+        disk_cache: Optional[ParquetResultCache] = None,
+        flights: Optional[SingleFlight] = None,
+        linkage_tables: Optional[LinkageTableService] = None,
+        builder: Optional[DatabricksQueryBuilder] = None,
+    ):
         """
         Initialize the query service.
         
         Args:
-            connection: Optional Databricks SQL connection. If not provided, creates one.
+            pool: Optional connection pool. Defaults to the shared global pool.
+            retrier: Optional retry/circuit-breaker runner. Defaults to the shared global one.
+            result_cache: Optional linked-results cache. Defaults to the shared global one.
+            disk_cache: Optional on-disk cache for final dates. Defaults to the shared global one.
+            flights: Optional coalescer of identical in-flight queries. Defaults to the shared global one.
+            linkage_tables: Optional linkage table maintainer, telling which ranges can be read from
+                the materialized table. Defaults to one on the given pool, or the shared global one.
+            builder: Optional statement builder (sets the SQL dialect). Defaults to the shared global one.
         """
-        self._connection = connection
+        self._pool = pool
+        self.retrier = retrier or warehouse_retrier
+        self.result_cache = result_cache or query_result_cache
+        self.disk_cache = disk_cache or parquet_result_cache
+        self.flights = flights or single_flight
+        self.builder = builder or databricks_query_builder
+        self._disk_cache_version: Optional[str] = None
+        self.linkage_tables = linkage_tables or (
+            LinkageTableService(pool=pool, retrier=retrier, builder=builder) if pool is not None else linkage_table_service
+        )
+        # Per-day queries of a date range; bounded so one range can't take the whole connection pool
+        self._day_executor = ThreadPoolExecutor(
+            max_workers=settings.date_range_workers,
+            thread_name_prefix="warehouse-day",
+        )
+        # Background fetches of the next results page
+        self._prefetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="warehouse-prefetch")
+        # Linkage slices ((kind, date)) too large for the result cache; days needing them are joined on the warehouse
+        self._oversized_slices: Set[Tuple[str, str]] = set()
     
     @property
-    def connection(self):
-        """Lazy-load the Databricks SQL connection."""
-        if self._connection is None:
-            self._connection = get_databricks_connection()
-        return self._connection
-    
-    def _reconnect(self):
-        """Force reconnection by closing old connection and creating new one."""
-        print("🔄 Reconnecting to Databricks...")
+    def pool(self) -> DatabricksConnectionPool:
+        """Connection pool used for all queries."""
+        if self._pool is None:
+            self._pool = databricks_connection_pool
+        return self._pool
+    
+    @property
+    def disk_cache_version(self) -> str:
+        """Version of this service's results in the disk cache: the fingerprint of its builder's SQL templates."""
+        if self._disk_cache_version is None:
+            self._disk_cache_version = self.builder.template_fingerprint()
+        return self._disk_cache_version
+    
+    @contextmanager
+    def _cursor(self, conn, cancel_token: Optional[CancellationToken] = None):
+        """Open a cursor and register it with the cancellation token, if any."""
+        with conn.cursor() as cursor:
+            if cancel_token is None:
+                yield cursor
+                return
+            cancel_token.attach(cursor)
+            try:
+                yield cursor
+            finally:
+                cancel_token.detach(cursor)
+    
+    @contextmanager
+    def _cancellation_scope(self, cancel_token: Optional[CancellationToken]):
+        """Report errors raised by a statement interrupted through cancel_token as QueryCancelledError."""
         try:
-            if self._connection is not None:
-                self._connection.close()
+            yield
+        except QueryCancelledError:
+            raise
         except Exception as e:
-            print(f"  (Error closing old connection: {e})")
-        
-        self._connection = None
-        self._connection = get_databricks_connection()
-        print("  ✓ Reconnected successfully")
+            if cancel_token is not None and cancel_token.cancelled:
+                raise QueryCancelledError("Query cancelled") from e
+            raise
     
-    def _execute_with_retry(self, query_func, max_retries=2):
+    def _execute_with_retry(self, query_func, fallback=None, cancel_token: Optional[CancellationToken] = None):
         """
-        Execute a query function with automatic reconnect on connection errors.
+        Execute a query function on a pooled connection under the shared retry policy.
+        
+        Transient errors (classified by exception type) are retried with
+        exponential backoff and jitter on a fresh pooled connection; the
+        connection that failed is discarded by the pool. Repeated failures
+        open the shared circuit breaker, after which calls fail fast.
         
         Args:
             query_func: Function that takes a connection and executes a query
-            max_retries: Maximum number of retry attempts (default 2)
+            fallback: Optional callable returning cached data to serve when the
+                warehouse is unavailable instead of raising
+            cancel_token: Optional token; once cancelled, the error raised by the
+                interrupted statement is reported as QueryCancelledError and not retried
+                
+        Returns:
+            Query result from query_func (or fallback)
+        """
+        def attempt():
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            with self.pool.connection() as conn, self._cancellation_scope(cancel_token):
+                return query_func(conn)
+        
+        return self.retrier.call(attempt, fallback=fallback)
+    
+    def _persistable(self, kind: str, cache_key: Tuple, date_str: str) -> bool:
+        """Whether a result can be kept on disk: its date is final and it doesn't depend on the mappings."""
+        # A tenant filter selects farms through farm_map, which can change after the date is final
+        if kind == "linked" and self.result_cache.has_tenant_filter(cache_key):
+            return False
+        return is_date_final(date_str)
+    
+    def _cached_result(self, kind: str, cache_key: Tuple, date_str: str) -> Optional[pd.DataFrame]:
+        """Fresh result from the memory cache, else from the disk cache for final dates."""
+        cached = self.result_cache.get(cache_key)
+        if cached is None and self._persistable(kind, cache_key, date_str):
+            cached = self.disk_cache.get(kind, cache_key, self.disk_cache_version)
+            if cached is not None:
+                self.result_cache.put(cache_key, cached, date_str)
+        return cached
+    
+    def _store_result(self, kind: str, cache_key: Tuple, df: pd.DataFrame, date_str: str) -> None:
+        """Cache a complete result in memory, and on disk once its date is final (except tenant-filtered results)."""
+        self.result_cache.put(cache_key, df, date_str)
+        if self._persistable(kind, cache_key, date_str):
+            self.disk_cache.put(kind, cache_key, df, self.disk_cache_version)
+    
+    def _iter_days(
+        self,
+        days: List[str],
+        fetch_day: Callable[[str], pd.DataFrame],
+        cached_day: Callable[[str], Optional[pd.DataFrame]]
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Per-day results in the order of days, fetching uncached days concurrently.
+        
+        Days that cached_day answers are never submitted. The rest run on the
+        bounded day pool; a single day runs on the calling thread. If the
+        caller stops iterating early, days that haven't started are dropped
+        (days already running finish and populate the cache).
+        
+        Args:
+            days: Dates in YYYY-MM-DD format, in the order results are yielded.
+            fetch_day: Queries the warehouse for one day (and caches the result).
+            cached_day: Returns a day's cached result, or None.
+        """
+        if len(days) == 1:
+            cached = cached_day(days[0])
+            yield cached if cached is not None else fetch_day(days[0])
+            return
+        
+        results = []
+        for day in days:
+            cached = cached_day(day)
+            results.append(cached if cached is not None else self._day_executor.submit(fetch_day, day))
+        submitted = [r for r in results if isinstance(r, Future)]
+        print(f"  Date range: {len(days)} days, {len(days) - len(submitted)} cached, {len(submitted)} to query")
+        
+        try:
+            for result in results:
+                yield result.result() if isinstance(result, Future) else result
+        finally:
+            for future in submitted:
+                future.cancel()
+    
+    def get_farm_camera_pairs(
+        self,
+        date_str: str,
+        cancel_token: Optional[CancellationToken] = None,
+        end_date: Optional[str] = None
+    ) -> List[Tuple[Optional[str], Optional[str]]]:
+        """
+        Get the distinct (farm_id, camera_id) pairs that have data on the given date(s).
+        
+        Fetched with a single query per date and cached per date, so the
+        tenant, farm and camera dropdowns are all derived from it in memory.
+        A date range is the union of its days.
+        
+        Args:
+            date_str: Date (or first date of the range) in YYYY-MM-DD format.
+            cancel_token: Optional token used to cancel the in-flight statements.
+            end_date: Optional last date of the range (inclusive).
             
         Returns:
-            Query result from query_func
+            List of (farm_id, camera_id) tuples; either may be None.
         """
-        last_error = None
+        def cached_day(day: str) -> Optional[pd.DataFrame]:
+            return self._cached_result("distinct_keys", ("farm_camera_pairs", day), day)
         
-        for attempt in range(max_retries):
-            try:
-                return query_func(self.connection)
-            except Exception as e:
-                last_error = e
-                error_msg = str(e).lower()
-                exception_type = type(e).__name__
-                
-                # Check if it's a connection-related error
-                # Include RequestError as it typically indicates network/connection issues
-                is_connection_error = (
-                    exception_type == 'RequestError' or
-                    any(keyword in error_msg for keyword in [
-                        'connection', 'closed', 'timeout', 'broken pipe', 
-                        'session', 'expired', 'invalid session',
-                        'error during request', 'request to server'
-                    ])
-                )
-                
-                if is_connection_error and attempt < max_retries - 1:
-                    print(f"  ⚠️  Connection error detected (attempt {attempt + 1}/{max_retries})")
-                    print(f"  Error type: {exception_type}")
-                    print(f"  Error: {e}")
-                    self._reconnect()
-                    # Retry after reconnect
-                else:
-                    # Not a connection error, or max retries reached
-                    raise
+        def fetch_day(day: str) -> pd.DataFrame:
+            query = self.builder.distinct_farm_cameras(day)
+            
+            def execute_query(conn):
+                with self._cursor(conn, cancel_token) as cursor:
+                    cursor.execute(query.sql, query.parameters)
+                    return fetch_dataframe(cursor)
+            
+            def fetch():
+                print(f"  Fetching farm/camera pairs for {day}...")
+                df = self._execute_with_retry(execute_query, cancel_token=cancel_token)
+                self._store_result("distinct_keys", ("farm_camera_pairs", day), df, day)
+                print(f"  ✓ Found {len(df)} farm/camera pairs for {day}")
+                return df
+            
+            # The tenant, farm and camera dropdowns load together; they share one query per day
+            return self.flights.do(("farm_camera_pairs", day), fetch, cancel_token)
         
-        # Should not reach here, but just in case
-        raise last_error
+        pairs = set()
+        for df in self._iter_days(days_in_range(date_str, end_date), fetch_day, cached_day):
+            pairs.update(
+                (farm_id if pd.notna(farm_id) else None, camera_id if pd.notna(camera_id) else None)
+                for farm_id, camera_id in zip(df['farm_id'], df['camera_id'])
+            )
+        return list(pairs)
     
-    def get_available_tenants(self, date_str: str) -> List[Tuple[str, str]]:
-        """Get list of tenants that have data on the given date."""
+    def _tenant_choices(self, pairs: List[Tuple[Optional[str], Optional[str]]]) -> List[Tuple[str, str]]:
+        """Tenant dropdown choices for the farms present in pairs."""
         farm_mapping = databricks_mapping_service.get_farm_mapping()
         
-        query = f"""
-        SELECT DISTINCT farm_id
-        FROM {settings.full_stage1_table}
-        WHERE DATE(processing_timestamp) = '{date_str}'
-          AND farm_id IS NOT NULL
-        ORDER BY farm_id
-        """
+        tenant_set = set()
+        for farm_id in {farm_id for farm_id, _ in pairs if farm_id}:
+            farm_info = farm_mapping.get(farm_id, {})
+            tenant_id = farm_info.get('tenant_id')
+            tenant_name = farm_info.get('tenant_name', 'Unknown')
+            if tenant_id:
+                tenant_set.add((tenant_name, tenant_id))
         
-        def execute_query(conn):
-            with conn.cursor() as cursor:
-                cursor.execute(query)
-                results = cursor.fetchall()
-                
-                tenant_set = set()
-                for row in results:
-                    farm_id = row[0]
-                    farm_info = farm_mapping.get(farm_id, {})
-                    tenant_id = farm_info.get('tenant_id')
-                    tenant_name = farm_info.get('tenant_name', 'Unknown')
-                    if tenant_id:
-                        tenant_set.add((tenant_name, tenant_id))
-                
-                tenants = sorted(list(tenant_set), key=lambda x: x[0])
-                print(f"  ✓ Found {len(tenants)} tenants")
-                return [("All", "All")] + tenants
+        tenants = sorted(list(tenant_set), key=lambda x: x[0])
+        return [("All", "All")] + tenants
+    
+    def _farm_choices(
+        self,
+        pairs: List[Tuple[Optional[str], Optional[str]]],
+        tenant_id: Optional[str] = None
+    ) -> List[Tuple[str, str]]:
+        """Farm dropdown choices for the farms present in pairs, optionally limited to a tenant."""
+        farm_mapping = databricks_mapping_service.get_farm_mapping()
+        
+        farm_ids = {farm_id for farm_id, _ in pairs if farm_id}
+        if tenant_id and tenant_id != "All":
+            farm_ids &= set(databricks_mapping_service.get_tenant_farms(tenant_id))
+        
+        farms = []
+        for farm_id in farm_ids:
+            farm_info = farm_mapping.get(farm_id, {})
+            farms.append((farm_info.get('name', farm_id), farm_id))
+        
+        farms.sort(key=lambda x: x[0])
+        return [("All", "All")] + farms
+    
+    def _camera_choices(
+        self,
+        pairs: List[Tuple[Optional[str], Optional[str]]],
+        farm_id: Optional[str] = None
+    ) -> List[Tuple[str, str]]:
+        """Camera dropdown choices for the cameras present in pairs, optionally limited to a farm."""
+        camera_mapping = databricks_mapping_service.get_camera_mapping()
+        
+        if farm_id and farm_id != "All":
+            camera_ids = {camera_id for pair_farm_id, camera_id in pairs if camera_id and pair_farm_id == farm_id}
+        else:
+            camera_ids = {camera_id for _, camera_id in pairs if camera_id}
+        
+        cameras = []
+        for camera_id in camera_ids:
+            camera_info = camera_mapping.get(camera_id, {})
+            camera_name = camera_info.get('name', camera_id)
+            cameras.append((camera_name, camera_id))
         
+        cameras.sort(key=lambda x: x[0])
+        return [("All", "All")] + cameras
+    
+    def get_filter_options(
+        self,
+        date_str: str,
+        cancel_token: Optional[CancellationToken] = None,
+        end_date: Optional[str] = None
+    ) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]], List[Tuple[str, str]]]:
+        """
+        Get tenant, farm and camera dropdown choices for the given date(s).
+        
+        Args:
+            date_str: Date (or first date of the range) in YYYY-MM-DD format.
+            cancel_token: Optional token used to cancel the in-flight statement.
+            end_date: Optional last date of the range (inclusive).
+            
+        Returns:
+            Tuple of (tenants, farms, cameras), each a list of (display_name, id) tuples.
+        """
+        try:
+            pairs = self.get_farm_camera_pairs(date_str, cancel_token=cancel_token, end_date=end_date)
+            tenants = self._tenant_choices(pairs)
+            print(f"  ✓ Found {len(tenants) - 1} tenants")
+            return tenants, self._farm_choices(pairs), self._camera_choices(pairs)
+        except QueryCancelledError:
+            print(f"  ✗ Query cancelled")
+        except Exception as e:
+            print(f"  ✗ ERROR fetching filter options: {e}")
+            import traceback
+            traceback.print_exc()
+        return [("All", "All")], [("All", "All")], [("All", "All")]
+    
+    def get_available_tenants(
+        self,
+        date_str: str,
+        cancel_token: Optional[CancellationToken] = None,
+        end_date: Optional[str] = None
+    ) -> List[Tuple[str, str]]:
+        """Get list of tenants that have data on the given date (or date range)."""
         try:
-            return self._execute_with_retry(execute_query)
+            pairs = self.get_farm_camera_pairs(date_str, cancel_token=cancel_token, end_date=end_date)
+            tenants = self._tenant_choices(pairs)
+            print(f"  ✓ Found {len(tenants) - 1} tenants")
+            return tenants
+        except QueryCancelledError:
+            print(f"  ✗ Query cancelled")
+            return [("All", "All")]
         except Exception as e:
             print(f"  ✗ ERROR fetching tenants: {e}")
             import traceback
             traceback.print_exc()
             return [("All", "All")]
     
-    def get_available_farms(self, date_str: str, tenant_id: Optional[str] = None) -> List[Tuple[str, str]]:
+    def get_available_farms(
+        self,
+        date_str: str,
+        tenant_id: Optional[str] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        end_date: Optional[str] = None
+    ) -> List[Tuple[str, str]]:
         """
-        Get list of farm IDs that have data on the given date, optionally filtered by tenant.
+        Get list of farm IDs that have data on the given date(s), optionally filtered by tenant.
         
         Args:
-            date_str: Date in YYYY-MM-DD format.
+            date_str: Date (or first date of the range) in YYYY-MM-DD format.
             tenant_id: Optional tenant ID to filter by.
+            cancel_token: Optional token used to cancel the in-flight statement.
+            end_date: Optional last date of the range (inclusive).
             
         Returns:
             List of tuples (display_name, farm_id) for dropdown choices.
         """
-        farm_mapping = databricks_mapping_service.get_farm_mapping()
         actual_tenant_id = tenant_id[1] if isinstance(tenant_id, tuple) else tenant_id
         
-        query = f"""
-        SELECT DISTINCT farm_id
-        FROM {settings.full_stage1_table}
-        WHERE DATE(processing_timestamp) = '{date_str}'
-          AND farm_id IS NOT NULL
-        ORDER BY farm_id
-        LIMIT 100
-        """
-        
-        print(f"")
-        print(f"=" * 50)
-        print(f"QUERY: get_available_farms")
-        print(f"=" * 50)
-        print(f"  Date: {date_str}")
-        print(f"  Table: {settings.full_stage1_table}")
-        
-        def execute_query(conn):
-            print(f"  Executing query...")
-            with conn.cursor() as cursor:
-                cursor.execute(query)
-                results = cursor.fetchall()
-                print(f"  ✓ SUCCESS: Fetched {len(results)} farms")
-                
-                farms = []
-                for row in results:
-                    farm_id = row[0]
-                    farm_info = farm_mapping.get(farm_id, {})
-                    farm_name = farm_info.get('name', farm_id)
-                    
-                    if actual_tenant_id and actual_tenant_id != "All":
-                        if farm_info.get('tenant_id') != actual_tenant_id:
-                            continue
-                    
-                    farms.append((farm_name, farm_id))
-                
-                farms.sort(key=lambda x: x[0])
-                return [("All", "All")] + farms
-        
         try:
-            return self._execute_with_retry(execute_query)
+            pairs = self.get_farm_camera_pairs(date_str, cancel_token=cancel_token, end_date=end_date)
+            return self._farm_choices(pairs, actual_tenant_id)
+        except QueryCancelledError:
+            print(f"  ✗ Query cancelled")
+            return [("All", "All")]
         except Exception as e:
             print(f"  ✗ ERROR fetching farms!")
             print(f"  Error type: {type(e).__name__}")
             print(f"  Error message: {str(e)}")
             import traceback
             traceback.print_exc()
-            print(f"=" * 50)
             return [("All", "All")]
     
     def get_available_cameras(
         self, 
         date_str: str, 
-        farm_id: Optional[str] = None
+        farm_id: Optional[str] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        end_date: Optional[str] = None
     ) -> List[Tuple[str, str]]:
         """
-        Get list of camera IDs that have data on the given date, optionally filtered by farm.
+        Get list of camera IDs that have data on the given date(s), optionally filtered by farm.
         
         Args:
-            date_str: Date in YYYY-MM-DD format.
+            date_str: Date (or first date of the range) in YYYY-MM-DD format.
             farm_id: Optional farm ID to filter by.
+            cancel_token: Optional token used to cancel the in-flight statement.
+            end_date: Optional last date of the range (inclusive).
             
         Returns:
             List of tuples (display_name, camera_id) for dropdown choices.
         """
-        camera_mapping = databricks_mapping_service.get_camera_mapping()
-        
         # Extract actual farm_id from tuple if needed
         actual_farm_id = farm_id[1] if isinstance(farm_id, tuple) else farm_id
         
-        farm_filter = f"AND farm_id = '{actual_farm_id}'" if actual_farm_id and actual_farm_id != "All" else ""
-        
-        query = f"""
-        SELECT DISTINCT camera_id
-        FROM {settings.full_stage1_table}
-        WHERE DATE(processing_timestamp) = '{date_str}'
-          AND camera_id IS NOT NULL
-          {farm_filter}
-        ORDER BY camera_id
-        LIMIT 100
-        """
-        
-        def execute_query(conn):
-            with conn.cursor() as cursor:
-                cursor.execute(query)
-                results = cursor.fetchall()
-                
-                cameras = []
-                for row in results:
-                    camera_id = row[0]
-                    camera_info = camera_mapping.get(camera_id, {})
-                    camera_name = camera_info.get('name', camera_id)
-                    cameras.append((camera_name, camera_id))
-                
-                cameras.sort(key=lambda x: x[0])
-                return [("All", "All")] + cameras
-        
         try:
-            return self._execute_with_retry(execute_query)
+            pairs = self.get_farm_camera_pairs(date_str, cancel_token=cancel_token, end_date=end_date)
+            return self._camera_choices(pairs, actual_farm_id)
+        except QueryCancelledError:
+            print(f"  ✗ Query cancelled")
+            return [("All", "All")]
         except Exception as e:
             print(f"Error fetching cameras: {e}")
             import traceback
             traceback.print_exc()
             return [("All", "All")]
     
-    def query_stage1_stage2_linked(
+    def search_available_cameras(
         self,
         date_str: str,
-        start_time: Optional[str] = None,
-        end_time: Optional[str] = None,
+        query: str,
         tenant_id: Optional[str] = None,
         farm_id: Optional[str] = None,
-        camera_id: Optional[str] = None,
-        should_forward_only: bool = False,
-        limit: int = 50
-    ) -> pd.DataFrame:
+        cancel_token: Optional[CancellationToken] = None,
+        end_date: Optional[str] = None
+    ) -> List[Tuple[str, str]]:
         """
-        Query Stage 1 and Stage 2 results with LEFT JOIN.
+        Cameras with data on the given date(s) whose name matches query.
         
-        Returns linked results where Stage 1 is always present,
-        and Stage 2 may be NULL for events that weren't forwarded.
+        Scoped like the camera dropdown: to the selected farm, else to the
+        tenant's farms. The (farm_id, camera_id) pairs are the cached ones
+        behind the dropdowns, so a search normally costs no warehouse query.
         
         Args:
-            date_str: Date in YYYY-MM-DD format.
-            start_time: Optional start time filter (HH:MM or HH:MM:SS).
-            end_time: Optional end time filter (HH:MM or HH:MM:SS).
-            farm_id: Optional farm ID filter.
-            camera_id: Optional camera ID filter.
-            should_forward_only: If True, only return forwarded events.
-            limit: Maximum number of results.
+            date_str: Date (or first date of the range) in YYYY-MM-DD format.
+            query: Text typed by the user; case-insensitive.
+            tenant_id: Optional tenant ID to search within.
+            farm_id: Optional farm ID to search within; takes precedence over tenant_id.
+            cancel_token: Optional token used to cancel the in-flight statement.
+            end_date: Optional last date of the range (inclusive).
             
         Returns:
-            DataFrame with linked Stage 1 and Stage 2 results.
+            List of tuples (display_name, camera_id), best matches first.
         """
-        # Build filters to push into stage1 CTE for early filtering
-        s1_cte_filters = [f"DATE(processing_timestamp) = '{date_str}'"]
-        
-        # Determine effective farm filter: specific farm > tenant farms
-        effective_farm_ids = None
-        if farm_id and farm_id != "All":
-            s1_cte_filters.append(f"farm_id = '{farm_id}'")
-            effective_farm_ids = [farm_id]
-        elif tenant_id and tenant_id != "All":
-            farm_mapping_data = databricks_mapping_service.get_farm_mapping()
-            tenant_farm_ids = [
-                fid for fid, finfo in farm_mapping_data.items()
-                if finfo.get('tenant_id') == tenant_id
-            ]
-            if tenant_farm_ids:
-                farm_ids_str = "', '".join(tenant_farm_ids)
-                s1_cte_filters.append(f"farm_id IN ('{farm_ids_str}')")
-                effective_farm_ids = tenant_farm_ids
-            else:
-                s1_cte_filters.append("1=0")
-        
-        if camera_id and camera_id != "All":
-            s1_cte_filters.append(f"camera_id = '{camera_id}'")
-        
-        if should_forward_only:
-            s1_cte_filters.append("should_forward = true")
-        
-        s1_where = " AND ".join(s1_cte_filters)
-        
-        # Build outer WHERE for time filters (need aliased columns)
-        outer_filters = []
-        if start_time:
-            st = start_time if start_time.count(':') == 2 else start_time + ":00"
-            outer_filters.append(f"DATE_FORMAT(s1.stage1_timestamp, 'HH:mm:ss') >= '{st}'")
-        if end_time:
-            et = end_time if end_time.count(':') == 2 else end_time + ":59"
-            outer_filters.append(f"DATE_FORMAT(s1.stage1_timestamp, 'HH:mm:ss') <= '{et}'")
-        
-        outer_where = " AND ".join(outer_filters) if outer_filters else "1=1"
-        
-        # Build stage2 CTE filter - push camera filter for faster joins
-        s2_cte_filters = [f"DATE(inference_timestamp) BETWEEN DATE_SUB('{date_str}', 1) AND DATE_ADD('{date_str}', 1)"]
-        if camera_id and camera_id != "All":
-            s2_cte_filters.append(f"camera_id = '{camera_id}'")
-        
-        s2_where = " AND ".join(s2_cte_filters)
-        
-        query = f"""
-        WITH stage1_data AS (
-          SELECT 
-            session_id,
-            farm_id,
-            camera_id,
-            processing_timestamp AS stage1_timestamp,
-            highest_probability_category AS stage1_category,
-            highest_probability_value AS stage1_confidence,
-            should_forward AS stage1_should_forward,
-            frame_uris,
-            frame_uris[0] AS trigger_frame_uri,
-            REGEXP_EXTRACT(frame_uris[0], '/(\\\\d{{3}}_\\\\d{{7}})_', 1) AS blk_file,
-            REGEXP_EXTRACT(frame_uris[0], '_(\\\\d{{4}}-\\\\d{{2}}-\\\\d{{2}}T\\\\d{{2}}:\\\\d{{2}}:\\\\d{{2}})', 1) AS frame_timestamp_key,
-            probability_animal_husbandry,
-            probability_down_cow,
-            probability_quick_movements,
-            probability_no_event,
-            gemini_raw_response AS stage1_raw_response
-          FROM {settings.full_stage1_table}
-          WHERE {s1_where}
-        ),
-        
-        stage2_data AS (
-          SELECT 
-            inference_id AS stage2_inference_id,
-            camera_id,
-            inference_timestamp AS stage2_timestamp,
-            classification AS stage2_classification,
-            max_probability_score AS stage2_confidence,
-            should_forward AS stage2_should_forward,
-            video_gcs_path,
-            file_name AS video_filename,
-            REGEXP_EXTRACT(file_name, '^(\\\\d{{3}}_\\\\d{{7}})_', 1) AS blk_file,
-            REGEXP_EXTRACT(file_name, '_(\\\\d{{4}}-\\\\d{{2}}-\\\\d{{2}}T\\\\d{{2}}:\\\\d{{2}}:\\\\d{{2}})', 1) AS video_timestamp_key,
-            model_votes AS stage2_raw_response
-          FROM {settings.full_stage2_table}
-          WHERE {s2_where}
-        )
-        
-        SELECT 
-          s1.session_id,
-          s1.farm_id,
-          s1.camera_id,
-          s1.stage1_timestamp,
-          s1.stage1_category,
-          s1.stage1_confidence,
-          s1.stage1_should_forward,
-          s1.frame_uris,
-          s1.trigger_frame_uri,
-          SIZE(s1.frame_uris) AS frame_count,
-          s1.probability_animal_husbandry,
-          s1.probability_down_cow,
-          s1.probability_quick_movements,
-          s1.probability_no_event,
-          s1.stage1_raw_response,
-          
-          s2.stage2_inference_id,
-          s2.stage2_timestamp,
-          s2.stage2_classification,
-          s2.stage2_confidence,
-          s2.stage2_should_forward,
-          s2.video_gcs_path,
-          s2.video_filename,
-          s2.stage2_raw_response,
-          
-          s1.blk_file,
-          s1.frame_timestamp_key AS event_timestamp,
-          
-          CASE 
-            WHEN s2.video_gcs_path IS NOT NULL THEN s2.video_gcs_path
-            ELSE REGEXP_REPLACE(
-              REGEXP_REPLACE(s1.trigger_frame_uri, 'frames-to-analyze', 'video-to-analyze'),
-              '\\\\.jpg$', '.mp4'
-            )
-          END AS video_url_derived
-          
-        FROM stage1_data s1
-        LEFT JOIN stage2_data s2
-          ON s1.camera_id = s2.camera_id
-          AND s1.blk_file = s2.blk_file
-          AND s1.frame_timestamp_key = s2.video_timestamp_key
-        
-        WHERE {outer_where}
+        pairs = self.get_farm_camera_pairs(date_str, cancel_token=cancel_token, end_date=end_date)
+        if farm_id:
+            camera_ids = {camera_id for pair_farm_id, camera_id in pairs if camera_id and pair_farm_id == farm_id}
+        elif tenant_id:
+            tenant_farms = set(databricks_mapping_service.get_tenant_farms(tenant_id))
+            camera_ids = {camera_id for pair_farm_id, camera_id in pairs if camera_id and pair_farm_id in tenant_farms}
+        else:
+            camera_ids = {camera_id for _, camera_id in pairs if camera_id}
+        return databricks_mapping_service.search_cameras(query, camera_ids=camera_ids)
+    
+    def _build_linked_query(
+        self,
+        date_str: str,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        tenant_id: Optional[str] = None,
+        farm_id: Optional[str] = None,
+        camera_id: Optional[str] = None,
+        should_forward_only: bool = False,
+        limit: int = 50,
+        after: Optional[PageCursor] = None
+    ) -> SqlQuery:
+        """
+        Build the linked results statement for the given filters.
         
-        ORDER BY s1.stage1_timestamp DESC
-        LIMIT {limit}
+        Reads the materialized linkage table when it covers the range, and
+        the Stage 1 / Stage 2 LEFT JOIN otherwise; both return the same rows.
         """
+        build = self.builder.linked_results
+        source = "live join"
+        if settings.linkage_table_enabled:
+            range_start, range_end, _, _ = self.builder.linked_time_ranges(date_str, start_time, end_time)
+            if self.linkage_tables.covers(range_start, range_end):
+                build = self.builder.linked_results_from_table
+                source = settings.full_linkage_table
+        
+        query = build(
+            date_str,
+            start_time=start_time,
+            end_time=end_time,
+            tenant_id=tenant_id if tenant_id and tenant_id != "All" else None,
+            farm_id=farm_id if farm_id and farm_id != "All" else None,
+            camera_id=camera_id if camera_id and camera_id != "All" else None,
+            should_forward_only=should_forward_only,
+            limit=limit,
+            after=after,
+        )
         
         print(f"")
         print(f"=" * 50)
@@ -423,32 +607,302 @@ class DatabricksQueryService:
         print(f"  Tenant: {tenant_id}")
         print(f"  Farm: {farm_id}")
         print(f"  Camera: {camera_id}")
-        print(f"  S1 filter: {s1_where}")
-        print(f"  S2 filter: {s2_where}")
-        print(f"  Outer filter: {outer_where}")
+        print(f"  Source: {source}")
+        print(f"  Parameters: {query.parameters}")
         print(f"  Limit: {limit}")
+        if after is not None:
+            print(f"  After: {after}")
+        
+        return query
+    
+    def _fetch_linked_day(
+        self,
+        date_str: str,
+        filters: Dict[str, Any],
+        limit: int,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> pd.DataFrame:
+        """
+        Run the linked query for one day and cache the result.
+        
+        Falls back to an expired cached result while the warehouse is
+        unavailable; other errors are raised. Concurrent calls for the same
+        day and filters share one statement. In client-side linkage mode
+        the result is joined in memory instead (_link_day_in_memory), unless
+        one of the day slices it needs is too large to cache.
+        """
+        cache_key = self.result_cache.make_key(date_str, **filters, limit=limit)
+        
+        if settings.linkage_mode == "client" and self._oversized_slices.isdisjoint(
+            self._linkage_slice_keys(date_str, filters)
+        ):
+            def link():
+                df = self._link_day_in_memory(date_str, filters, limit, cancel_token)
+                self._store_result("linked", cache_key, df, date_str)
+                return df
+            
+            return self.flights.do(("linked", cache_key), link, cancel_token)
+        
+        query = self._build_linked_query(date_str, **filters, limit=limit)
+        
+        # An expired result is still better than an error while the warehouse is down
+        stale = self.result_cache.peek_stale(cache_key)
         
         def execute_query(conn):
             print(f"  Executing complex JOIN query...")
-            with conn.cursor() as cursor:
-                cursor.execute(query)
-                
-                # Fetch column names
-                columns = [desc[0] for desc in cursor.description]
-                
-                # Fetch all rows
-                rows = cursor.fetchall()
-                
-                # Convert to DataFrame
-                df = pd.DataFrame(rows, columns=columns)
+            with self._cursor(conn, cancel_token) as cursor:
+                cursor.execute(query.sql, query.parameters)
+                df = fetch_dataframe(cursor)
                 
                 print(f"  ✓ SUCCESS: Returned {len(df)} rows")
                 print(f"  Columns: {list(df.columns)[:5]}..." if len(df.columns) > 5 else f"  Columns: {list(df.columns)}")
                 print(f"=" * 50)
                 return df
         
+        def fetch():
+            df = self._execute_with_retry(
+                execute_query,
+                fallback=(lambda: stale) if stale is not None else None,
+                cancel_token=cancel_token,
+            )
+            if df is not stale:
+                self._store_result("linked", cache_key, df, date_str)
+            return df
+        
+        return self.flights.do(("linked", cache_key), fetch, cancel_token)
+    
+    def _linkage_slice(
+        self,
+        kind: str,
+        date_str: str,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> pd.DataFrame:
+        """
+        One unfiltered day of Stage 1 ("stage1_day") or Stage 2 ("stage2_day") rows, with linkage keys.
+        
+        Cached per day like any other result, so a slice is fetched once and
+        shared by every filter combination (and, for Stage 2, by the three
+        Stage 1 days whose window covers it). A slice too large for the result
+        cache is returned uncached and recorded in _oversized_slices, so later
+        queries needing it run the SQL join instead of refetching it.
+        """
+        cache_key = (kind, date_str)
+        cached = self._cached_result(kind, cache_key, date_str)
+        if cached is not None:
+            return cached
+        
+        if kind == "stage1_day":
+            query, prepare = self.builder.stage1_day(date_str), prepare_stage1_day
+        else:
+            query, prepare = self.builder.stage2_day(date_str), prepare_stage2_day
+        stale = self.result_cache.peek_stale(cache_key)
+        
+        def execute_query(conn):
+            with self._cursor(conn, cancel_token) as cursor:
+                cursor.execute(query.sql, query.parameters)
+                return fetch_dataframe(cursor)
+        
+        def fetch():
+            print(f"  Fetching {kind} slice for {date_str}...")
+            df = self._execute_with_retry(
+                execute_query,
+                fallback=(lambda: stale) if stale is not None else None,
+                cancel_token=cancel_token,
+            )
+            if df is stale:
+                return stale
+            df = prepare(df)
+            if not self.result_cache.put(cache_key, df, date_str):
+                self._oversized_slices.add(cache_key)
+                print(f"  ⚠️ {kind} slice for {date_str} ({len(df)} rows) exceeds the result cache budget; "
+                      f"queries needing it will join on the warehouse")
+                return df
+            if self._persistable(kind, cache_key, date_str):
+                self.disk_cache.put(kind, cache_key, df, self.disk_cache_version)
+            print(f"  ✓ Cached {len(df)} {kind} rows for {date_str}")
+            return df
+        
+        return self.flights.do(cache_key, fetch, cancel_token)
+    
+    def _linkage_slice_keys(self, date_str: str, filters: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """Keys of the day slices _link_day_in_memory joins: the Stage 1 day, then the Stage 2 days of its window."""
+        _, _, stage2_start, stage2_end = self.builder.linked_time_ranges(
+            date_str, filters.get('start_time'), filters.get('end_time')
+        )
+        last_stage2_day = (stage2_end - timedelta(microseconds=1)).date()
+        return [("stage1_day", date_str)] + [
+            ("stage2_day", (stage2_start.date() + timedelta(days=i)).isoformat())
+            for i in range((last_stage2_day - stage2_start.date()).days + 1)
+        ]
+    
+    def _link_day_in_memory(
+        self,
+        date_str: str,
+        filters: Dict[str, Any],
+        limit: int,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> pd.DataFrame:
+        """
+        Linked results for one day, joined in memory from per-day table slices.
+        
+        Client-side linkage mode: no JOIN or REGEXP_EXTRACT runs on the
+        warehouse. The day's Stage 1 slice and the Stage 2 slices covering
+        its window are fetched once; each request only filters them and
+        hash-joins the result.
+        """
+        def value(v: Optional[str]) -> Optional[str]:
+            return None if v in (None, "", "All") else v
+        
+        range_start, range_end, stage2_start, stage2_end = self.builder.linked_time_ranges(
+            date_str, filters.get('start_time'), filters.get('end_time')
+        )
+        slice_keys = self._linkage_slice_keys(date_str, filters)
+        
+        stage1 = self._linkage_slice(*slice_keys[0], cancel_token)
+        stage2 = pd.concat(
+            [self._linkage_slice(kind, day, cancel_token) for kind, day in slice_keys[1:]],
+            ignore_index=True,
+        )
+        
+        farm_id = value(filters.get('farm_id'))
+        tenant_id = value(filters.get('tenant_id'))
+        if farm_id:
+            farm_ids = [farm_id]
+        elif tenant_id:
+            farm_ids = list(databricks_mapping_service.get_tenant_farms(tenant_id))
+        else:
+            farm_ids = None
+        
+        start = time.perf_counter()
+        df = link_stage1_stage2(
+            stage1,
+            stage2,
+            range_start,
+            range_end,
+            stage2_start,
+            stage2_end,
+            timedelta(hours=settings.stage2_window_slack_hours),
+            farm_ids=farm_ids,
+            camera_id=value(filters.get('camera_id')),
+            should_forward_only=filters.get('should_forward_only', False),
+            after=filters.get('after'),
+            limit=limit,
+        )
+        print(f"  ✓ Linked {date_str} in memory: {len(df)} rows in {(time.perf_counter() - start) * 1000:.0f} ms "
+              f"({len(stage1)} Stage 1 / {len(stage2)} Stage 2 rows)")
+        return df
+    
+    @staticmethod
+    def _seek_days(
+        days: List[str],
+        after: Optional[PageCursor]
+    ) -> Dict[str, Optional[Tuple[datetime, str]]]:
+        """
+        Days left to read after a keyset cursor, each mapped to the cursor it applies.
+        
+        Days newer than the cursor are dropped, the cursor's own day seeks
+        past it, and older days are read from their start (so their cached
+        first-page results are reused).
+        """
+        if after is None:
+            return {day: None for day in days}
+        cursor_day = after[0].date().isoformat()
+        return {day: (after if day == cursor_day else None) for day in days if day <= cursor_day}
+    
+    def _iter_linked_days(
+        self,
+        days: List[str],
+        filters: Dict[str, Any],
+        limit: int,
+        cancel_token: Optional[CancellationToken] = None,
+        after: Optional[PageCursor] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Linked results for each day, newest day first, capped at limit rows in total.
+        
+        Each day is queried (and cached) separately with the full limit, so a
+        day's result can be reused by any range that contains it. Days cover
+        disjoint time ranges and every day's rows are ordered newest first,
+        so yielding days newest first keeps the whole stream ordered by
+        stage1_timestamp; no merge sort is needed. With a keyset cursor
+        (`after`), reading resumes right after it.
+        """
+        day_filters = {day: {**filters, 'after': day_after} for day, day_after in self._seek_days(days, after).items()}
+        if not day_filters:
+            return
+        
+        def cached_day(day: str) -> Optional[pd.DataFrame]:
+            cache_key = self.result_cache.make_key(day, **day_filters[day], limit=limit)
+            cached = self._cached_result("linked", cache_key, day)
+            if cached is not None:
+                print(f"  ✓ Result cache hit: {len(cached)} rows for {day}")
+            return cached
+        
+        def fetch_day(day: str) -> pd.DataFrame:
+            return self._fetch_linked_day(day, day_filters[day], limit, cancel_token)
+        
+        remaining = limit
+        for df in self._iter_days(list(day_filters), fetch_day, cached_day):
+            if df.empty:
+                continue
+            if len(df) > remaining:
+                df = df.iloc[:remaining]
+            remaining -= len(df)
+            yield df
+            if remaining <= 0:
+                break
+    
+    def query_stage1_stage2_linked(
+        self,
+        date_str: str,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        tenant_id: Optional[str] = None,
+        farm_id: Optional[str] = None,
+        camera_id: Optional[str] = None,
+        should_forward_only: bool = False,
+        limit: int = 50,
+        cancel_token: Optional[CancellationToken] = None,
+        end_date: Optional[str] = None,
+        page_token: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        Query Stage 1 and Stage 2 results with LEFT JOIN.
+        
+        Returns linked results where Stage 1 is always present,
+        and Stage 2 may be NULL for events that weren't forwarded.
+        
+        A date range runs one query per day (concurrently, skipping days
+        already cached) and returns the newest `limit` rows across all days.
+        The time filters apply to each day of the range.
+        
+        Args:
+            date_str: Date (or first date of the range) in YYYY-MM-DD format.
+            start_time: Optional start time filter (HH:MM or HH:MM:SS).
+            end_time: Optional end time filter (HH:MM or HH:MM:SS).
+            farm_id: Optional farm ID filter.
+            camera_id: Optional camera ID filter.
+            should_forward_only: If True, only return forwarded events.
+            limit: Maximum number of results.
+            cancel_token: Optional token used to cancel the in-flight statement.
+            end_date: Optional last date of the range (inclusive).
+            page_token: Optional token from next_page_token(); returns the rows after it.
+        
+        Returns:
+            DataFrame with linked Stage 1 and Stage 2 results.
+        """
+        filters = dict(
+            start_time=start_time, end_time=end_time, tenant_id=tenant_id,
+            farm_id=farm_id, camera_id=camera_id, should_forward_only=should_forward_only,
+        )
         try:
-            return self._execute_with_retry(execute_query)
+            days = days_in_range(date_str, end_date)
+            after = decode_page_token(page_token) if page_token else None
+            chunks = list(self._iter_linked_days(days, filters, limit, cancel_token, after))
+            return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+        except QueryCancelledError:
+            print(f"  ✗ Query cancelled")
+            return pd.DataFrame()
         except Exception as e:
             print(f"  ✗ ERROR querying data!")
             print(f"  Error type: {type(e).__name__}")
@@ -457,6 +911,318 @@ class DatabricksQueryService:
             traceback.print_exc()
             print(f"=" * 50)
             return pd.DataFrame()
+    
+    @staticmethod
+    def next_page_token(page: pd.DataFrame, page_size: int) -> Optional[str]:
+        """
+        Token for the page after `page`, or None if `page` is the last one.
+        
+        A page shorter than page_size is the last; a full page may be followed
+        by an empty one.
+        """
+        if len(page) < page_size:
+            return None
+        last = page.iloc[-1]
+        return encode_page_token(last['stage1_timestamp'], last['session_id'], last['stage2_inference_id'])
+    
+    def query_linked_page(
+        self,
+        date_str: str,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        tenant_id: Optional[str] = None,
+        farm_id: Optional[str] = None,
+        camera_id: Optional[str] = None,
+        should_forward_only: bool = False,
+        page_size: Optional[int] = None,
+        page_token: Optional[str] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        end_date: Optional[str] = None
+    ) -> Tuple[pd.DataFrame, Optional[str]]:
+        """
+        One page of linked results, paginated by keyset on (stage1_timestamp, session_id, stage2_inference_id).
+        
+        Each page after the first is a range seek below the previous page's
+        last row, so deep pages cost the same as the first (no OFFSET scan).
+        Pages are cached like any other linked result.
+        
+        Args:
+            date_str: Date (or first date of the range) in YYYY-MM-DD format.
+            start_time: Optional start time filter (HH:MM or HH:MM:SS).
+            end_time: Optional end time filter (HH:MM or HH:MM:SS).
+            tenant_id: Optional tenant ID filter.
+            farm_id: Optional farm ID filter.
+            camera_id: Optional camera ID filter.
+            should_forward_only: If True, only return forwarded events.
+            page_size: Rows per page. Defaults to settings.results_page_size.
+            page_token: Token of the page to fetch; None for the first page.
+            cancel_token: Optional token used to cancel the in-flight statements.
+            end_date: Optional last date of the range (inclusive).
+            
+        Returns:
+            Tuple of (page DataFrame, token for the next page or None).
+            
+        Raises:
+            QueryCancelledError: If cancel_token was cancelled.
+            ValueError: If the date range or page token is invalid.
+            Exception: Warehouse errors that survive the retry policy.
+        """
+        page_size = page_size or settings.results_page_size
+        filters = dict(
+            start_time=start_time, end_time=end_time, tenant_id=tenant_id,
+            farm_id=farm_id, camera_id=camera_id, should_forward_only=should_forward_only,
+        )
+        days = days_in_range(date_str, end_date)
+        after = decode_page_token(page_token) if page_token else None
+        chunks = list(self._iter_linked_days(days, filters, page_size, cancel_token, after))
+        page = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+        return page, self.next_page_token(page, page_size)
+    
+    def prefetch_linked_page(self, date_str: str, **kwargs) -> Future:
+        """
+        Fetch a page in the background so it is already cached when requested.
+        
+        Accepts the query_linked_page arguments. Errors are logged, not raised.
+        """
+        def prefetch():
+            try:
+                page, _ = self.query_linked_page(date_str, **kwargs)
+                print(f"  ✓ Prefetched next page: {len(page)} rows")
+            except Exception as e:
+                print(f"  ⚠️  Page prefetch failed: {e}")
+        
+        return self._prefetch_executor.submit(prefetch)
+    
+    def iter_stage1_stage2_linked(
+        self,
+        date_str: str,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        tenant_id: Optional[str] = None,
+        farm_id: Optional[str] = None,
+        camera_id: Optional[str] = None,
+        should_forward_only: bool = False,
+        max_rows: Optional[int] = None,
+        first_chunk_rows: Optional[int] = None,
+        chunk_rows: Optional[int] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        end_date: Optional[str] = None,
+        page_token: Optional[str] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream linked Stage 1 / Stage 2 results in chunks.
+        
+        Runs the same statement as query_stage1_stage2_linked but yields
+        DataFrames from fetchmany() as they arrive, so callers can show the
+        first rows while the rest are still being fetched. A small first
+        chunk keeps time-to-first-row low; later chunks are larger.
+        
+        Starting the statement runs under the shared retry policy. The pooled
+        connection stays checked out until the generator is exhausted or
+        closed; closing it early closes the cursor and returns the connection.
+        
+        While an identical query is already streaming, this waits for it and
+        yields its complete result as one chunk instead of running a second
+        statement. If that query is closed or cancelled before finishing,
+        this runs its own.
+        
+        A date range is not streamed within a day: each day's result is one
+        chunk, newest day first, from the per-day queries of
+        query_stage1_stage2_linked. Neither is a day in client-side linkage
+        mode, where there is no statement to stream.
+        
+        Args:
+            date_str: Date (or first date of the range) in YYYY-MM-DD format.
+            start_time: Optional start time filter (HH:MM or HH:MM:SS).
+            end_time: Optional end time filter (HH:MM or HH:MM:SS).
+            tenant_id: Optional tenant ID filter.
+            farm_id: Optional farm ID filter.
+            camera_id: Optional camera ID filter.
+            should_forward_only: If True, only return forwarded events.
+            max_rows: Row budget across all chunks. Defaults to settings.query_row_budget.
+            first_chunk_rows: Size of the first chunk. Defaults to settings.stream_first_chunk_rows.
+            chunk_rows: Size of later chunks. Defaults to settings.stream_chunk_rows.
+            cancel_token: Optional token used to cancel the in-flight statement.
+            end_date: Optional last date of the range (inclusive).
+            page_token: Optional token from next_page_token(); streams the rows after it.
+            
+        Yields:
+            Non-empty DataFrames with the query_stage1_stage2_linked columns.
+            
+        Raises:
+            QueryCancelledError: If cancel_token was cancelled.
+            ValueError: If the date range is invalid.
+            Exception: Warehouse errors that survive the retry policy.
+        """
+        max_rows = max_rows or settings.query_row_budget
+        size = first_chunk_rows or settings.stream_first_chunk_rows
+        chunk_rows = chunk_rows or settings.stream_chunk_rows
+        
+        days = days_in_range(date_str, end_date)
+        after = decode_page_token(page_token) if page_token else None
+        if len(days) > 1 or settings.linkage_mode == "client":
+            filters = dict(
+                start_time=start_time, end_time=end_time, tenant_id=tenant_id,
+                farm_id=farm_id, camera_id=camera_id, should_forward_only=should_forward_only,
+            )
+            try:
+                yield from self._iter_linked_days(days, filters, max_rows, cancel_token, after)
+            except QueryCancelledError:
+                print(f"  ✗ Query cancelled")
+                raise
+            return
+        
+        day_after = self._seek_days(days, after)
+        if not day_after:
+            return
+        after = day_after[days[0]]
+        
+        cache_key = self.result_cache.make_key(
+            date_str, start_time, end_time, tenant_id, farm_id, camera_id,
+            should_forward_only, max_rows, after
+        )
+        cached = self._cached_result("linked", cache_key, date_str)
+        if cached is not None:
+            print(f"  ✓ Result cache hit: {len(cached)} rows for {date_str}")
+            if not cached.empty:
+                yield cached
+            return
+        
+        query = self._build_linked_query(
+            date_str, start_time, end_time, tenant_id, farm_id, camera_id,
+            should_forward_only, max_rows, after
+        )
+        stale = self.result_cache.peek_stale(cache_key)
+        
+        flight_key = ("linked", cache_key)
+        while True:
+            flight, leader = self.flights.start(flight_key)
+            if leader:
+                break
+            print(f"  Waiting for an identical in-flight query...")
+            try:
+                df = self.flights.wait(flight, cancel_token)
+            except QueryCancelledError:
+                if cancel_token is not None and cancel_token.cancelled:
+                    print(f"  ✗ Query cancelled")
+                    raise
+                # The other query was closed or cancelled by its caller; run our own
+                continue
+            print(f"  ✓ Shared result of an identical query: {len(df)} rows")
+            if not df.empty:
+                yield df
+            return
+        
+        # Published to callers waiting on this query; closing the generator early leaves this error
+        flight_result = None
+        flight_error: Optional[BaseException] = QueryCancelledError("Identical query closed before it finished")
+        
+        def start_statement():
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            with ExitStack() as stack:
+                conn = stack.enter_context(self.pool.connection())
+                cursor = stack.enter_context(self._cursor(conn, cancel_token))
+                with self._cancellation_scope(cancel_token):
+                    cursor.execute(query.sql, query.parameters)
+                # Keep the cursor and connection open for the caller
+                return cursor, stack.pop_all()
+        
+        print(f"  Executing complex JOIN query (streaming)...")
+        try:
+            cursor, resources = self.retrier.call(
+                start_statement,
+                fallback=(lambda: (None, None)) if stale is not None else None,
+            )
+            if cursor is None:
+                # Warehouse unavailable: serve the expired cached result
+                flight_result, flight_error = stale, None
+                if not stale.empty:
+                    yield stale
+                return
+            
+            fetched = 0
+            chunks = []
+            with resources:
+                while fetched < max_rows:
+                    with self._cancellation_scope(cancel_token):
+                        chunk = fetch_dataframe(cursor, min(size, max_rows - fetched))
+                    if chunk.empty:
+                        break
+                    fetched += len(chunk)
+                    chunks.append(chunk)
+                    size = chunk_rows
+                    yield chunk
+            
+            # Only complete results are cached; a closed generator never gets here
+            flight_result = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+            flight_error = None
+            self._store_result("linked", cache_key, flight_result, date_str)
+            print(f"  ✓ SUCCESS: Streamed {fetched} rows in {len(chunks)} chunk(s)")
+            print(f"=" * 50)
+        except QueryCancelledError as e:
+            flight_error = e
+            print(f"  ✗ Query cancelled")
+            raise
+        except Exception as e:
+            flight_error = e
+            print(f"  ✗ ERROR streaming data!")
+            print(f"  Error type: {type(e).__name__}")
+            print(f"  Error message: {str(e)}")
+            print(f"=" * 50)
+            raise
+        finally:
+            self.flights.finish(flight_key, flight, flight_result, flight_error)
+    
+    def get_row_details(
+        self,
+        session_id: str,
+        stage2_inference_id: Optional[str],
+        stage1_timestamp: datetime,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Dict[str, Any]:
+        """
+        Load the heavy columns of one result row: frame URIs and raw model responses.
+        
+        The list query leaves these out; they are fetched by key when a row
+        is selected. Results are memoized in the result cache (a row's
+        details never change once written).
+        
+        Args:
+            session_id: Stage 1 session ID of the row.
+            stage2_inference_id: Linked Stage 2 inference ID, or None.
+            stage1_timestamp: Stage 1 timestamp of the row.
+            cancel_token: Optional token used to cancel the in-flight statement.
+            
+        Returns:
+            Dict with frame_uris, stage1_raw_response and stage2_raw_response
+            (empty if the row was not found or the lookup failed).
+        """
+        cache_key = ("row_details", session_id, stage2_inference_id)
+        cached = self.result_cache.get(cache_key)
+        if cached is not None:
+            return cached.iloc[0].to_dict() if not cached.empty else {}
+        
+        query = self.builder.row_details(session_id, stage2_inference_id, stage1_timestamp)
+        
+        def execute_query(conn):
+            with self._cursor(conn, cancel_token) as cursor:
+                cursor.execute(query.sql, query.parameters)
+                return fetch_dataframe(cursor)
+        
+        try:
+            df = self._execute_with_retry(execute_query, cancel_token=cancel_token)
+        except QueryCancelledError:
+            print(f"  ✗ Query cancelled")
+            return {}
+        except Exception as e:
+            print(f"  ✗ ERROR fetching row details for {session_id}: {e}")
+            import traceback
+            traceback.print_exc()
+            return {}
+        
+        self.result_cache.put(cache_key, df)
+        return df.iloc[0].to_dict() if not df.empty else {}
 
 
 # Global instance
@@ -0,0 +1,204 @@
+"""
+Maintenance of the materialized Stage 1 / Stage 2 linkage table.
+
+The table holds the linked_results() rows (keys extracted, already
+joined), so reads of the ranges it covers skip the regex extraction and
+the join. merge() brings it up to date incrementally and is meant to run
+as a scheduled job:
+
+    python -m services.linkage_table_service
+"""
+
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+# Ensure parent directory is in path
+_parent = Path(__file__).resolve().parent.parent
+if str(_parent) not in sys.path:
+    sys.path.insert(0, str(_parent))
+
+from config.settings import settings
+from infrastructure.databricks_client import DatabricksConnectionPool, databricks_connection_pool
+from infrastructure.warehouse_retry import WarehouseRetrier, warehouse_retrier
+from services.databricks_query_builder import DatabricksQueryBuilder, SqlQuery, databricks_query_builder
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Timestamps as the builder's naive UTC datetimes (the connector may return tz-aware ones)."""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class LinkageTableService:
+    """
+    Keeps the linkage table current and tells readers which ranges it covers.
+    
+    Each merge re-links Stage 1 rows processed since the table's watermark
+    (its newest stage1_timestamp) minus settings.linkage_merge_lookback_hours,
+    which picks up late Stage 1 rows and Stage 2 inferences that arrived
+    after their session was first merged. The first merge backfills
+    settings.linkage_backfill_days whole days.
+    
+    A range is covered once it is older than that lookback: younger rows
+    can still change, so they are read from the live join.
+    """
+    
+    def __init__(
+        self,
+        pool: Optional[DatabricksConnectionPool] = None,
+        retrier: Optional[WarehouseRetrier] = None,
+        builder: Optional[DatabricksQueryBuilder] = None
+    ):
+        """
+        Initialize the service.
+        
+        Args:
+            pool: Optional connection pool. Defaults to the shared global pool.
+            retrier: Optional retry/circuit-breaker runner. Defaults to the shared global one.
+            builder: Optional statement builder. Defaults to the shared global one.
+        """
+        self._pool = pool
+        self.retrier = retrier or warehouse_retrier
+        self.builder = builder or databricks_query_builder
+        
+        self._lock = threading.Lock()
+        # (coverage_start, watermark) or None if the table is missing or empty, and when it was read
+        self._coverage: Optional[Tuple[datetime, datetime]] = None
+        self._coverage_at: Optional[float] = None
+        
+        # Metrics
+        self._merges = 0
+        self._covered_reads = 0
+        self._live_reads = 0
+    
+    @property
+    def pool(self) -> DatabricksConnectionPool:
+        """Connection pool used for all statements."""
+        return self._pool or databricks_connection_pool
+    
+    def _execute(self, query: SqlQuery) -> list:
+        """Run one statement on a pooled connection and return its rows."""
+        def attempt():
+            with self.pool.connection() as conn, conn.cursor() as cursor:
+                cursor.execute(query.sql, query.parameters)
+                return cursor.fetchall() if cursor.description else []
+        
+        # The merge is idempotent (insert missing keys, delete vanished ones), so retrying it is safe
+        return self.retrier.call(attempt)
+    
+    def coverage(self) -> Optional[Tuple[datetime, datetime]]:
+        """
+        Oldest and newest Stage 1 timestamps in the table, cached for settings.linkage_coverage_ttl.
+        
+        Returns:
+            (coverage_start, watermark), or None if the table doesn't exist,
+            is empty or can't be read.
+        """
+        with self._lock:
+            if self._coverage_at is not None and time.monotonic() - self._coverage_at < settings.linkage_coverage_ttl:
+                return self._coverage
+        
+        try:
+            rows = self._execute(self.builder.linkage_coverage())
+            coverage_start, watermark = (_naive_utc(value) for value in rows[0]) if rows else (None, None)
+            # Backfills start at midnight, so the table covers the whole day of its oldest row
+            coverage = (datetime.combine(coverage_start.date(), datetime.min.time()), watermark) if watermark is not None else None
+        except Exception as e:
+            # Usually the table hasn't been created yet; readers fall back to the live join
+            print(f"  ⚠️  Linkage table unavailable: {e}")
+            coverage = None
+        
+        with self._lock:
+            self._coverage, self._coverage_at = coverage, time.monotonic()
+        return coverage
+    
+    def invalidate(self) -> None:
+        """Forget the cached coverage, e.g. after a merge."""
+        with self._lock:
+            self._coverage_at = None
+    
+    def covers(self, range_start: datetime, range_end: datetime) -> bool:
+        """Whether the Stage 1 range [range_start, range_end) can be read from the table."""
+        coverage = self.coverage()
+        covered = coverage is not None and (
+            range_start >= coverage[0]
+            and range_end <= coverage[1] - timedelta(hours=settings.linkage_merge_lookback_hours)
+        )
+        with self._lock:
+            if covered:
+                self._covered_reads += 1
+            else:
+                self._live_reads += 1
+        return covered
+    
+    def merge(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Create the table if needed and merge newly arrived Stage 1 and Stage 2 rows into it.
+        
+        Args:
+            now: Current UTC time, for the first merge's backfill window. Defaults to now.
+            
+        Returns:
+            Dict with the merge window start, the engine's merge counts and the duration.
+        """
+        start = time.perf_counter()
+        self._execute(self.builder.create_linkage_table())
+        
+        self.invalidate()
+        coverage = self.coverage()
+        if coverage is not None:
+            window_start = coverage[1] - timedelta(hours=settings.linkage_merge_lookback_hours)
+        else:
+            today = _naive_utc(now or datetime.now(timezone.utc)).date()
+            window_start = datetime.combine(today - timedelta(days=settings.linkage_backfill_days), datetime.min.time())
+        
+        print(f"Merging linkage rows processed since {window_start:%Y-%m-%d %H:%M:%S} "
+              f"into {settings.full_linkage_table}...")
+        rows = self._execute(self.builder.merge_linkage(window_start))
+        self.invalidate()
+        
+        with self._lock:
+            self._merges += 1
+        result = {
+            'window_start': window_start,
+            # Delta reports (affected, updated, deleted, inserted); other engines may differ
+            'merge_counts': tuple(rows[0]) if rows else (),
+            'duration_s': time.perf_counter() - start,
+        }
+        print(f"  ✓ Merged in {result['duration_s']:.1f}s: {result['merge_counts']}")
+        return result
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            coverage = self._coverage
+            return {
+                'merges': self._merges,
+                'covered_reads': self._covered_reads,
+                'live_reads': self._live_reads,
+                'coverage_start': coverage[0].isoformat() if coverage else None,
+                'watermark': coverage[1].isoformat() if coverage else None,
+            }
+
+
+# Global instance for the shared connection pool
+linkage_table_service = LinkageTableService()
+
+
+def main():
+    """Run one incremental merge, e.g. from a scheduled Databricks job."""
+    from config.secrets_loader import load_secrets_from_yaml
+    
+    load_secrets_from_yaml()
+    try:
+        linkage_table_service.merge()
+    finally:
+        databricks_connection_pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Query service running the dashboard's statements on an embedded DuckDB engine over local files."""
+
+import sys
+from pathlib import Path
+from typing import Optional
+
+# Ensure parent directory is in path
+_parent = Path(__file__).resolve().parent.parent
+if str(_parent) not in sys.path:
+    sys.path.insert(0, str(_parent))
+
+from infrastructure.databricks_client import DatabricksConnectionPool
+from infrastructure.local_sql_client import LocalSqlConnection, create_local_database
+from services.databricks_query_builder import DUCKDB_DIALECT, DatabricksQueryBuilder
+from services.databricks_query_service import DatabricksQueryService
+
+
+class LocalQueryService(DatabricksQueryService):
+    """
+    DatabricksQueryService on local Parquet or Delta tables instead of the SQL warehouse.
+    
+    Runs the same statements (from DatabricksQueryBuilder in the DuckDB
+    dialect) through the same pool, retry, cache, coalescing and
+    cancellation paths, so the dashboard and the benchmarks can be run and
+    measured without a warehouse. Generate data with
+    `python -m benchmarks.synthetic`.
+    """
+    
+    def __init__(self, data_dir: Optional[Path] = None, pool: Optional[DatabricksConnectionPool] = None, **kwargs):
+        """
+        Initialize the local query service.
+        
+        Args:
+            data_dir: Optional directory of table directories. Given one, the
+                service opens its own database and pool on it; otherwise it uses
+                the shared global pool, which is local on the "local" platform.
+            pool: Optional connection pool of LocalSqlConnections (ignored if data_dir is given).
+            **kwargs: Passed to DatabricksQueryService (caches, retrier, flights, ...).
+        """
+        if data_dir is not None:
+            database = create_local_database(data_dir)
+            pool = DatabricksConnectionPool(connection_factory=lambda: LocalSqlConnection(database))
+        kwargs.setdefault("builder", DatabricksQueryBuilder(dialect=DUCKDB_DIALECT))
+        super().__init__(pool=pool, **kwargs)
+
+
+# Global instance on the shared pool (used when settings.platform == "local")
+local_query_service = LocalQueryService()
@@ -0,0 +1,129 @@
+"""Background refresh of the tenant, farm and camera mappings."""
+
+import atexit
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Ensure parent directory is in path
+_parent = Path(__file__).resolve().parent.parent
+if str(_parent) not in sys.path:
+    sys.path.insert(0, str(_parent))
+
+from config.settings import settings
+from infrastructure.databricks_client import DatabricksConnectionPool, databricks_connection_pool
+from services.databricks_mapping_service import DatabricksMappingService, databricks_mapping_service
+
+
+class MappingRefresher:
+    """
+    Reloads the mapping tables on an interval while the app is in use.
+    
+    Each round reads the mapping tables' Delta versions and reloads only if
+    one changed; the new mappings are swapped in atomically by
+    DatabricksMappingService.reload(), so request handlers never wait for a
+    reload or see a half-built mapping.
+    
+    Like the warehouse keepalive, rounds are skipped once nobody has run a
+    query for ``idle_shutdown`` seconds, judged by the pool's
+    last_user_checkout_at. The mapping service checks out in the background,
+    so refresh rounds don't count as use for either scheduler and the
+    refresher alone doesn't keep the warehouse running.
+    """
+    
+    def __init__(
+        self,
+        service: Optional[DatabricksMappingService] = None,
+        pool: Optional[DatabricksConnectionPool] = None,
+        interval: Optional[float] = None,
+        idle_shutdown: Optional[float] = None,
+    ):
+        """
+        Initialize the refresher. Nothing runs until start().
+        
+        Args:
+            service: Mapping service to refresh. Defaults to the shared global one.
+            pool: Pool whose checkouts tell whether the app is in use. Defaults to the shared global pool.
+            interval: Seconds between version checks. Defaults to settings.mapping_refresh_interval.
+            idle_shutdown: Seconds without queries after which rounds are skipped.
+                Defaults to settings.keepalive_idle_shutdown.
+        """
+        self.service = service or databricks_mapping_service
+        self._pool = pool
+        self._interval = interval if interval is not None else settings.mapping_refresh_interval
+        self._idle_shutdown = idle_shutdown if idle_shutdown is not None else settings.keepalive_idle_shutdown
+        
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at = time.monotonic()
+        
+        # Metrics
+        self._rounds = 0
+        self._idle_skips = 0
+        self._errors = 0
+    
+    @property
+    def pool(self) -> DatabricksConnectionPool:
+        """Pool to watch; resolved lazily so tests can swap the global pool."""
+        return self._pool or databricks_connection_pool
+    
+    def start(self) -> None:
+        """Start the background refresher (no-op if it is already running)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._started_at = time.monotonic()
+            self._thread = threading.Thread(target=self._run, name="mapping-refresher", daemon=True)
+            self._thread.start()
+        
+        print(f"✓ Mapping refresher started (version check every {self._interval:.0f}s)")
+    
+    def stop(self) -> None:
+        """Stop the background refresher."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        self._stop.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5.0)
+    
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            try:
+                self.tick()
+            except Exception as e:
+                with self._lock:
+                    self._errors += 1
+                print(f"  ⚠️  Mapping refresh error: {e}")
+    
+    def tick(self) -> None:
+        """Reload the mappings if their tables changed, unless the app is idle."""
+        # The mapping service checks out in the background, so its own rounds don't count as use
+        last_used = max(self.pool.last_user_checkout_at or 0.0, self._started_at)
+        if time.monotonic() - last_used >= self._idle_shutdown:
+            with self._lock:
+                self._idle_skips += 1
+            return
+        
+        self.service.reload(force=False)
+        with self._lock:
+            self._rounds += 1
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'running': self._thread is not None,
+                'interval_s': self._interval,
+                'rounds': self._rounds,
+                'idle_skips': self._idle_skips,
+                'errors': self._errors,
+                **{f"mappings_{key}": value for key, value in self.service.get_metrics().items()},
+            }
+
+
+# Global refresher for the shared mapping service
+mapping_refresher = MappingRefresher()
+atexit.register(mapping_refresher.stop)
@@ -0,0 +1,260 @@
+"""On-disk Parquet cache of warehouse query results for dates whose data is final."""
+
+import hashlib
+import os
+import re
+import shutil
+import sys
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+import pandas as pd
+
+# Ensure parent directory is in path
+_parent = Path(__file__).resolve().parent.parent
+if str(_parent) not in sys.path:
+    sys.path.insert(0, str(_parent))
+
+from config.settings import settings
+
+# Version directory names written by this cache (DatabricksQueryBuilder.template_fingerprint())
+_VERSION_DIR = re.compile(r"[0-9a-f]{16}")
+# Eviction frees space down to this fraction of the cap, so a full cache isn't rescanned on every write
+_EVICT_TO_FRACTION = 0.9
+
+
+class ParquetResultCache:
+    """
+    Persistent cache of query results, one Parquet file per filter combination.
+    
+    Layout: ``<cache_dir>/<version>/<kind>/<filter hash>.parquet``. Callers
+    pass the fingerprint of their query builder's templates as the version
+    (DatabricksQueryBuilder.template_fingerprint()); it changes whenever the
+    SQL templates or the dialect change, so results written by another query
+    never get read back.
+    
+    Files are written to a temporary name and moved into place with
+    os.replace(), so several app processes can share the directory: readers
+    see a whole file or none. Reads touch the file's mtime, and the oldest
+    files are deleted once the directory exceeds its size cap (LRU). The cap
+    covers every version directory, so files of older query versions, which
+    are no longer read, age out first. They are never removed wholesale: in
+    a rolling deploy the old version's processes are still using them.
+    
+    The directory size is scanned on the first write and then tracked as a
+    running total; the directory is only rescanned (files listed and sorted
+    by mtime) once that total exceeds the cap.
+    
+    Only use it for results that can no longer change (closed past dates).
+    """
+    
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        max_bytes: Optional[int] = None
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            cache_dir: Root directory. Defaults to settings.disk_cache_dir.
+            max_bytes: Size cap for all cached files. Defaults to settings.disk_cache_max_bytes.
+        """
+        self._cache_dir = Path(cache_dir or settings.disk_cache_dir)
+        self._max_bytes = max_bytes if max_bytes is not None else settings.disk_cache_max_bytes
+        self._lock = threading.Lock()
+        # Bytes of all cached files; None until the first write scans the directory
+        self._size_bytes: Optional[int] = None
+        # Versions this process writes; their directories are never removed, even when empty
+        self._versions: Set[str] = set()
+        
+        # Metrics
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+        self._evictions = 0
+        self._errors = 0
+    
+    @staticmethod
+    def filter_hash(key: Hashable) -> str:
+        """Stable file name for a normalized filter key."""
+        return hashlib.sha256(repr(key).encode()).hexdigest()[:32]
+    
+    def _path(self, version: str, kind: str, key: Hashable) -> Path:
+        return self._cache_dir / version / kind / f"{self.filter_hash(key)}.parquet"
+    
+    def get(self, kind: str, key: Hashable, version: str) -> Optional[pd.DataFrame]:
+        """
+        Read a cached result.
+        
+        Args:
+            kind: Result family (e.g. "linked", "distinct")
+            key: Normalized filter key
+            version: Fingerprint of the query templates that produced the result
+            
+        Returns:
+            DataFrame with Arrow-backed dtypes, or None if not cached
+        """
+        if not settings.disk_cache_enabled:
+            return None
+        
+        path = self._path(version, kind, key)
+        try:
+            import pyarrow.parquet as pq
+            df = pq.read_table(path).to_pandas(types_mapper=pd.ArrowDtype)
+            os.utime(path)  # Mark as recently used
+        except FileNotFoundError:
+            with self._lock:
+                self._misses += 1
+            return None
+        except Exception as e:
+            print(f"  ⚠️  Disk cache read failed for {path.name}: {e}")
+            with self._lock:
+                self._errors += 1
+                self._misses += 1
+            return None
+        
+        with self._lock:
+            self._hits += 1
+        return df
+    
+    def put(self, kind: str, key: Hashable, df: pd.DataFrame, version: str) -> None:
+        """
+        Write a result atomically, then enforce the size cap.
+        
+        Failures are logged and ignored; the cache never fails a query.
+        
+        Args:
+            kind: Result family (e.g. "linked", "distinct")
+            key: Normalized filter key
+            df: Query result
+            version: Fingerprint of the query templates that produced the result
+        """
+        if not settings.disk_cache_enabled:
+            return
+        
+        with self._lock:
+            self._versions.add(version)
+        
+        path = self._path(version, kind, key)
+        tmp_path = path.with_name(f".{path.stem}.{os.getpid()}.{uuid.uuid4().hex}.tmp")
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            path.parent.mkdir(parents=True, exist_ok=True)
+            pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp_path)
+            size = tmp_path.stat().st_size
+            try:
+                replaced = path.stat().st_size
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"  ⚠️  Disk cache write failed for {path.name}: {e}")
+            with self._lock:
+                self._errors += 1
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            return
+        
+        with self._lock:
+            self._writes += 1
+            if self._size_bytes is None:
+                self._size_bytes = sum(size for _, size, _ in self._scan(self._version_dirs()))
+            else:
+                self._size_bytes += size - replaced
+            over_cap = self._size_bytes > self._max_bytes
+        if over_cap:
+            self.evict()
+    
+    def _version_dirs(self) -> List[Path]:
+        """Version directories this cache wrote in cache_dir, for any query version."""
+        try:
+            # Only directories this cache wrote; anything else in cache_dir is left alone
+            return [
+                entry for entry in self._cache_dir.iterdir()
+                if _VERSION_DIR.fullmatch(entry.name) and entry.is_dir()
+            ]
+        except OSError:
+            return []
+    
+    @staticmethod
+    def _scan(version_dirs: List[Path]) -> List[Tuple[float, int, Path]]:
+        """(mtime, size, path) of every cached file in version_dirs."""
+        files = []
+        for version_dir in version_dirs:
+            for path in version_dir.glob("*/*.parquet"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue  # Removed by another process
+                files.append((stat.st_mtime, stat.st_size, path))
+        return files
+    
+    def evict(self) -> int:
+        """
+        Delete least recently used files, across all query versions, until the cache is 10% under its size cap.
+        
+        Rescans the whole directory, so it also picks up files written by
+        other processes; put() only calls it once the running total exceeds the cap.
+        
+        Returns:
+            Number of files deleted
+        """
+        with self._lock:
+            version_dirs = self._version_dirs()
+            files = self._scan(version_dirs)
+            total = sum(size for _, size, _ in files)
+            
+            target = self._max_bytes * _EVICT_TO_FRACTION
+            evicted = 0
+            for _, size, path in sorted(files):
+                if total <= target:
+                    break
+                try:
+                    path.unlink()
+                    evicted += 1
+                except FileNotFoundError:
+                    pass
+                total -= size
+            
+            # Drop other versions' directories once eviction has emptied them (rmdir fails otherwise)
+            for version_dir in version_dirs:
+                if version_dir.name in self._versions:
+                    continue
+                for path in [*version_dir.glob("*/"), version_dir]:
+                    try:
+                        path.rmdir()
+                    except OSError:
+                        pass
+            
+            self._size_bytes = total
+            self._evictions += evicted
+            return evicted
+    
+    def clear(self, version: str) -> None:
+        """Delete all cached files for a query version."""
+        shutil.rmtree(self._cache_dir / version, ignore_errors=True)
+        with self._lock:
+            self._size_bytes = None  # Rescanned on the next write
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'cache_dir': str(self._cache_dir),
+                'size_bytes': self._size_bytes,
+                'max_bytes': self._max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'writes': self._writes,
+                'evictions': self._evictions,
+                'errors': self._errors,
+            }
+
+
+# Global instance
+parquet_result_cache = ParquetResultCache()
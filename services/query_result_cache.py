@@ -0,0 +1,225 @@
+"""In-process cache of linked query results, bounded by memory."""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import pandas as pd
+
+# Ensure parent directory is in path
+_parent = Path(__file__).resolve().parent.parent
+if str(_parent) not in sys.path:
+    sys.path.insert(0, str(_parent))
+
+from config.settings import settings
+from services.databricks_query_builder import PageCursor, normalize_time
+
+
+def is_date_final(date_str: str, ingestion_lag_hours: Optional[float] = None, now: Optional[datetime] = None) -> bool:
+    """
+    Whether a day's data can no longer change.
+    
+    A day is final once it has ended (UTC) and the ingestion lag has passed,
+    so late-arriving Stage 1 / Stage 2 rows are already in the tables.
+    
+    Args:
+        date_str: Date in YYYY-MM-DD format.
+        ingestion_lag_hours: Defaults to settings.result_cache_ingestion_lag_hours.
+        now: Current time, for testing. Defaults to the current UTC time.
+    """
+    if ingestion_lag_hours is None:
+        ingestion_lag_hours = settings.result_cache_ingestion_lag_hours
+    now = now or datetime.now(timezone.utc)
+    day_end = datetime.combine(date.fromisoformat(date_str) + timedelta(days=1), datetime.min.time(), timezone.utc)
+    return now >= day_end + timedelta(hours=ingestion_lag_hours)
+
+
+@dataclass
+class _CacheEntry:
+    """A cached result and when it stops being fresh."""
+    df: pd.DataFrame
+    size_bytes: int
+    expires_at: Optional[float]  # time.monotonic() deadline; None never expires
+
+
+class QueryResultCache:
+    """
+    LRU cache of query_stage1_stage2_linked results, bounded by bytes.
+    
+    Results for days that ended more than the ingestion lag ago can no longer
+    change, so they stay fresh until evicted. Results for recent days (today,
+    or yesterday while late rows may still arrive) expire after a short TTL.
+    Expired entries are kept until evicted so they can still be served as
+    stale data while the warehouse is unavailable.
+    
+    Cached DataFrames are shared between callers and must not be modified.
+    """
+    
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        recent_ttl: Optional[float] = None,
+        ingestion_lag_hours: Optional[float] = None
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_bytes: Memory budget for cached DataFrames. Defaults to settings.result_cache_max_bytes.
+            recent_ttl: Seconds results for recent days stay fresh. Defaults to settings.result_cache_recent_ttl.
+            ingestion_lag_hours: Hours after a day ends before its data is final.
+                Defaults to settings.result_cache_ingestion_lag_hours.
+        """
+        self._max_bytes = max_bytes if max_bytes is not None else settings.result_cache_max_bytes
+        self._recent_ttl = recent_ttl if recent_ttl is not None else settings.result_cache_recent_ttl
+        self._ingestion_lag_hours = (
+            ingestion_lag_hours if ingestion_lag_hours is not None else settings.result_cache_ingestion_lag_hours
+        )
+        
+        self._entries: "OrderedDict[Hashable, _CacheEntry]" = OrderedDict()
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+        
+        # Metrics
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._evictions = 0
+        self._rejected = 0
+    
+    @staticmethod
+    def make_key(
+        date_str: str,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        tenant_id: Optional[str] = None,
+        farm_id: Optional[str] = None,
+        camera_id: Optional[str] = None,
+        should_forward_only: bool = False,
+        limit: int = 50,
+        after: Optional[PageCursor] = None
+    ) -> Tuple:
+        """
+        Normalized filter tuple identifying a linked query result.
+        
+        Filters that select the same rows map to the same key: "All" and
+        empty values are dropped, times are expanded to HH:MM:SS, and the
+        tenant is ignored when a farm is selected (the farm takes precedence).
+        `after` is the keyset cursor of a page after the first.
+        """
+        def value(v: Optional[str]) -> Optional[str]:
+            return None if v in (None, "", "All") else str(v)
+        
+        farm = value(farm_id)
+        return (
+            date_str,
+            normalize_time(start_time, "00") if start_time else None,
+            normalize_time(end_time, "59") if end_time else None,
+            None if farm else value(tenant_id),
+            farm,
+            value(camera_id),
+            bool(should_forward_only),
+            int(limit),
+            after,
+        )
+    
+    @staticmethod
+    def has_tenant_filter(key: Tuple) -> bool:
+        """Whether a make_key() key filters by tenant, i.e. its rows depend on the farm_map mapping."""
+        return key[3] is not None
+    
+    def ttl_for(self, date_str: str, now: Optional[datetime] = None) -> Optional[float]:
+        """
+        Freshness lifetime for results of a date.
+        
+        Returns:
+            None if the day's data is final (never expires), else the recent-data TTL in seconds
+        """
+        if is_date_final(date_str, self._ingestion_lag_hours, now):
+            return None
+        return self._recent_ttl
+    
+    def get(self, key: Hashable) -> Optional[pd.DataFrame]:
+        """Return a fresh cached result, or None on a miss (or an expired entry)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            if entry.expires_at is not None and time.monotonic() >= entry.expires_at:
+                self._misses += 1
+                self._expired += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry.df
+    
+    def peek_stale(self, key: Hashable) -> Optional[pd.DataFrame]:
+        """Return a cached result regardless of age, without touching LRU order or counters."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.df if entry is not None else None
+    
+    def put(self, key: Hashable, df: pd.DataFrame, date_str: Optional[str] = None) -> bool:
+        """
+        Cache a result, evicting least recently used entries to stay within the byte budget.
+        
+        Args:
+            key: Key from make_key()
+            df: Query result
+            date_str: Date the result is for (decides its TTL); None for results that never change
+            
+        Returns:
+            False if the result alone exceeds the byte budget and was not cached
+        """
+        size_bytes = int(df.memory_usage(index=True, deep=True).sum())
+        ttl = self.ttl_for(date_str) if date_str is not None else None
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size_bytes -= old.size_bytes
+            
+            if size_bytes > self._max_bytes:
+                self._rejected += 1
+                return False
+            
+            while self._entries and self._size_bytes + size_bytes > self._max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size_bytes -= evicted.size_bytes
+                self._evictions += 1
+            
+            self._entries[key] = _CacheEntry(df, size_bytes, expires_at)
+            self._size_bytes += size_bytes
+            return True
+    
+    def clear(self) -> None:
+        """Drop all cached results."""
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'size_bytes': self._size_bytes,
+                'max_bytes': self._max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+                'expired': self._expired,
+                'evictions': self._evictions,
+                'rejected': self._rejected,
+            }
+
+
+# Global instance
+query_result_cache = QueryResultCache()
@@ -0,0 +1,26 @@
+"""Shared pytest fixtures."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ensure parent directory is in path
+_parent = Path(__file__).resolve().parent.parent
+if str(_parent) not in sys.path:
+    sys.path.insert(0, str(_parent))
+
+from config.settings import settings
+
+
+@pytest.fixture
+def pinned_settings(monkeypatch):
+    """Settings the generated SQL depends on, pinned so environment overrides don't leak into tests."""
+    monkeypatch.setattr(settings, "platform", "databricks")
+    monkeypatch.setattr(settings, "catalog_name", "stg_cv_catalog")
+    monkeypatch.setattr(settings, "schema_name", "bronze")
+    monkeypatch.setattr(settings, "stage1_table", "gemini_stage1_detections")
+    monkeypatch.setattr(settings, "stage2_table", "stage2_vlm_inferences")
+    monkeypatch.setattr(settings, "linkage_table", "stage1_stage2_linkage")
+    monkeypatch.setattr(settings, "stage2_window_slack_hours", 24.0)
+    return settings
@@ -0,0 +1,69 @@
+WITH stage1_data AS (
+  SELECT
+    session_id,
+    farm_id,
+    camera_id,
+    processing_timestamp AS stage1_timestamp,
+    highest_probability_category AS stage1_category,
+    highest_probability_value AS stage1_confidence,
+    should_forward AS stage1_should_forward,
+    len(frame_uris) AS frame_count,
+    REGEXP_EXTRACT(frame_uris[1], '/([0-9]{3}_[0-9]{7})_', 1) AS blk_file,
+    REGEXP_EXTRACT(frame_uris[1], '_([0-9]{4}-[0-9]{2}-[0-9]{2}T[0-9]{2}:[0-9]{2}:[0-9]{2})', 1) AS frame_timestamp_key
+  FROM stg_cv_catalog.bronze.gemini_stage1_detections
+  WHERE processing_timestamp >= :range_start AND processing_timestamp < :range_end AND processing_timestamp <= :cursor_timestamp AND (processing_timestamp < :cursor_timestamp OR session_id <= :cursor_session_id)
+),
+
+stage2_data AS (
+  SELECT
+    inference_id AS stage2_inference_id,
+    camera_id,
+    inference_timestamp AS stage2_timestamp,
+    classification AS stage2_classification,
+    max_probability_score AS stage2_confidence,
+    should_forward AS stage2_should_forward,
+    video_gcs_path,
+    REGEXP_EXTRACT(file_name, '^([0-9]{3}_[0-9]{7})_', 1) AS blk_file,
+    REGEXP_EXTRACT(file_name, '_([0-9]{4}-[0-9]{2}-[0-9]{2}T[0-9]{2}:[0-9]{2}:[0-9]{2})', 1) AS video_timestamp_key
+  FROM stg_cv_catalog.bronze.stage2_vlm_inferences
+  WHERE inference_timestamp >= :stage2_start AND inference_timestamp < :stage2_end
+)
+
+SELECT
+  s1.session_id,
+  s1.farm_id,
+  s1.camera_id,
+  s1.stage1_timestamp,
+  s1.stage1_category,
+  s1.stage1_confidence,
+  s1.stage1_should_forward,
+  s1.frame_count,
+
+  s2.stage2_inference_id,
+  s2.stage2_timestamp,
+  s2.stage2_classification,
+  s2.stage2_confidence,
+  s2.stage2_should_forward,
+  s2.video_gcs_path,
+
+  s1.blk_file,
+  s1.frame_timestamp_key AS event_timestamp
+
+FROM stage1_data s1
+LEFT JOIN stage2_data s2
+  ON s1.camera_id = s2.camera_id
+  AND s1.blk_file = s2.blk_file
+  AND s1.frame_timestamp_key = s2.video_timestamp_key
+  AND s2.stage2_timestamp >= s1.stage1_timestamp - INTERVAL 86400 SECONDS AND s2.stage2_timestamp < s1.stage1_timestamp + INTERVAL 86400 SECONDS
+WHERE (s1.stage1_timestamp < :cursor_timestamp OR s1.session_id < :cursor_session_id)
+
+ORDER BY s1.stage1_timestamp DESC, s1.session_id DESC, s2.stage2_inference_id DESC NULLS LAST
+LIMIT 50
+
+-- parameters
+-- cursor_session_id = 'session-0042'
+-- cursor_timestamp = datetime.datetime(2026, 10, 16, 12, 30, 5)
+-- range_end = datetime.datetime(2026, 10, 17, 0, 0)
+-- range_start = datetime.datetime(2026, 10, 16, 0, 0)
+-- stage2_end = datetime.datetime(2026, 10, 18, 0, 0)
+-- stage2_start = datetime.datetime(2026, 10, 15, 0, 0)
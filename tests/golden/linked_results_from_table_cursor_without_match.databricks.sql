@@ -0,0 +1,11 @@
+SELECT session_id, farm_id, camera_id, stage1_timestamp, stage1_category, stage1_confidence, stage1_should_forward, frame_count, stage2_inference_id, stage2_timestamp, stage2_classification, stage2_confidence, stage2_should_forward, video_gcs_path, blk_file, event_timestamp
+FROM stg_cv_catalog.bronze.stage1_stage2_linkage
+WHERE stage1_timestamp >= :range_start AND stage1_timestamp < :range_end AND stage1_timestamp <= :cursor_timestamp AND (stage1_timestamp < :cursor_timestamp OR session_id <= :cursor_session_id) AND (stage1_timestamp < :cursor_timestamp OR session_id < :cursor_session_id)
+ORDER BY stage1_timestamp DESC, session_id DESC, stage2_inference_id DESC NULLS LAST
+LIMIT 50
+
+-- parameters
+-- cursor_session_id = 'session-0042'
+-- cursor_timestamp = datetime.datetime(2026, 10, 16, 12, 30, 5)
+-- range_end = datetime.datetime(2026, 10, 17, 0, 0)
+-- range_start = datetime.datetime(2026, 10, 16, 0, 0)
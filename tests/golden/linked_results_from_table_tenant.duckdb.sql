@@ -0,0 +1,10 @@
+SELECT session_id, farm_id, camera_id, stage1_timestamp, stage1_category, stage1_confidence, stage1_should_forward, frame_count, stage2_inference_id, stage2_timestamp, stage2_classification, stage2_confidence, stage2_should_forward, video_gcs_path, blk_file, event_timestamp
+FROM stg_cv_catalog.bronze.stage1_stage2_linkage
+WHERE stage1_timestamp >= :range_start AND stage1_timestamp < :range_end AND farm_id IN (SELECT farm_id FROM stg_cv_catalog.bronze.farm_map WHERE tenant_id = :tenant_id)
+ORDER BY stage1_timestamp DESC, session_id DESC, stage2_inference_id DESC NULLS LAST
+LIMIT 50
+
+-- parameters
+-- range_end = datetime.datetime(2026, 10, 16, 17, 30, 16)
+-- range_start = datetime.datetime(2026, 10, 16, 8, 0)
+-- tenant_id = 'tenant-001'
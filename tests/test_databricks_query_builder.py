@@ -0,0 +1,156 @@
+"""
+Golden tests for the linked-query SQL built by DatabricksQueryBuilder.
+
+Each case renders the statement and its bound parameters and compares
+them with a snapshot in tests/golden/. After an intended change to the
+generated SQL, regenerate the snapshots and review their diff:
+
+    UPDATE_GOLDEN=1 python -m pytest tests/test_databricks_query_builder.py
+"""
+
+import os
+import textwrap
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from services.databricks_query_builder import (
+    DATABRICKS_DIALECT,
+    DUCKDB_DIALECT,
+    DatabricksQueryBuilder,
+    SqlQuery,
+)
+
+GOLDEN_DIR = Path(__file__).resolve().parent / "golden"
+
+CURSOR = (datetime(2026, 10, 16, 12, 30, 5), "session-0042", "inference-0007")
+CURSOR_WITHOUT_MATCH = (datetime(2026, 10, 16, 12, 30, 5), "session-0042", None)
+
+# Golden case name -> (builder method, keyword arguments)
+CASES = {
+    "linked_results_day": ("linked_results", dict(date_str="2026-10-16")),
+    "linked_results_time_range": (
+        "linked_results", dict(date_str="2026-10-16", start_time="08:00", end_time="17:30"),
+    ),
+    "linked_results_tenant": (
+        "linked_results", dict(date_str="2026-10-16", tenant_id="tenant-001", should_forward_only=True),
+    ),
+    "linked_results_cursor": (
+        "linked_results",
+        dict(date_str="2026-10-16", farm_id="farm-001", camera_id="cam-0001", limit=100, after=CURSOR),
+    ),
+    "linked_results_cursor_without_match": (
+        "linked_results", dict(date_str="2026-10-16", after=CURSOR_WITHOUT_MATCH),
+    ),
+    "linked_results_from_table_tenant": (
+        "linked_results_from_table",
+        dict(date_str="2026-10-16", start_time="08:00:00", end_time="17:30:15", tenant_id="tenant-001"),
+    ),
+    "linked_results_from_table_cursor": (
+        "linked_results_from_table", dict(date_str="2026-10-16", camera_id="cam-0001", after=CURSOR),
+    ),
+    "linked_results_from_table_cursor_without_match": (
+        "linked_results_from_table", dict(date_str="2026-10-16", after=CURSOR_WITHOUT_MATCH),
+    ),
+}
+
+
+def render(query: SqlQuery) -> str:
+    """Snapshot text of a statement: the dedented SQL, then its parameters sorted by name."""
+    lines = [textwrap.dedent(query.sql).strip(), "", "-- parameters"]
+    lines += [f"-- {name} = {query.parameters[name]!r}" for name in sorted(query.parameters)]
+    return "\n".join(lines) + "\n"
+
+
+@pytest.mark.parametrize("dialect", [DATABRICKS_DIALECT, DUCKDB_DIALECT], ids=lambda d: d.name)
+@pytest.mark.parametrize("case", sorted(CASES))
+def test_golden_sql(pinned_settings, case, dialect):
+    method, kwargs = CASES[case]
+    rendered = render(getattr(DatabricksQueryBuilder(dialect), method)(**kwargs))
+    golden = GOLDEN_DIR / f"{case}.{dialect.name}.sql"
+    if os.getenv("UPDATE_GOLDEN"):
+        golden.write_text(rendered)
+    assert rendered == golden.read_text()
+
+
+def test_day_range_is_half_open(pinned_settings):
+    query = DatabricksQueryBuilder().linked_results("2026-10-16")
+    assert "processing_timestamp >= :range_start AND processing_timestamp < :range_end" in query.sql
+    assert query.parameters["range_start"] == datetime(2026, 10, 16)
+    assert query.parameters["range_end"] == datetime(2026, 10, 17)
+
+
+def test_end_time_without_seconds_includes_the_whole_minute(pinned_settings):
+    query = DatabricksQueryBuilder().linked_results("2026-10-16", start_time="08:00", end_time="17:30")
+    assert query.parameters["range_start"] == datetime(2026, 10, 16, 8, 0, 0)
+    # 17:30 means up to 17:30:59 inclusive, i.e. < 17:31:00
+    assert query.parameters["range_end"] == datetime(2026, 10, 16, 17, 31, 0)
+
+
+def test_end_time_with_seconds_is_inclusive_to_the_second(pinned_settings):
+    query = DatabricksQueryBuilder().linked_results("2026-10-16", end_time="17:30:15")
+    assert query.parameters["range_end"] == datetime(2026, 10, 16, 17, 30, 16)
+
+
+def test_stage2_window_is_widened_by_the_slack(pinned_settings, monkeypatch):
+    monkeypatch.setattr(pinned_settings, "stage2_window_slack_hours", 6.0)
+    query = DatabricksQueryBuilder().linked_results("2026-10-16", start_time="08:00", end_time="17:30")
+    assert "inference_timestamp >= :stage2_start AND inference_timestamp < :stage2_end" in query.sql
+    assert query.parameters["stage2_start"] == datetime(2026, 10, 16, 2, 0, 0)
+    assert query.parameters["stage2_end"] == datetime(2026, 10, 16, 23, 31, 0)
+    # Each match must also lie within the slack of its own Stage 1 row
+    assert (
+        "s2.stage2_timestamp >= s1.stage1_timestamp - INTERVAL 21600 SECONDS "
+        "AND s2.stage2_timestamp < s1.stage1_timestamp + INTERVAL 21600 SECONDS" in query.sql
+    )
+
+
+def test_tenant_filter_is_a_farm_map_semi_join(pinned_settings):
+    query = DatabricksQueryBuilder().linked_results("2026-10-16", tenant_id="tenant-001")
+    assert (
+        "farm_id IN (SELECT farm_id FROM stg_cv_catalog.bronze.farm_map WHERE tenant_id = :tenant_id)"
+        in query.sql
+    )
+    assert query.parameters["tenant_id"] == "tenant-001"
+
+
+def test_farm_filter_takes_precedence_over_tenant(pinned_settings):
+    query = DatabricksQueryBuilder().linked_results("2026-10-16", tenant_id="tenant-001", farm_id="farm-001")
+    assert "farm_map" not in query.sql
+    assert "tenant_id" not in query.parameters
+    assert query.parameters["farm_id"] == "farm-001"
+
+
+@pytest.mark.parametrize("method", ["linked_results", "linked_results_from_table"])
+def test_filter_values_are_bound_not_inlined(pinned_settings, method):
+    query = getattr(DatabricksQueryBuilder(), method)(
+        "2026-10-16", tenant_id="tenant'; DROP TABLE x; --", camera_id="cam-0001", after=CURSOR,
+    )
+    assert "DROP TABLE" not in query.sql
+    assert "cam-0001" not in query.sql
+    assert "session-0042" not in query.sql
+
+
+@pytest.mark.parametrize("method", ["linked_results", "linked_results_from_table"])
+def test_cursor_binds_all_three_keys(pinned_settings, method):
+    query = getattr(DatabricksQueryBuilder(), method)("2026-10-16", after=CURSOR)
+    assert query.parameters["cursor_timestamp"] == CURSOR[0]
+    assert query.parameters["cursor_session_id"] == CURSOR[1]
+    assert query.parameters["cursor_inference_id"] == CURSOR[2]
+    assert "stage2_inference_id DESC NULLS LAST" in query.sql
+
+
+@pytest.mark.parametrize("method", ["linked_results", "linked_results_from_table"])
+def test_cursor_without_match_skips_the_rest_of_its_session(pinned_settings, method):
+    query = getattr(DatabricksQueryBuilder(), method)("2026-10-16", after=CURSOR_WITHOUT_MATCH)
+    assert "cursor_inference_id" not in query.parameters
+    assert ":cursor_inference_id" not in query.sql
+
+
+def test_same_filters_give_identical_sql(pinned_settings):
+    builder = DatabricksQueryBuilder()
+    first = builder.linked_results("2026-10-16", farm_id="farm-001", after=CURSOR)
+    second = builder.linked_results("2026-10-17", farm_id="farm-002", after=CURSOR_WITHOUT_MATCH[:2] + ("x",))
+    assert first.sql == second.sql
+    assert first.parameters != second.parameters
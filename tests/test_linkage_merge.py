@@ -0,0 +1,208 @@
+"""
+merge_linkage() and reads of the linkage table, run on the local DuckDB stand-in engine.
+
+The table must return exactly the links of the live join (and of
+client-side linkage), whatever the queried range, so readers get the
+same rows whether or not LinkageTableService.covers() the range.
+"""
+
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+duckdb = pytest.importorskip("duckdb")
+pa = pytest.importorskip("pyarrow")
+
+from config.settings import settings
+from infrastructure.databricks_client import DatabricksConnectionPool
+from infrastructure.local_sql_client import LocalSqlConnection
+from infrastructure.warehouse_retry import WarehouseRetrier
+from services.client_linkage import link_stage1_stage2, prepare_stage1_day, prepare_stage2_day
+from services.databricks_query_builder import DUCKDB_DIALECT, DatabricksQueryBuilder
+from services.linkage_table_service import LinkageTableService
+
+DAY = datetime(2026, 10, 16)
+
+
+def stage1_row(session_id: str, camera_id: str, ts: datetime, blk_file: str) -> dict:
+    key = ts.strftime("%Y-%m-%dT%H:%M:%S")
+    return {
+        "session_id": session_id,
+        "farm_id": "farm-001",
+        "camera_id": camera_id,
+        "processing_timestamp": ts,
+        "highest_probability_category": "lying",
+        "highest_probability_value": 0.9,
+        "should_forward": True,
+        "frame_uris": [f"gs://bucket/frames-to-analyze/{camera_id}/{blk_file}_{key}_{f}.jpg" for f in range(3)],
+    }
+
+
+def stage2_row(inference_id: str, camera_id: str, ts: datetime, blk_file: str, session_ts: datetime) -> dict:
+    file_name = f"{blk_file}_{session_ts:%Y-%m-%dT%H:%M:%S}.mp4"
+    return {
+        "inference_id": inference_id,
+        "camera_id": camera_id,
+        "inference_timestamp": ts,
+        "classification": "normal",
+        "max_probability_score": 0.8,
+        "should_forward": False,
+        "video_gcs_path": f"gs://bucket/video-to-analyze/{camera_id}/{file_name}",
+        "file_name": file_name,
+    }
+
+
+STAGE1 = [
+    stage1_row("s-linked", "cam-1", DAY + timedelta(hours=10), "001_0000001"),
+    # Its only match arrives 24.5 h later: inside the day query's Stage 2 window, outside the slack of the row
+    stage1_row("s-late", "cam-1", DAY + timedelta(hours=10), "001_0000002"),
+    stage1_row("s-multi", "cam-2", DAY + timedelta(hours=12), "002_0000001"),
+    stage1_row("s-pending", "cam-2", DAY + timedelta(days=1, hours=14), "002_0000002"),
+    # Moves the watermark so that DAY is covered
+    stage1_row("s-newest", "cam-3", DAY + timedelta(days=2, hours=12), "003_0000001"),
+]
+STAGE2 = [
+    stage2_row("inf-1", "cam-1", DAY + timedelta(hours=10, seconds=30), "001_0000001", DAY + timedelta(hours=10)),
+    stage2_row("inf-late", "cam-1", DAY + timedelta(days=1, hours=10, minutes=30), "001_0000002",
+               DAY + timedelta(hours=10)),
+    stage2_row("inf-2a", "cam-2", DAY + timedelta(hours=12, seconds=20), "002_0000001", DAY + timedelta(hours=12)),
+    stage2_row("inf-2b", "cam-2", DAY + timedelta(hours=12, seconds=40), "002_0000001", DAY + timedelta(hours=12)),
+]
+PENDING_STAGE2 = stage2_row(
+    "inf-pending", "cam-2", DAY + timedelta(days=1, hours=14, minutes=5), "002_0000002",
+    DAY + timedelta(days=1, hours=14),
+)
+
+
+def insert(database, table: str, rows: list) -> None:
+    database.register("arrivals", pa.Table.from_pylist(rows))
+    database.execute(f"INSERT INTO {table} SELECT * FROM arrivals")
+    database.unregister("arrivals")
+
+
+@pytest.fixture
+def warehouse(pinned_settings, monkeypatch):
+    """DuckDB database with the Stage 1 and Stage 2 tables, and a LinkageTableService over it."""
+    monkeypatch.setattr(settings, "linkage_backfill_days", 3)
+    monkeypatch.setattr(settings, "linkage_merge_lookback_hours", 24.0)
+    monkeypatch.setattr(settings, "linkage_coverage_ttl", 0.0)
+    
+    database = duckdb.connect()
+    database.execute(f"ATTACH ':memory:' AS {settings.catalog_name}")
+    database.execute(f"CREATE SCHEMA {settings.catalog_name}.{settings.schema_name}")
+    for table, rows in ((settings.full_stage1_table, STAGE1), (settings.full_stage2_table, STAGE2)):
+        database.register("arrivals", pa.Table.from_pylist(rows))
+        database.execute(f"CREATE TABLE {table} AS SELECT * FROM arrivals")
+        database.unregister("arrivals")
+    
+    builder = DatabricksQueryBuilder(dialect=DUCKDB_DIALECT)
+    tables = LinkageTableService(
+        pool=DatabricksConnectionPool(connection_factory=lambda: LocalSqlConnection(database)),
+        retrier=WarehouseRetrier(),
+        builder=builder,
+    )
+    yield database, builder, tables
+    tables.pool.close_all()
+    database.close()
+
+
+def linked_keys(database, query) -> list:
+    """(session_id, stage2_inference_id) of the result rows, in order."""
+    with LocalSqlConnection(database).cursor() as cursor:
+        return [(row[0], row[8]) for row in cursor.execute(query.sql, query.parameters).fetchall()]
+
+
+def table_keys(database) -> set:
+    return set(database.execute(
+        f"SELECT session_id, stage2_inference_id FROM {settings.full_linkage_table}"
+    ).fetchall())
+
+
+@pytest.mark.parametrize("filters", [
+    dict(date_str="2026-10-16"),
+    dict(date_str="2026-10-16", start_time="09:00", end_time="10:00"),
+    dict(date_str="2026-10-16", camera_id="cam-1"),
+    dict(date_str="2026-10-16", after=(DAY + timedelta(hours=12), "s-multi", "inf-2b")),
+], ids=["day", "time-range", "camera", "cursor"])
+def test_table_reads_match_the_live_join(warehouse, filters):
+    database, builder, tables = warehouse
+    tables.merge(now=DAY + timedelta(days=3))
+    
+    range_start, range_end, _, _ = builder.linked_time_ranges(
+        filters["date_str"], filters.get("start_time"), filters.get("end_time")
+    )
+    assert tables.covers(range_start, range_end)
+    live = linked_keys(database, builder.linked_results(**filters, limit=100))
+    from_table = linked_keys(database, builder.linked_results_from_table(**filters, limit=100))
+    assert live == from_table
+
+
+def test_stage2_outside_the_slack_of_its_row_is_not_linked(warehouse):
+    database, builder, tables = warehouse
+    tables.merge(now=DAY + timedelta(days=3))
+    
+    assert linked_keys(database, builder.linked_results_from_table("2026-10-16", limit=100)) == [
+        ("s-multi", "inf-2b"),
+        ("s-multi", "inf-2a"),
+        ("s-linked", "inf-1"),
+        ("s-late", None),
+    ]
+    assert ("s-late", "inf-late") not in table_keys(database)
+
+
+def test_incremental_merge_replaces_the_unmatched_row(warehouse):
+    database, builder, tables = warehouse
+    first = tables.merge(now=DAY + timedelta(days=3))
+    assert first["window_start"] == DAY
+    assert ("s-pending", None) in table_keys(database)
+    
+    insert(database, settings.full_stage2_table, [PENDING_STAGE2])
+    second = tables.merge()
+    
+    # The lookback before the watermark is merged again
+    assert second["window_start"] == DAY + timedelta(days=1, hours=12)
+    keys = table_keys(database)
+    assert ("s-pending", "inf-pending") in keys
+    assert ("s-pending", None) not in keys
+    # Rows before the merge window are left alone
+    assert {("s-linked", "inf-1"), ("s-late", None), ("s-multi", "inf-2a"), ("s-multi", "inf-2b")} <= keys
+    assert linked_keys(database, builder.linked_results("2026-10-17", limit=100)) == linked_keys(
+        database, builder.linked_results_from_table("2026-10-17", limit=100)
+    )
+
+
+def test_merge_is_idempotent(warehouse):
+    database, _, tables = warehouse
+    tables.merge(now=DAY + timedelta(days=3))
+    before = table_keys(database)
+    tables.merge()
+    assert table_keys(database) == before
+
+
+@pytest.mark.parametrize("start_time, end_time", [(None, None), ("09:00", "10:00")])
+def test_client_linkage_matches_the_live_join(warehouse, start_time, end_time):
+    database, builder, _ = warehouse
+    connection = LocalSqlConnection(database)
+    
+    def fetch(query):
+        with connection.cursor() as cursor:
+            return cursor.execute(query.sql, query.parameters).fetchall_arrow().to_pandas()
+    
+    range_start, range_end, stage2_start, stage2_end = builder.linked_time_ranges("2026-10-16", start_time, end_time)
+    stage1 = prepare_stage1_day(fetch(builder.stage1_day("2026-10-16")))
+    stage2 = prepare_stage2_day(pa.concat_tables([
+        connection.cursor().execute(query.sql, query.parameters).fetchall_arrow()
+        for query in (builder.stage2_day(day) for day in ("2026-10-15", "2026-10-16", "2026-10-17"))
+    ]).to_pandas())
+    
+    linked = link_stage1_stage2(
+        stage1, stage2, range_start, range_end, stage2_start, stage2_end,
+        timedelta(hours=settings.stage2_window_slack_hours), limit=100,
+    )
+    client = [
+        (session_id, None if pd.isna(inference_id) else inference_id)
+        for session_id, inference_id in zip(linked["session_id"], linked["stage2_inference_id"])
+    ]
+    live = linked_keys(database, builder.linked_results("2026-10-16", start_time, end_time, limit=100))
+    assert client == live
@@ -9,14 +9,25 @@ if str(_parent) not in sys.path:
     sys.path.insert(0, str(_parent))
 
 from ui.components import create_app
-from ui.handlers import run_query, get_row_details, load_filters, update_cameras_on_farm_change
+from ui.handlers import (
+    run_query,
+    run_query_async,
+    get_row_details,
+    load_filters,
+    load_filters_async,
+    update_cameras_on_farm_change,
+    update_cameras_on_farm_change_async,
+)
 from ui.formatters import format_results_for_display
 
 __all__ = [
     "create_app",
     "run_query",
+    "run_query_async",
     "get_row_details",
     "load_filters",
+    "load_filters_async",
     "update_cameras_on_farm_change",
+    "update_cameras_on_farm_change_async",
     "format_results_for_display",
 ]
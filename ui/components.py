@@ -4,7 +4,17 @@ from datetime import datetime
 
 import gradio as gr
 
-from ui.handlers import run_query, get_row_details, load_filters, update_cameras_on_farm_change, update_farms_on_tenant_change
+from ui.handlers import (
+    end_session,
+    get_row_details,
+    load_filters_async,
+    next_page_async,
+    prev_page_async,
+    run_query_async,
+    search_cameras_async,
+    update_cameras_on_farm_change_async,
+    update_farms_on_tenant_change_async,
+)
 
 
 def create_app() -> gr.Blocks:
@@ -36,6 +46,12 @@ def create_app() -> gr.Blocks:
                     value=today,
                     placeholder="2026-01-14"
                 )
+            with gr.Column(scale=1):
+                end_date_picker = gr.Textbox(
+                    label="📅 End Date (optional)",
+                    value="",
+                    placeholder="e.g. 2026-01-20 (leave empty for one day)"
+                )
             with gr.Column(scale=1):
                 start_time = gr.Textbox(
                     label="🕐 Start Time (HH:MM)",
@@ -71,6 +87,11 @@ def create_app() -> gr.Blocks:
                     value="All",
                     interactive=True
                 )
+                camera_search = gr.Textbox(
+                    label="🔎 Find Camera",
+                    value="",
+                    placeholder="Type part of a camera name"
+                )
         
         with gr.Row():
             with gr.Column(scale=1):
@@ -100,6 +121,15 @@ def create_app() -> gr.Blocks:
             elem_classes=["results-table"]
         )
         
+        with gr.Row():
+            prev_page_btn = gr.Button("◀ Previous", variant="secondary")
+            next_page_btn = gr.Button("Next ▶", variant="secondary")
+        
+        # Per-session pagination cursor (query filters + page tokens)
+        page_state = gr.State(None)
+        # Per-session shown rows and row details cache (ui.state.AppState)
+        results_state = gr.State(None)
+        
         # =====================================================================
         # Media Display Section
         # =====================================================================
@@ -146,39 +176,63 @@ def create_app() -> gr.Blocks:
         
         # Load filters button
         load_filters_btn.click(
-            fn=load_filters,
-            inputs=[date_picker],
+            fn=load_filters_async,
+            inputs=[date_picker, end_date_picker],
             outputs=[tenant_dropdown, farm_dropdown, camera_dropdown, status_text]
         )
         
         # Update farms when tenant changes
         tenant_dropdown.change(
-            fn=update_farms_on_tenant_change,
-            inputs=[date_picker, tenant_dropdown],
+            fn=update_farms_on_tenant_change_async,
+            inputs=[date_picker, end_date_picker, tenant_dropdown],
             outputs=[farm_dropdown, camera_dropdown]
         )
         
         # Update cameras when farm changes
         farm_dropdown.change(
-            fn=update_cameras_on_farm_change,
-            inputs=[date_picker, farm_dropdown],
+            fn=update_cameras_on_farm_change_async,
+            inputs=[date_picker, end_date_picker, farm_dropdown],
             outputs=[camera_dropdown]
         )
         
+        # Filter cameras by name as the user types (in-memory over the cached cameras of the dates)
+        camera_search.input(
+            fn=search_cameras_async,
+            inputs=[camera_search, date_picker, end_date_picker, tenant_dropdown, farm_dropdown, camera_dropdown],
+            outputs=[camera_dropdown],
+            trigger_mode="always_last"
+        )
+        
         # Run query button
         query_btn.click(
-            fn=run_query,
-            inputs=[date_picker, start_time, end_time, tenant_dropdown, farm_dropdown, camera_dropdown, 
+            fn=run_query_async,
+            inputs=[date_picker, end_date_picker, start_time, end_time, tenant_dropdown, farm_dropdown, camera_dropdown, 
                     forward_only],
-            outputs=[results_table, status_text]
+            outputs=[results_table, status_text, page_state, results_state]
+        )
+        
+        # Pagination
+        next_page_btn.click(
+            fn=next_page_async,
+            inputs=[page_state, results_state],
+            outputs=[results_table, status_text, page_state, results_state]
+        )
+        prev_page_btn.click(
+            fn=prev_page_async,
+            inputs=[page_state, results_state],
+            outputs=[results_table, status_text, page_state, results_state]
         )
         
         # Row selection - show frame and video
         results_table.select(
             fn=get_row_details,
+            inputs=[results_state],
             outputs=[frame_display, video_display, details_display]
         )
         
+        # Cancel the session's running queries when the browser tab closes
+        app.unload(end_session)
+        
         # =====================================================================
         # Footer
         # =====================================================================
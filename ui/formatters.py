@@ -26,8 +26,10 @@ def format_results_for_display(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         return df
     
-    camera_mapping = databricks_mapping_service.get_camera_mapping()
-    farm_mapping = databricks_mapping_service.get_farm_mapping()
+    # One snapshot, so a background reload can't mix old and new mappings
+    mappings = databricks_mapping_service.snapshot()
+    camera_mapping = mappings.camera
+    farm_mapping = mappings.farm
     
     # Create a copy to work with
     result = df.copy()
@@ -77,4 +79,7 @@ def format_results_for_display(df: pd.DataFrame) -> pd.DataFrame:
         if col in result.columns:
             result[col] = result[col].apply(lambda x: "N/A" if pd.isna(x) else ("✓" if x else "✗"))
     
+    # Remaining nulls (e.g. S2 Class without Stage 2; Arrow-backed columns hold pd.NA)
+    result = result.astype(object).where(result.notna(), "N/A")
+    
     return result
@@ -1,9 +1,10 @@
 """Event handlers for Gradio UI interactions."""
 
+import asyncio
 import json
 import sys
 from pathlib import Path
-from typing import Any, Optional, Tuple
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
 
 import gradio as gr
 import pandas as pd
@@ -13,10 +14,13 @@ _parent = Path(__file__).resolve().parent.parent
 if str(_parent) not in sys.path:
     sys.path.insert(0, str(_parent))
 
+from config.settings import settings
+from infrastructure.query_cancellation import QueryCancelledError, in_flight_queries
 from services import query_service, media_service
+from services.async_query_service import async_query_service
 from services.databricks_mapping_service import databricks_mapping_service
 from ui.formatters import format_results_for_display
-from ui.state import app_state
+from ui.state import AppState
 
 
 def _extract_dropdown_value(value: Any) -> Optional[str]:
@@ -44,80 +48,255 @@ def _extract_dropdown_value(value: Any) -> Optional[str]:
     return actual_str
 
 
-def load_filters(date_str: str) -> Tuple[gr.Dropdown, gr.Dropdown, gr.Dropdown, str]:
+# In-flight query slots per UI session; a new request cancels the running one in its slot
+_RESULTS = "results"  # Run Query and page changes
+_FILTERS = "filters"  # Load Farms/Cameras (a new date also supersedes the running results query)
+_DROPDOWNS = "dropdowns"  # Tenant/farm cascades
+_SEARCH = "search"  # Camera name search
+
+
+def _session_id(request: Optional[gr.Request]) -> Optional[str]:
+    """Gradio session hash of the request, or None outside a UI session."""
+    return getattr(request, 'session_hash', None)
+
+
+def end_session(request: gr.Request) -> None:
+    """Cancel the session's running queries when its browser tab disconnects."""
+    cancelled = in_flight_queries.cancel_session(_session_id(request))
+    if cancelled:
+        print(f"Session closed: cancelled {cancelled} running request(s)")
+
+
+def _end_date(end_date: Optional[str]) -> Optional[str]:
+    """Normalize the optional end date input; empty means a single day."""
+    return end_date.strip() if end_date and end_date.strip() else None
+
+
+def _date_label(date_str: str, end_date: Optional[str]) -> str:
+    """Display a single date or a date range."""
+    return f"{date_str} → {end_date}" if end_date and end_date != date_str else date_str
+
+
+def _filters_result(
+    date_str: str,
+    end_date: Optional[str],
+    tenants: List[Tuple[str, str]],
+    farms: List[Tuple[str, str]],
+    cameras: List[Tuple[str, str]]
+) -> Tuple[gr.Dropdown, gr.Dropdown, gr.Dropdown, str]:
+    """Build the dropdown updates and status message for load_filters."""
+    return (
+        gr.Dropdown(choices=tenants, value="All"),
+        gr.Dropdown(choices=farms, value="All"),
+        gr.Dropdown(choices=cameras, value="All"),
+        f"Loaded {len(tenants)-1} tenants, {len(farms)-1} farms, {len(cameras)-1} cameras "
+        f"for {_date_label(date_str, end_date)}"
+    )
+
+
+def load_filters(
+    date_str: str,
+    end_date: str = "",
+    request: Optional[gr.Request] = None
+) -> Tuple[gr.Dropdown, gr.Dropdown, gr.Dropdown, str]:
     """
-    Load available tenants, farms, and cameras for a given date.
+    Load available tenants, farms, and cameras for a given date or date range.
     
     Args:
-        date_str: Date in YYYY-MM-DD format.
+        date_str: Date (or first date of the range) in YYYY-MM-DD format.
+        end_date: Optional last date of the range; empty for a single day.
+        request: Gradio request; identifies the session whose older queries are cancelled.
         
     Returns:
         Tuple of (tenants_dropdown, farms_dropdown, cameras_dropdown, status_message)
     """
-    tenants = query_service.get_available_tenants(date_str)
-    farms = query_service.get_available_farms(date_str)
-    cameras = query_service.get_available_cameras(date_str)
+    end_date = _end_date(end_date)
+    with in_flight_queries.track(_session_id(request), _FILTERS, supersedes=(_RESULTS,)) as token:
+        tenants, farms, cameras = query_service.get_filter_options(date_str, cancel_token=token, end_date=end_date)
+    return _filters_result(date_str, end_date, tenants, farms, cameras)
+
+
+async def load_filters_async(
+    date_str: str,
+    end_date: str = "",
+    request: Optional[gr.Request] = None
+) -> Tuple[gr.Dropdown, gr.Dropdown, gr.Dropdown, str]:
+    """Async version of load_filters."""
+    end_date = _end_date(end_date)
+    with in_flight_queries.track(_session_id(request), _FILTERS, supersedes=(_RESULTS,)) as token:
+        tenants, farms, cameras = await async_query_service.get_filter_options(date_str, end_date, cancel_token=token)
+    return _filters_result(date_str, end_date, tenants, farms, cameras)
+
+
+def update_farms_on_tenant_change(
+    date_str: str,
+    end_date: str,
+    tenant_id: str,
+    request: Optional[gr.Request] = None
+) -> Tuple[gr.Dropdown, gr.Dropdown]:
+    """Update farm and camera dropdowns when tenant selection changes."""
+    actual_tenant_id = _extract_dropdown_value(tenant_id)
+    end_date = _end_date(end_date)
+    with in_flight_queries.track(_session_id(request), _DROPDOWNS) as token:
+        farms = query_service.get_available_farms(date_str, actual_tenant_id, cancel_token=token, end_date=end_date)
+        cameras = query_service.get_available_cameras(date_str, cancel_token=token, end_date=end_date)
     return (
-        gr.Dropdown(choices=tenants, value="All"),
         gr.Dropdown(choices=farms, value="All"),
         gr.Dropdown(choices=cameras, value="All"),
-        f"Loaded {len(tenants)-1} tenants, {len(farms)-1} farms, {len(cameras)-1} cameras for {date_str}"
     )
 
 
-def update_farms_on_tenant_change(date_str: str, tenant_id: str) -> Tuple[gr.Dropdown, gr.Dropdown]:
-    """Update farm and camera dropdowns when tenant selection changes."""
+async def update_farms_on_tenant_change_async(
+    date_str: str,
+    end_date: str,
+    tenant_id: str,
+    request: Optional[gr.Request] = None
+) -> Tuple[gr.Dropdown, gr.Dropdown]:
+    """Async version of update_farms_on_tenant_change."""
     actual_tenant_id = _extract_dropdown_value(tenant_id)
-    farms = query_service.get_available_farms(date_str, actual_tenant_id)
-    cameras = query_service.get_available_cameras(date_str)
+    end_date = _end_date(end_date)
+    with in_flight_queries.track(_session_id(request), _DROPDOWNS) as token:
+        farms, cameras = await asyncio.gather(
+            async_query_service.get_available_farms(date_str, actual_tenant_id, end_date, cancel_token=token),
+            async_query_service.get_available_cameras(date_str, end_date=end_date, cancel_token=token),
+        )
     return (
         gr.Dropdown(choices=farms, value="All"),
         gr.Dropdown(choices=cameras, value="All"),
     )
 
 
-def update_cameras_on_farm_change(date_str: str, farm_id: str) -> gr.Dropdown:
+def update_cameras_on_farm_change(
+    date_str: str,
+    end_date: str,
+    farm_id: str,
+    request: Optional[gr.Request] = None
+) -> gr.Dropdown:
     """
     Update camera dropdown when farm selection changes.
     
     Args:
-        date_str: Date in YYYY-MM-DD format.
+        date_str: Date (or first date of the range) in YYYY-MM-DD format.
+        end_date: Optional last date of the range; empty for a single day.
         farm_id: Selected farm ID.
+        request: Gradio request; identifies the session whose older queries are cancelled.
         
     Returns:
         Updated cameras dropdown.
     """
     actual_farm_id = _extract_dropdown_value(farm_id)
-    cameras = query_service.get_available_cameras(date_str, actual_farm_id)
+    with in_flight_queries.track(_session_id(request), _DROPDOWNS) as token:
+        cameras = query_service.get_available_cameras(
+            date_str, actual_farm_id, cancel_token=token, end_date=_end_date(end_date)
+        )
     return gr.Dropdown(choices=cameras, value="All")
 
 
-def run_query(
+async def update_cameras_on_farm_change_async(
     date_str: str,
-    start_time: str,
-    end_time: str,
+    end_date: str,
+    farm_id: str,
+    request: Optional[gr.Request] = None
+) -> gr.Dropdown:
+    """Async version of update_cameras_on_farm_change."""
+    actual_farm_id = _extract_dropdown_value(farm_id)
+    with in_flight_queries.track(_session_id(request), _DROPDOWNS) as token:
+        cameras = await async_query_service.get_available_cameras(
+            date_str, actual_farm_id, _end_date(end_date), cancel_token=token
+        )
+    return gr.Dropdown(choices=cameras, value="All")
+
+
+def _search_result(cameras: List[Tuple[str, str]], camera_id: str) -> gr.Dropdown:
+    """Camera dropdown of the search matches, keeping the selected camera if it is still among them."""
+    selected = _extract_dropdown_value(camera_id)
+    value = selected if selected in {match_id for _, match_id in cameras} else "All"
+    return gr.Dropdown(choices=[("All", "All")] + cameras, value=value)
+
+
+def search_cameras(
+    query: str,
+    date_str: str,
+    end_date: str,
     tenant_id: str,
     farm_id: str,
     camera_id: str,
-    should_forward_only: bool
-) -> Tuple[pd.DataFrame, str]:
+    request: Optional[gr.Request] = None
+) -> gr.Dropdown:
     """
-    Run the query and return formatted results.
+    Typeahead for the camera dropdown, within the selected farm or tenant.
+    
+    Only cameras with data on the selected date(s) are offered, as in the
+    dropdown itself. Names are matched in the in-memory mapping indexes and
+    the cameras per date come from the cached filter query, so typing
+    normally never waits on the warehouse. An empty query leaves the
+    dropdown as it is.
     
     Args:
-        date_str: Date in YYYY-MM-DD format.
-        start_time: Optional start time filter.
-        end_time: Optional end time filter.
-        farm_id: Optional farm ID filter.
-        camera_id: Optional camera ID filter.
-        should_forward_only: If True, only return forwarded events.
+        query: Text typed into the camera search box.
+        date_str: Date (or first date of the range) in YYYY-MM-DD format.
+        end_date: Optional last date of the range; empty for a single day.
+        tenant_id: Selected tenant ID.
+        farm_id: Selected farm ID.
+        camera_id: Selected camera ID; kept if it still matches.
+        request: Gradio request; identifies the session whose older queries are cancelled.
         
     Returns:
-        Tuple of (formatted_dataframe, status_message)
+        Updated cameras dropdown.
     """
-    camera_mapping = databricks_mapping_service.get_camera_mapping()
-    farm_mapping = databricks_mapping_service.get_farm_mapping()
-    
+    if not query or not query.strip():
+        return gr.update()
+    try:
+        with in_flight_queries.track(_session_id(request), _SEARCH) as token:
+            cameras = query_service.search_available_cameras(
+                date_str, query, _extract_dropdown_value(tenant_id), _extract_dropdown_value(farm_id),
+                cancel_token=token, end_date=_end_date(end_date),
+            )
+    except QueryCancelledError:
+        return gr.update()
+    except Exception as e:
+        print(f"Error searching cameras: {e}")
+        return gr.update()
+    return _search_result(cameras, camera_id)
+
+
+async def search_cameras_async(
+    query: str,
+    date_str: str,
+    end_date: str,
+    tenant_id: str,
+    farm_id: str,
+    camera_id: str,
+    request: Optional[gr.Request] = None
+) -> gr.Dropdown:
+    """Async version of search_cameras."""
+    if not query or not query.strip():
+        return gr.update()
+    try:
+        with in_flight_queries.track(_session_id(request), _SEARCH) as token:
+            cameras = await async_query_service.search_available_cameras(
+                date_str, query, _extract_dropdown_value(tenant_id), _extract_dropdown_value(farm_id),
+                _end_date(end_date), cancel_token=token,
+            )
+    except QueryCancelledError:
+        return gr.update()
+    except Exception as e:
+        print(f"Error searching cameras: {e}")
+        return gr.update()
+    return _search_result(cameras, camera_id)
+
+
+def _query_filters(
+    date_str: str,
+    end_date: str,
+    start_time: str,
+    end_time: str,
+    tenant_id: str,
+    farm_id: str,
+    camera_id: str,
+    should_forward_only: bool
+) -> Dict[str, Any]:
+    """Normalize raw UI inputs into iter_stage1_stage2_linked keyword arguments."""
     actual_tenant_id = _extract_dropdown_value(tenant_id)
     actual_farm_id = _extract_dropdown_value(farm_id)
     actual_camera_id = _extract_dropdown_value(camera_id)
@@ -126,69 +305,324 @@ def run_query(
     print(f"DEBUG run_query: farm_id={farm_id!r} -> {actual_farm_id!r}")
     print(f"DEBUG run_query: camera_id={camera_id!r} -> {actual_camera_id!r}")
     
-    try:
-        df = query_service.query_stage1_stage2_linked(
-            date_str=date_str,
-            start_time=start_time.strip() if start_time.strip() else None,
-            end_time=end_time.strip() if end_time.strip() else None,
-            tenant_id=actual_tenant_id,
-            farm_id=actual_farm_id,
-            camera_id=actual_camera_id,
-            should_forward_only=should_forward_only,
-            limit=100
-        )
+    return dict(
+        date_str=date_str,
+        end_date=_end_date(end_date),
+        start_time=start_time.strip() if start_time.strip() else None,
+        end_time=end_time.strip() if end_time.strip() else None,
+        tenant_id=actual_tenant_id,
+        farm_id=actual_farm_id,
+        camera_id=actual_camera_id,
+        should_forward_only=should_forward_only
+    )
+
+
+def _filter_summary(filters: Dict[str, Any]) -> str:
+    """Human-readable summary of the active query filters."""
+    mappings = databricks_mapping_service.snapshot()
+    camera_mapping = mappings.camera
+    farm_mapping = mappings.farm
+    
+    filter_parts = [f"Date: {_date_label(filters['date_str'], filters['end_date'])}"]
+    if filters['start_time']:
+        filter_parts.append(f"From: {filters['start_time']}")
+    if filters['end_time']:
+        filter_parts.append(f"To: {filters['end_time']}")
+    if filters['tenant_id']:
+        tenant_display = mappings.tenant.get(filters['tenant_id'], {}).get('name', filters['tenant_id'])
+        filter_parts.append(f"Tenant: {tenant_display}")
+    if filters['farm_id']:
+        farm_info = farm_mapping.get(filters['farm_id'], {})
+        farm_display = farm_info.get('name', filters['farm_id'])
+        filter_parts.append(f"Farm: {farm_display}")
+    if filters['camera_id']:
+        camera_info = camera_mapping.get(filters['camera_id'], {})
+        camera_display = camera_info.get('name', filters['camera_id'])
+        filter_parts.append(f"Camera: {camera_display}")
+    return " | ".join(filter_parts)
+
+
+def _new_page_state(filters: Dict[str, Any]) -> Dict[str, Any]:
+    """Per-session pagination cursor: the query filters and the token of each page reached so far."""
+    return {'filters': filters, 'tokens': [None], 'page': 0}
+
+
+def _with_next_token(page_state: Dict[str, Any], page: int, next_token: Optional[str]) -> Dict[str, Any]:
+    """Move the cursor to `page`, record the following page's token and prefetch that page."""
+    tokens = page_state['tokens'][:page + 1]
+    if next_token:
+        tokens.append(next_token)
+        query_service.prefetch_linked_page(**page_state['filters'], page_token=next_token)
+    return {**page_state, 'tokens': tokens, 'page': page}
+
+
+def _page_status(page_state: Dict[str, Any], row_count: int, filter_summary: str) -> str:
+    """Status line for a shown results page."""
+    page = page_state['page']
+    first = page * settings.results_page_size + 1
+    status = f"Page {page + 1}: results {first}-{first + row_count - 1}"
+    if len(page_state['tokens']) > page + 1:
+        status += " (more on the next page)"
+    return f"{status} | {filter_summary}"
+
+
+class _StreamingResults:
+    """Accumulates streamed result chunks of the first page for the results table."""
+    
+    def __init__(self, filters: Dict[str, Any]):
+        self.filter_summary = _filter_summary(filters)
+        self.page_state = _new_page_state(filters)
+        # New query results start with an empty row cache
+        self.app_state = AppState()
+        self._chunks: List[pd.DataFrame] = []
+        self._display_chunks: List[pd.DataFrame] = []
+        self.row_count = 0
+    
+    def add(self, chunk: pd.DataFrame) -> Tuple[pd.DataFrame, str, Dict[str, Any], AppState]:
+        """Append a chunk; returns the updated table, a progress status, the page state and the session state."""
+        self._chunks.append(chunk)
+        # Only the new rows are formatted; earlier chunks are already formatted
+        self._display_chunks.append(format_results_for_display(chunk))
+        self.row_count += len(chunk)
         
-        # Store in app state for row selection
-        app_state.query_results = df
+        # Store in the session state for row selection
+        self.app_state.query_results = pd.concat(self._chunks, ignore_index=True)
+        display_df = pd.concat(self._display_chunks, ignore_index=True)
+        return (
+            display_df,
+            f"Loading... {self.row_count} results so far | {self.filter_summary}",
+            self.page_state,
+            self.app_state,
+        )
+    
+    def finish(self) -> Tuple[pd.DataFrame, str, Dict[str, Any], AppState]:
+        """Final table, status, page state and session state once the stream is exhausted."""
+        if self.row_count == 0:
+            return pd.DataFrame(), f"No results found. Filters: {self.filter_summary}", self.page_state, self.app_state
         
-        filter_parts = [f"Date: {date_str}"]
-        if start_time.strip():
-            filter_parts.append(f"From: {start_time}")
-        if end_time.strip():
-            filter_parts.append(f"To: {end_time}")
-        if actual_tenant_id:
-            tenant_display = databricks_mapping_service.get_tenant_display_name(actual_tenant_id)
-            filter_parts.append(f"Tenant: {tenant_display}")
-        if actual_farm_id:
-            farm_info = farm_mapping.get(actual_farm_id, {})
-            farm_display = farm_info.get('name', actual_farm_id)
-            filter_parts.append(f"Farm: {farm_display}")
-        if actual_camera_id:
-            camera_info = camera_mapping.get(actual_camera_id, {})
-            camera_display = camera_info.get('name', actual_camera_id)
-            filter_parts.append(f"Camera: {camera_display}")
-        filter_summary = " | ".join(filter_parts)
+        next_token = query_service.next_page_token(self.app_state.query_results, settings.results_page_size)
+        self.page_state = _with_next_token(self.page_state, 0, next_token)
         
-        if df.empty:
-            return pd.DataFrame(), f"No results found. Filters: {filter_summary}"
+        display_df = pd.concat(self._display_chunks, ignore_index=True)
+        print(f"DEBUG run_query: display_df shape={display_df.shape}, columns={list(display_df.columns)}")
+        status = _page_status(self.page_state, self.row_count, self.filter_summary)
+        return display_df, status, self.page_state, self.app_state
+
+
+def run_query(
+    date_str: str,
+    end_date: str,
+    start_time: str,
+    end_time: str,
+    tenant_id: str,
+    farm_id: str,
+    camera_id: str,
+    should_forward_only: bool,
+    request: Optional[gr.Request] = None
+) -> Iterator[Tuple[pd.DataFrame, str, Dict[str, Any], AppState]]:
+    """
+    Run the query and stream the first page of formatted results into the table.
+    
+    Yields the table after each fetched chunk, so the first rows appear
+    before the whole page has been fetched. A date range shows the
+    newest day first and adds older days as their queries finish.
+    Later pages are loaded with next_page() / prev_page(). A newer request
+    from the same session cancels this one; it then stops without output.
+    
+    Args:
+        date_str: Date (or first date of the range) in YYYY-MM-DD format.
+        end_date: Optional last date of the range; empty for a single day.
+        start_time: Optional start time filter.
+        end_time: Optional end time filter.
+        farm_id: Optional farm ID filter.
+        camera_id: Optional camera ID filter.
+        should_forward_only: If True, only return forwarded events.
+        request: Gradio request; identifies the session whose older queries are cancelled.
         
-        # Clear row cache when new query results are loaded
-        app_state.row_cache.clear()
-        app_state.last_selected_row = None
+    Yields:
+        Tuples of (formatted_dataframe, status_message, page_state, app_state)
+    """
+    filters = _query_filters(
+        date_str, end_date, start_time, end_time, tenant_id, farm_id, camera_id, should_forward_only
+    )
+    results = _StreamingResults(filters)
+    
+    try:
+        with in_flight_queries.track(_session_id(request), _RESULTS) as token:
+            for chunk in query_service.iter_stage1_stage2_linked(
+                **filters, max_rows=settings.results_page_size, cancel_token=token
+            ):
+                yield results.add(chunk)
+        yield results.finish()
         
-        display_df = format_results_for_display(df)
-        print(f"DEBUG run_query: display_df shape={display_df.shape}, columns={list(display_df.columns)}")
-        status = f"Found {len(df)} results | {filter_summary}"
+    except QueryCancelledError:
+        return  # Superseded; the newer request owns the table
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        yield pd.DataFrame(), f"Error: {str(e)}", results.page_state, results.app_state
+
+
+async def run_query_async(
+    date_str: str,
+    end_date: str,
+    start_time: str,
+    end_time: str,
+    tenant_id: str,
+    farm_id: str,
+    camera_id: str,
+    should_forward_only: bool,
+    request: Optional[gr.Request] = None
+) -> AsyncIterator[Tuple[pd.DataFrame, str, Dict[str, Any], AppState]]:
+    """Async version of run_query; fetches do not hold a worker thread between chunks."""
+    filters = _query_filters(
+        date_str, end_date, start_time, end_time, tenant_id, farm_id, camera_id, should_forward_only
+    )
+    results = _StreamingResults(filters)
+    
+    try:
+        with in_flight_queries.track(_session_id(request), _RESULTS) as token:
+            async for chunk in async_query_service.iter_stage1_stage2_linked(
+                **filters, max_rows=settings.results_page_size, cancel_token=token
+            ):
+                yield results.add(chunk)
+        yield results.finish()
         
-        return display_df, status
+    except QueryCancelledError:
+        return  # Superseded; the newer request owns the table
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        yield pd.DataFrame(), f"Error: {str(e)}", results.page_state, results.app_state
+
+
+def _target_page(page_state: Optional[Dict[str, Any]], step: int) -> Tuple[Optional[int], str]:
+    """Index of the page `step` pages away from the current one, or None and why it can't be shown."""
+    if not page_state:
+        return None, "Run a query first"
+    page = page_state['page'] + step
+    if page < 0:
+        return None, "Already on the first page"
+    if page >= len(page_state['tokens']):
+        return None, "No more results"
+    return page, ""
+
+
+def _show_page(
+    page_state: Dict[str, Any],
+    page: int,
+    df: pd.DataFrame,
+    next_token: Optional[str]
+) -> Tuple[pd.DataFrame, str, Dict[str, Any], AppState]:
+    """Show a fetched page in the results table and move the cursor to it."""
+    page_state = _with_next_token(page_state, page, next_token)
+    
+    # Row selection indexes into the page being shown
+    app_state = AppState(query_results=df)
+    
+    filter_summary = _filter_summary(page_state['filters'])
+    if df.empty:
+        return pd.DataFrame(), f"No more results. Filters: {filter_summary}", page_state, app_state
+    return format_results_for_display(df), _page_status(page_state, len(df), filter_summary), page_state, app_state
+
+
+def change_page(
+    page_state: Optional[Dict[str, Any]],
+    app_state: Optional[AppState],
+    step: int,
+    request: Optional[gr.Request] = None
+) -> Tuple[Any, str, Optional[Dict[str, Any]], Optional[AppState]]:
+    """
+    Show the page `step` pages away from the current one (1 = next, -1 = previous).
+    
+    Pages are fetched by keyset seek from the token stored for them; the
+    next page was usually prefetched, so it comes from the result cache.
+    
+    Args:
+        page_state: The session's pagination cursor (gr.State).
+        app_state: The session's shown results (gr.State); kept if the page can't be shown.
+        step: Number of pages to move.
+        request: Gradio request; identifies the session whose older queries are cancelled.
         
+    Returns:
+        Tuple of (formatted_dataframe, status_message, page_state, app_state)
+    """
+    page, message = _target_page(page_state, step)
+    if page is None:
+        return gr.update(), message, page_state, app_state
+    
+    try:
+        with in_flight_queries.track(_session_id(request), _RESULTS) as token:
+            df, next_token = query_service.query_linked_page(
+                **page_state['filters'], page_token=page_state['tokens'][page], cancel_token=token
+            )
+        return _show_page(page_state, page, df, next_token)
+    except QueryCancelledError:
+        return gr.update(), gr.update(), page_state, app_state
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return gr.update(), f"Error: {str(e)}", page_state, app_state
+
+
+async def change_page_async(
+    page_state: Optional[Dict[str, Any]],
+    app_state: Optional[AppState],
+    step: int,
+    request: Optional[gr.Request] = None
+) -> Tuple[Any, str, Optional[Dict[str, Any]], Optional[AppState]]:
+    """Async version of change_page."""
+    page, message = _target_page(page_state, step)
+    if page is None:
+        return gr.update(), message, page_state, app_state
+    
+    try:
+        with in_flight_queries.track(_session_id(request), _RESULTS) as token:
+            df, next_token = await async_query_service.query_linked_page(
+                **page_state['filters'], page_token=page_state['tokens'][page], cancel_token=token
+            )
+        return _show_page(page_state, page, df, next_token)
+    except QueryCancelledError:
+        return gr.update(), gr.update(), page_state, app_state
     except Exception as e:
         import traceback
         traceback.print_exc()
-        return pd.DataFrame(), f"Error: {str(e)}"
+        return gr.update(), f"Error: {str(e)}", page_state, app_state
+
+
+async def next_page_async(
+    page_state: Optional[Dict[str, Any]],
+    app_state: Optional[AppState],
+    request: Optional[gr.Request] = None
+) -> Tuple[Any, str, Optional[Dict[str, Any]], Optional[AppState]]:
+    """Show the next results page."""
+    return await change_page_async(page_state, app_state, 1, request)
+
 
+async def prev_page_async(
+    page_state: Optional[Dict[str, Any]],
+    app_state: Optional[AppState],
+    request: Optional[gr.Request] = None
+) -> Tuple[Any, str, Optional[Dict[str, Any]], Optional[AppState]]:
+    """Show the previous results page."""
+    return await change_page_async(page_state, app_state, -1, request)
 
-def get_row_details(evt: gr.SelectData) -> Tuple[Optional[str], Optional[str], str]:
+
+def get_row_details(
+    app_state: Optional[AppState],
+    evt: gr.SelectData
+) -> Tuple[Optional[str], Optional[str], str]:
     """
     Get frame GIF and video details for selected row.
     
     Args:
+        app_state: The session's shown results (gr.State); its row cache is updated in place.
         evt: Gradio select event containing row index.
         
     Returns:
         Tuple of (gif_path, video_path, details_text)
     """
-    if app_state.query_results.empty:
+    if app_state is None or app_state.query_results.empty:
         return None, None, "No data available"
     
     try:
@@ -204,6 +638,14 @@ def get_row_details(evt: gr.SelectData) -> Tuple[Optional[str], Optional[str], s
         
         row = app_state.query_results.iloc[row_idx]
         
+        # Frame URIs and raw responses aren't in the list query; load them for this row
+        stage2_id = row.get('stage2_inference_id')
+        row_details = query_service.get_row_details(
+            row.get('session_id'),
+            stage2_id if pd.notna(stage2_id) else None,
+            row.get('stage1_timestamp'),
+        )
+        
         # Get camera and farm display names
         camera_id = row.get('camera_id', '')
         farm_id = row.get('farm_id', '')
@@ -242,7 +684,7 @@ def get_row_details(evt: gr.SelectData) -> Tuple[Optional[str], Optional[str], s
         # Add raw responses section
         details.append("")
         details.append("═══ Stage 1 Raw Response ═══")
-        s1_raw = row.get('stage1_raw_response')
+        s1_raw = row_details.get('stage1_raw_response')
         if pd.notna(s1_raw) and s1_raw:
             try:
                 # The raw response might contain literal \n characters that need to be unescaped
@@ -264,7 +706,7 @@ def get_row_details(evt: gr.SelectData) -> Tuple[Optional[str], Optional[str], s
         
         details.append("")
         details.append("═══ Stage 2 Raw Response ═══")
-        s2_raw = row.get('stage2_raw_response')
+        s2_raw = row_details.get('stage2_raw_response')
         if pd.notna(s2_raw) and s2_raw:
             try:
                 # The raw response might contain literal \n characters that need to be unescaped
@@ -287,10 +729,10 @@ def get_row_details(evt: gr.SelectData) -> Tuple[Optional[str], Optional[str], s
         details_text = "\n".join(details)
         
         # Create animated GIF from all Stage 1 frames
-        frame_uris = row.get('frame_uris')
+        frame_uris = row_details.get('frame_uris')
         gif_path = None
-        # Handle numpy arrays, lists, or None - avoid ambiguous truth check
-        if frame_uris is not None and len(frame_uris) > 0:
+        # Handle numpy arrays, lists, None or pd.NA (Arrow-backed nulls) - avoid ambiguous truth check
+        if frame_uris is not None and hasattr(frame_uris, '__len__') and len(frame_uris) > 0:
             # Convert to list if it's a numpy array
             frame_list = list(frame_uris) if hasattr(frame_uris, '__iter__') else []
             if frame_list:
@@ -298,7 +740,6 @@ def get_row_details(evt: gr.SelectData) -> Tuple[Optional[str], Optional[str], s
         
         # Download video only if Stage 2 exists (has actual video)
         video_path = None
-        stage2_id = row.get('stage2_inference_id')
         video_gcs = row.get('video_gcs_path')
         print(f"DEBUG: stage2_inference_id={stage2_id}, video_gcs_path={video_gcs}")
         if pd.notna(stage2_id) and pd.notna(video_gcs):
@@ -9,16 +9,14 @@ import pandas as pd
 @dataclass
 class AppState:
     """
-    Container for application state.
+    Container for the results shown in one UI session.
     
-    This replaces global variables with a structured state object.
+    Each browser session holds its own instance in a gr.State, so concurrent
+    handlers never see another session's rows. A new query or results page
+    starts a fresh instance.
     """
     query_results: pd.DataFrame = field(default_factory=pd.DataFrame)
     # Cache for row details to prevent redundant downloads
     # Key: row_index, Value: (gif_path, video_path, details_text)
     row_cache: Dict[int, Tuple[Optional[str], Optional[str], str]] = field(default_factory=dict)
     last_selected_row: Optional[int] = None
-
-
-# Global state instance
-app_state = AppState()